@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Outils de mesure des performances des modèles
+=============================================
+
+Ce module regroupe les mesures communes utilisées pour comparer des
+variantes d'un même modèle SpaCy : temps de chargement, débit
+d'inférence, taille sur disque, mémoire et concordance des entités.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class ModelBenchmark:
+    """
+    Classe contenant les fonctions de mesure des modèles
+    """
+    
+    @staticmethod
+    def directory_size(path: str) -> int:
+        """
+        Calcule la taille totale d'un fichier ou d'un dossier
+        
+        Args:
+            path (str): Chemin vers le fichier ou le dossier
+        
+        Returns:
+            int: Taille en octets
+        """
+        path = Path(path)
+        if path.is_file():
+            return path.stat().st_size
+        return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+    
+    @staticmethod
+    def current_rss_mb() -> float:
+        """
+        Retourne la mémoire résidente (RSS) du processus courant
+        
+        Returns:
+            float: Mémoire résidente en Mo
+        """
+        try:
+            with open('/proc/self/status', 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        
+        # Repli hors Linux : pic de mémoire résidente
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return 0.0
+    
+    @staticmethod
+    def current_pss_mb() -> float:
+        """
+        Retourne la mémoire proportionnelle (PSS) du processus courant
+        
+        Contrairement au RSS, les pages partagées (fichiers projetés en
+        mémoire, cache du système) sont réparties entre les processus qui
+        les utilisent.
+        
+        Returns:
+            float: Mémoire proportionnelle en Mo (RSS si PSS indisponible)
+        """
+        try:
+            with open('/proc/self/smaps_rollup', 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return ModelBenchmark.current_rss_mb()
+    
+    @staticmethod
+    def time_model_load(loader: Callable[[], Any]) -> Tuple[Any, float]:
+        """
+        Mesure le temps de chargement d'un modèle
+        
+        Args:
+            loader (Callable): Fonction sans argument qui charge et retourne le modèle
+        
+        Returns:
+            Tuple[Any, float]: (modèle chargé, durée en secondes)
+        """
+        start_time = time.time()
+        nlp = loader()
+        return nlp, time.time() - start_time
+    
+    @staticmethod
+    def compare_load_times(loaders: Dict[str, Callable[[], Any]], repeats: int = 5) -> Dict[str, Dict[str, float]]:
+        """
+        Compare les temps de chargement de plusieurs formats d'un même modèle
+        
+        Les chargements sont alternés pour que les formats profitent du même
+        état du cache disque.
+        
+        Args:
+            loaders (Dict[str, Callable]): Fonctions de chargement par nom de format
+            repeats (int): Nombre de chargements par format
+        
+        Returns:
+            Dict: Pour chaque format, durées minimale et moyenne en secondes
+        """
+        timings = {name: [] for name in loaders}
+        for _ in range(repeats):
+            for name, loader in loaders.items():
+                timings[name].append(ModelBenchmark.time_model_load(loader)[1])
+        
+        report = {}
+        for name, durations in timings.items():
+            report[name] = {'min_seconds': min(durations), 'mean_seconds': sum(durations) / len(durations)}
+            print(f"⏱️ {name}: {report[name]['min_seconds']:.3f}s (min), {report[name]['mean_seconds']:.3f}s (moyenne)")
+        return report
+    
+    @staticmethod
+    def measure_throughput(nlp, texts: List[str], batch_size: int = 64) -> Dict[str, float]:
+        """
+        Mesure le débit d'inférence d'un modèle sur une liste de textes
+        
+        Args:
+            nlp (Language): Modèle SpaCy à mesurer
+            texts (List[str]): Textes à analyser
+            batch_size (int): Taille des lots pour nlp.pipe
+        
+        Returns:
+            Dict[str, float]: Durée, documents par seconde et caractères par seconde
+        """
+        # Un premier passage absorbe les allocations initiales
+        for _ in nlp.pipe(texts[:batch_size], batch_size=batch_size):
+            pass
+        
+        start_time = time.time()
+        for _ in nlp.pipe(texts, batch_size=batch_size):
+            pass
+        elapsed = max(time.time() - start_time, 1e-9)
+        
+        return {
+            'seconds': elapsed,
+            'docs_per_second': len(texts) / elapsed,
+            'chars_per_second': sum(len(text) for text in texts) / elapsed
+        }
+    
+    @staticmethod
+    def load_training_file(filepath: str, limit: int = None) -> List[Tuple[str, Dict]]:
+        """
+        Charge un fichier de données d'entraînement sauvegardé (training_data_*.json)
+        
+        Args:
+            filepath (str): Chemin vers le fichier JSON
+            limit (int): Nombre maximum d'exemples (None = tous)
+        
+        Returns:
+            List[Tuple[str, Dict]]: Exemples au format (texte, {"entities": [...]})
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            json_data = json.load(f)
+        
+        examples = []
+        for item in json_data[:limit]:
+            if 'text' in item and 'entities' in item:
+                examples.append((item['text'], {"entities": item['entities']}))
+        return examples
+    
+    @staticmethod
+    def compare_entities(reference_nlp, candidate_nlp, texts: List[str],
+                         batch_size: int = 64) -> Dict[str, Any]:
+        """
+        Compare les entités produites par deux modèles sur les mêmes textes
+        
+        Args:
+            reference_nlp (Language): Modèle de référence
+            candidate_nlp (Language): Modèle à comparer
+            texts (List[str]): Textes à analyser
+            batch_size (int): Taille des lots pour nlp.pipe
+        
+        Returns:
+            Dict: Taux de documents identiques et précision/rappel/F1 du
+                candidat par rapport à la référence
+        """
+        return ModelBenchmark.compare_entity_sets(
+            ModelBenchmark.extract_entity_sets(reference_nlp, texts, batch_size),
+            ModelBenchmark.extract_entity_sets(candidate_nlp, texts, batch_size)
+        )
+    
+    @staticmethod
+    def extract_entity_sets(nlp, texts: List[str], batch_size: int = 64) -> List[set]:
+        """
+        Extrait les entités de chaque texte sous forme d'ensembles comparables
+        
+        Args:
+            nlp (Language): Modèle à exécuter
+            texts (List[str]): Textes à analyser
+            batch_size (int): Taille des lots pour nlp.pipe
+        
+        Returns:
+            List[set]: Pour chaque texte, ensemble de (début, fin, label)
+        """
+        return [{(e.start_char, e.end_char, e.label_) for e in doc.ents}
+                for doc in nlp.pipe(texts, batch_size=batch_size)]
+    
+    @staticmethod
+    def compare_entity_sets(reference_sets: List[set], candidate_sets: List[set]) -> Dict[str, Any]:
+        """
+        Compare les entités de deux modèles extraites par extract_entity_sets
+        
+        Args:
+            reference_sets (List[set]): Entités du modèle de référence
+            candidate_sets (List[set]): Entités du modèle à comparer
+        
+        Returns:
+            Dict: Taux de documents identiques et précision/rappel/F1 du
+                candidat par rapport à la référence
+        """
+        identical_docs = 0
+        common = reference_total = candidate_total = 0
+        
+        for reference_ents, candidate_ents in zip(reference_sets, candidate_sets):
+            if reference_ents == candidate_ents:
+                identical_docs += 1
+            common += len(reference_ents & candidate_ents)
+            reference_total += len(reference_ents)
+            candidate_total += len(candidate_ents)
+        
+        precision = common / candidate_total if candidate_total else 1.0
+        recall = common / reference_total if reference_total else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        
+        return {
+            'documents': len(reference_sets),
+            'identical_documents_rate': identical_docs / len(reference_sets) if reference_sets else 1.0,
+            'precision': precision,
+            'recall': recall,
+            'f1': f1
+        }
+    
+    @staticmethod
+    def evaluate_f1(nlp, examples: List[Tuple[str, Dict]]) -> float:
+        """
+        Calcule le F1 des entités d'un modèle sur des exemples annotés
+        
+        Args:
+            nlp (Language): Modèle à évaluer
+            examples (List[Tuple[str, Dict]]): Exemples (texte, annotations)
+        
+        Returns:
+            float: F1 des entités
+        """
+        from spacy.training import Example
+        
+        spacy_examples = []
+        for text, annotations in examples:
+            try:
+                spacy_examples.append(Example.from_dict(nlp.make_doc(text), annotations))
+            except Exception:
+                continue
+        if not spacy_examples:
+            return 0.0
+        return nlp.evaluate(spacy_examples).get('ents_f', 0.0) or 0.0
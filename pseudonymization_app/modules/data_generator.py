@@ -12,9 +12,89 @@ contextuelles réalistes pour chaque type d'entité NER personnalisée.
 import random
 import json
 import re
+import sys
+import math
+import unicodedata
+import codecs
+import hashlib
+import os
+import shutil
+import tempfile
+import itertools
+import numpy as np
+import spacy
+from spacy.tokens import DocBin
+from spacy.util import filter_spans
 from pathlib import Path
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Callable, Iterable, Iterator
 from datetime import datetime
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from deduplication import ExampleDeduplicator
+
+# Extension des fichiers JSON Lines (un exemple {"text", "entities"} par ligne)
+JSONL_SUFFIX = ".jsonl"
+# Nombre d'exemples par fragment JSONL et taille du tampon de mélange
+DEFAULT_SHARD_SIZE = 100_000
+DEFAULT_SHUFFLE_BUFFER = 50_000
+SHARD_SUFFIX = JSONL_SUFFIX
+# Taille des blocs lus lors du chargement en flux d'un fichier JSON
+STREAM_CHUNK_SIZE = 1 << 20
+# Taille maximale d'un exemple d'une liste JSON lue en flux : au-delà,
+# l'élément est considéré comme invalide plutôt que coupé entre deux blocs
+MAX_ITEM_BYTES = 4 << 20
+# Fichier décrivant les fragments d'un dossier de génération
+SHARD_MANIFEST = "manifest.json"
+# Extension des corpus binaires (DocBin : tokens et entités déjà alignés)
+DOCBIN_SUFFIX = ".spacy"
+# Nombre de termes par partition en génération reproductible (indépendant du nombre de processus)
+PARTITION_SIZE = 2000
+# Dossier du cache des corpus générés (un sous-dossier par empreinte des entrées)
+GENERATION_CACHE_DIR = Path("data") / "generation_cache"
+# À incrémenter lorsque la génération change : les corpus en cache deviennent obsolètes
+GENERATION_CACHE_VERSION = 1
+# Limites du cache : au-delà, les entrées les moins récemment utilisées sont supprimées
+GENERATION_CACHE_MAX_ENTRIES = 20
+GENERATION_CACHE_MAX_BYTES = 2 << 30
+# Emplacement d'un template multi-entités : {NOM}, {ORG}, {LIEU}...
+SLOT_PATTERN = re.compile(r"\{([A-Z_]+)\}")
+
+# Générateur propre à chaque processus du pool (génération parallèle)
+_worker_generator = None
+
+
+def _init_generator_worker(generator):
+    """
+    Initialise un processus du pool avec une copie du générateur (templates compris)
+    
+    Args:
+        generator (TrainingDataGenerator): Générateur du processus principal
+    """
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _generate_partition(task: Tuple) -> List[Tuple[str, Dict]]:
+    """
+    Génère une partition dans un processus du pool
+    
+    Args:
+        task (Tuple): Arguments de TrainingDataGenerator.generate_partition
+    
+    Returns:
+        List[Tuple[str, Dict]]: Exemples de la partition
+    """
+    return _worker_generator.generate_partition(*task)
+
+
+class GenerationCancelled(Exception):
+    """
+    Levée lorsque la génération (ou le chargement en flux des données) est
+    annulée via son cancel_event
+    """
+
 
 class TrainingDataGenerator:
     """
@@ -25,6 +105,30 @@ class TrainingDataGenerator:
     avec les annotations au format SpaCy.
     """
     
+    # Nombre de termes traités entre deux rapports de progression
+    PROGRESS_INTERVAL = 200
+    # Nombre d'exemples transmis à l'aperçu pour chaque type d'entité
+    PREVIEW_EXAMPLES_PER_TYPE = 3
+    # Types d'entité acceptés pour chaque emplacement des templates multi-entités,
+    # par ordre de préférence (le nom de l'emplacement est toujours essayé en premier)
+    SLOT_ALIASES = {
+        'NOM': ['PERSONNE', 'PER'],
+        'ORG': ['ORGANISATION'],
+        'LIEU': ['LOC'],
+        'RNE': ['ETABLISSEMENT'],
+        'INE': ['CODE']
+    }
+    # Clé des statistiques de génération pour les phrases multi-entités
+    MULTI_SLOT_STATS_KEY = 'MULTI_ENTITES'
+    # Clé des statistiques de génération pour le bilan du dédoublonnage
+    DEDUP_STATS_KEY = 'DEDOUBLONNAGE'
+    # Clé des statistiques de génération décrivant l'entrée du cache utilisée
+    CACHE_STATS_KEY = 'CACHE'
+    # Nombre d'exemples tokenisés ensemble pour les statistiques et la validation
+    STATISTICS_BATCH_SIZE = 1000
+    # Nombre d'erreurs détaillées dans un rapport de validation
+    MAX_REPORTED_ERRORS = 100
+    
     def __init__(self):
         """
         Initialise le générateur avec des modèles de phrases prédéfinis
@@ -120,12 +224,71 @@ class TrainingDataGenerator:
             "en respect des normes en vigueur"
         ]
         
-    def load_terms_from_file(self, filepath: str) -> List[str]:
+        # Templates génériques si le type d'entité n'est pas reconnu
+        self.generic_templates = [
+            "Le terme {entity} apparaît dans ce document.",
+            "Nous devons traiter {entity} avec attention.",
+            "L'élément {entity} est important pour cette analyse.",
+            "Il faut considérer {entity} dans notre évaluation.",
+            "Le cas {entity} nécessite un examen approfondi."
+        ]
+        
+        # Templates découpés autour de {entity}, par type d'entité
+        self._parsed_templates = {}
+        
+        # Templates à plusieurs emplacements ({NOM} travaille chez {ORG}),
+        # précompilés en (texte source, morceaux de texte, emplacements)
+        self.multi_slot_templates = []
+        
+        # Statistiques de la dernière liste d'exemples prévisualisée ou validée,
+        # associées à une clé (voir _statistics_key) et non à la liste elle-même
+        self._statistics_cache = None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        État transmis aux processus de génération, sans le cache de statistiques
+        
+        Returns:
+            Dict: Attributs du générateur
+        """
+        state = self.__dict__.copy()
+        state['_statistics_cache'] = None
+        return state
+    
+    @staticmethod
+    def _statistics_key(training_data: List[Tuple[str, Dict]]) -> Tuple:
+        """
+        Calcule la clé de cache des statistiques d'une liste d'exemples
+        
+        La liste n'est pas référencée : le cache ne la maintient pas en
+        mémoire. Le premier et le dernier exemple sont conservés pour qu'une
+        nouvelle liste réutilisant l'identifiant d'une liste libérée ne
+        partage pas ses statistiques.
+        
+        Args:
+            training_data: Données d'entraînement
+        
+        Returns:
+            Tuple: Identifiant, taille, premier et dernier exemple de la liste
+        """
+        if not training_data:
+            return (id(training_data), 0, None, None)
+        return (id(training_data), len(training_data), training_data[0], training_data[-1])
+        
+    def load_terms_from_file(self, filepath: str, max_terms: int = None,
+                             rng: random.Random = None) -> List[str]:
         """
         Charge une liste de termes depuis un fichier texte
         
+        Le fichier est lu d'un bloc et normalisé en Unicode NFC ; les termes
+        identiques après normalisation ne sont gardés qu'une fois, dans
+        l'ordre de leur première apparition. Avec max_terms, seul un
+        échantillon est gardé en mémoire (voir sample_terms_from_file).
+        
         Args:
             filepath (str): Chemin vers le fichier contenant les termes (un par ligne)
+            max_terms (int): Nombre maximum de termes (None : tous)
+            rng (random.Random): Générateur de l'échantillonnage (défaut : module random)
             
         Returns:
             List[str]: Liste des termes chargés et nettoyés
@@ -134,14 +297,19 @@ class TrainingDataGenerator:
             FileNotFoundError: Si le fichier n'existe pas
             Exception: Pour toute autre erreur de lecture
         """
+        if max_terms is not None:
+            return self.sample_terms_from_file(filepath, max_terms, rng)
+        
         try:
-            terms = []
             with open(filepath, 'r', encoding='utf-8') as file:
-                for line in file:
-                    # Nettoie chaque ligne (supprime espaces et caractères spéciaux)
-                    term = line.strip()
-                    if term and not term.startswith('#'):  # Ignore les lignes vides et commentaires
-                        terms.append(term)
+                lines = map(str.strip, file.read().splitlines())
+            
+            # Une ligne ASCII est déjà en NFC : seules les autres sont normalisées.
+            # dict.fromkeys retire les doublons en gardant l'ordre
+            unique_lines = dict.fromkeys([line if line.isascii() else unicodedata.normalize('NFC', line)
+                                          for line in lines])
+            # Ignore les lignes vides et commentaires
+            terms = [term for term in unique_lines if term and not term.startswith('#')]
             
             print(f"✅ {len(terms)} termes chargés depuis {filepath}")
             return terms
@@ -151,45 +319,158 @@ class TrainingDataGenerator:
         except Exception as e:
             raise Exception(f"Erreur lors de la lecture du fichier {filepath}: {str(e)}")
     
-    def generate_sentence_for_term(self, term: str, entity_type: str, 
-                                  add_context: bool = True) -> str:
+    def sample_terms_from_file(self, filepath: str, max_terms: int,
+                               rng: random.Random = None) -> List[str]:
         """
-        Génère une phrase contextualisée pour un terme donné
+        Tire au hasard au plus max_terms termes distincts d'un fichier
+        
+        Échantillonnage par réservoir (algorithme L) : le fichier est lu une
+        fois, les lignes entre deux remplacements sont sautées sans être
+        traitées et seule la liste des termes retenus est gardée en mémoire.
+        Un terme déjà présent dans le réservoir n'y entre pas une seconde fois.
+        
+        Args:
+            filepath (str): Chemin vers le fichier contenant les termes (un par ligne)
+            max_terms (int): Taille de l'échantillon
+            rng (random.Random): Générateur aléatoire (défaut : module random)
+            
+        Returns:
+            List[str]: Termes retenus (tous les termes si le fichier en contient moins)
+            
+        Raises:
+            FileNotFoundError: Si le fichier n'existe pas
+            Exception: Pour toute autre erreur de lecture
+        """
+        rng = rng or random
+        reservoir = []
+        retained = set()
+        
+        def clean(line):
+            term = line.strip()
+            if not term.isascii():
+                term = unicodedata.normalize('NFC', term)
+            if term and not term.startswith('#') and term not in retained:
+                return term
+            return None
+        
+        def uniform():
+            # Tirage dans ]0, 1[ pour les logarithmes
+            return rng.random() or sys.float_info.min
+        
+        try:
+            with open(filepath, 'r', encoding='utf-8') as file:
+                lines = iter(file)
+                # Remplit le réservoir avec les premiers termes distincts
+                while len(reservoir) < max_terms:
+                    line = next(lines, None)
+                    if line is None:
+                        break
+                    term = clean(line)
+                    if term:
+                        reservoir.append(term)
+                        retained.add(term)
+                
+                if max_terms > 0 and len(reservoir) == max_terms:
+                    weight = math.exp(math.log(uniform()) / max_terms)
+                    while True:
+                        skip = int(math.log(uniform()) / math.log(1 - weight))
+                        line = next(itertools.islice(lines, skip, None), None)
+                        if line is None:
+                            break
+                        term = clean(line)
+                        if term:
+                            slot = rng.randrange(max_terms)
+                            retained.discard(reservoir[slot])
+                            reservoir[slot] = term
+                            retained.add(term)
+                        weight *= math.exp(math.log(uniform()) / max_terms)
+            
+            print(f"✅ {len(reservoir)} termes échantillonnés depuis {filepath}")
+            return reservoir
+            
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Le fichier {filepath} n'a pas été trouvé")
+        except Exception as e:
+            raise Exception(f"Erreur lors de la lecture du fichier {filepath}: {str(e)}")
+    
+    def _get_parsed_templates(self, entity_type: str) -> List[Tuple[str, ...]]:
+        """
+        Retourne les templates d'un type d'entité découpés autour de {entity}
+        
+        Le découpage est fait une seule fois par liste de templates ; il est
+        refait si la liste est remplacée ou complétée.
+        
+        Args:
+            entity_type (str): Type d'entité
+            
+        Returns:
+            List[Tuple[str, ...]]: Pour chaque template, les morceaux de texte
+                situés avant, entre et après les occurrences de {entity}
+        """
+        templates = self.sentence_templates.get(entity_type, self.generic_templates)
+        cached = self._parsed_templates.get(entity_type)
+        if cached is None or cached[0] is not templates or len(cached[1]) != len(templates):
+            cached = (templates, [tuple(template.split("{entity}")) for template in templates])
+            self._parsed_templates[entity_type] = cached
+        return cached[1]
+    
+    def generate_annotated_sentence(self, term: str, entity_type: str,
+                                    add_context: bool = True,
+                                    rng: random.Random = None) -> Tuple[str, Dict[str, List]]:
+        """
+        Génère une phrase pour un terme avec ses annotations SpaCy
+        
+        Les positions de l'entité sont calculées à partir des morceaux du
+        template, y compris après la mise en minuscules et l'ajout d'un
+        connecteur : aucune recherche du terme dans la phrase n'est faite.
         
         Args:
             term (str): Le terme à intégrer dans la phrase
             entity_type (str): Type d'entité (PERSONNE, ETABLISSEMENT, etc.)
             add_context (bool): Ajouter du contexte supplémentaire
+            rng (random.Random): Générateur aléatoire (défaut : module random)
             
         Returns:
-            str: Phrase générée contenant le terme
+            Tuple[str, Dict]: Phrase et dictionnaire d'annotations SpaCy
         """
-        # Sélectionne un template approprié ou utilise un template générique
-        if entity_type in self.sentence_templates:
-            templates = self.sentence_templates[entity_type]
-        else:
-            # Template générique si le type d'entité n'est pas reconnu
-            templates = [
-                "Le terme {entity} apparaît dans ce document.",
-                "Nous devons traiter {entity} avec attention.",
-                "L'élément {entity} est important pour cette analyse.",
-                "Il faut considérer {entity} dans notre évaluation.",
-                "Le cas {entity} nécessite un examen approfondi."
-            ]
+        rng = rng or random
+        parts = rng.choice(self._get_parsed_templates(entity_type))
         
-        # Sélectionne un template au hasard
-        template = random.choice(templates)
+        # Ajoute parfois du contexte supplémentaire pour enrichir
+        if add_context and rng.random() < 0.3:  # 30% de chance
+            connector = rng.choice(self.connectors)
+            context = rng.choice(self.context_additions)
+            parts = [part.lower() for part in parts]
+            parts[0] = f"{connector} {parts[0]}"
+            parts[-1] = f"{parts[-1]} {context}."
+            term = term.lower()
         
-        # Remplace le placeholder par le terme réel
-        sentence = template.replace("{entity}", term)
+        # Assemble la phrase en notant la position de chaque insertion du terme
+        pieces = [parts[0]]
+        entities = []
+        offset = len(parts[0])
+        for part in parts[1:]:
+            entities.append((offset, offset + len(term), entity_type))
+            pieces.append(term)
+            pieces.append(part)
+            offset += len(term) + len(part)
         
-        # Ajoute parfois du contexte supplémentaire pour enrichir
-        if add_context and random.random() < 0.3:  # 30% de chance
-            connector = random.choice(self.connectors)
-            context = random.choice(self.context_additions)
-            sentence = f"{connector} {sentence.lower()} {context}."
+        return "".join(pieces), {"entities": entities}
+    
+    def generate_sentence_for_term(self, term: str, entity_type: str, 
+                                  add_context: bool = True) -> str:
+        """
+        Génère une phrase contextualisée pour un terme donné
         
-        return sentence
+        Args:
+            term (str): Le terme à intégrer dans la phrase
+            entity_type (str): Type d'entité (PERSONNE, ETABLISSEMENT, etc.)
+            add_context (bool): Ajouter du contexte supplémentaire
+            
+        Returns:
+            str: Phrase générée contenant le terme
+        """
+        return self.generate_annotated_sentence(term, entity_type, add_context)[0]
     
     def create_spacy_annotation(self, sentence: str, term: str, 
                               entity_type: str) -> Tuple[str, Dict[str, List]]:
@@ -224,22 +505,205 @@ class TrainingDataGenerator:
         
         return sentence, annotations
     
-    def generate_training_data(self, entity_files: Dict[str, str], 
-                             sentences_per_term: int = 5,
-                             add_variations: bool = True) -> List[Tuple[str, Dict]]:
+    def load_multi_slot_templates(self, filepath: str) -> int:
         """
-        Génère un ensemble complet de données d'entraînement
+        Charge et précompile un fichier de phrases types à plusieurs entités
+        
+        Une phrase par ligne ; les lignes vides et les commentaires (#) sont
+        ignorés, ainsi que les guillemets et la virgule finale des fichiers
+        écrits comme une liste Python. Les phrases sans emplacement ou déjà
+        chargées sont ignorées.
+        
+        Args:
+            filepath (str): Chemin vers le fichier de phrases types
+            
+        Returns:
+            int: Nombre de templates ajoutés
+        """
+        known_templates = {source for source, _, _ in self.multi_slot_templates}
+        added = 0
+        for line in self.load_terms_from_file(filepath):
+            template = line.rstrip(',').strip()
+            if len(template) >= 2 and template[0] == template[-1] and template[0] in "\"'":
+                template = template[1:-1]
+            
+            # re.split alterne texte et noms d'emplacements : [texte, NOM, texte, ORG, texte]
+            pieces = SLOT_PATTERN.split(template)
+            if len(pieces) == 1 or template in known_templates:
+                continue
+            known_templates.add(template)
+            self.multi_slot_templates.append((template, tuple(pieces[0::2]), tuple(pieces[1::2])))
+            added += 1
+        
+        print(f"✅ {added} phrases types multi-entités ajoutées depuis {filepath}")
+        return added
+    
+    def resolve_template_slots(self, entity_types: Iterable[str]) -> Dict[str, str]:
+        """
+        Associe chaque emplacement des templates à un type d'entité disponible
+        
+        Args:
+            entity_types (Iterable[str]): Types d'entité dont les termes sont chargés
+            
+        Returns:
+            Dict[str, str]: {emplacement: type_entité} pour les emplacements résolus
+        """
+        entity_types = set(entity_types)
+        slot_types = {}
+        for _, _, slots in self.multi_slot_templates:
+            for slot in slots:
+                if slot in slot_types:
+                    continue
+                for candidate in [slot] + self.SLOT_ALIASES.get(slot, []):
+                    if candidate in entity_types:
+                        slot_types[slot] = candidate
+                        break
+        return slot_types
+    
+    def compile_multi_slot_templates(self, entity_terms: Dict[str, List[str]]) -> List[Tuple]:
+        """
+        Prépare les templates utilisables avec les termes chargés
+        
+        Chaque emplacement est remplacé par la liste de termes et l'étiquette
+        à utiliser : la génération n'a plus ni recherche ni découpage à faire.
+        Les templates dont un emplacement n'a pas de termes sont écartés.
+        
+        Args:
+            entity_terms (Dict[str, List[str]]): Termes par type d'entité
+            
+        Returns:
+            List[Tuple]: (morceaux de texte, ((termes, étiquette), ...)) par template
+        """
+        entity_terms = {entity_type: terms for entity_type, terms in entity_terms.items() if terms}
+        slot_types = self.resolve_template_slots(entity_terms)
+        
+        compiled = []
+        for template, parts, slots in self.multi_slot_templates:
+            if all(slot in slot_types for slot in slots):
+                fillers = tuple((entity_terms[slot_types[slot]], slot_types[slot]) for slot in slots)
+                compiled.append((parts, fillers))
+            else:
+                missing = ", ".join(sorted(set(slots) - set(slot_types)))
+                print(f"⚠️ Template ignoré (pas de termes pour {missing}) : {template}")
+        return compiled
+    
+    @staticmethod
+    def generate_multi_slot_sentence(compiled_template: Tuple,
+                                     rng: random.Random = None) -> Tuple[str, Dict[str, List]]:
+        """
+        Remplit un template précompilé avec un terme tiré au hasard par emplacement
+        
+        Args:
+            compiled_template (Tuple): Template issu de compile_multi_slot_templates
+            rng (random.Random): Générateur aléatoire (défaut : module random)
+            
+        Returns:
+            Tuple[str, Dict]: Phrase et dictionnaire d'annotations SpaCy
+        """
+        rng = rng or random
+        parts, fillers = compiled_template
+        
+        pieces = [parts[0]]
+        entities = []
+        offset = len(parts[0])
+        for (terms, label), part in zip(fillers, parts[1:]):
+            term = rng.choice(terms)
+            entities.append((offset, offset + len(term), label))
+            pieces.append(term)
+            pieces.append(part)
+            offset += len(term) + len(part)
+        
+        return "".join(pieces), {"entities": entities}
+    
+    def iter_multi_slot_examples(self, entity_files: Dict[str, str], n_examples: int,
+                                 rng: random.Random = None,
+                                 cancel_event=None,
+                                 generation_stats: Dict[str, Any] = None,
+                                 max_terms_per_type: int = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Produit des phrases à plusieurs entités à partir des templates chargés
+        
+        Template et termes sont tirés indépendamment pour chaque phrase : le
+        produit cartésien des templates et des listes de termes n'est jamais
+        construit, seules les listes de termes sont gardées en mémoire.
+        
+        Args:
+            entity_files (Dict[str, str]): Dictionnaire {type_entité: chemin_fichier}
+            n_examples (int): Nombre de phrases à générer
+            rng (random.Random): Générateur aléatoire (défaut : module random)
+            cancel_event (threading.Event): Annule la génération lorsqu'il est
+                activé (lève GenerationCancelled)
+            generation_stats (Dict): Reçoit les statistiques sous MULTI_SLOT_STATS_KEY
+            max_terms_per_type (int): Nombre maximum de termes tirés de chaque
+                fichier (None : tous les termes)
+            
+        Yields:
+            Tuple[str, Dict]: Exemple au format SpaCy
+        """
+        if not self.multi_slot_templates or n_examples <= 0:
+            return
+        rng = rng or random
+        
+        print(f"\n📂 Génération de {n_examples} phrases multi-entités...")
+        entity_terms = {}
+        for entity_type, filepath in entity_files.items():
+            try:
+                entity_terms[entity_type] = self.load_terms_from_file(filepath, max_terms_per_type, rng)
+            except Exception as e:
+                print(f"❌ Erreur lors du chargement de '{entity_type}': {e}")
+        
+        compiled = self.compile_multi_slot_templates(entity_terms)
+        if not compiled:
+            print("⚠️ Aucun template multi-entités utilisable avec les termes chargés")
+            return
+        
+        for index in range(n_examples):
+            if index % self.PROGRESS_INTERVAL == 0 and cancel_event is not None and cancel_event.is_set():
+                print("⏹️ Génération annulée")
+                raise GenerationCancelled("Génération annulée")
+            yield self.generate_multi_slot_sentence(rng.choice(compiled), rng)
+        
+        if generation_stats is not None:
+            generation_stats[self.MULTI_SLOT_STATS_KEY] = {
+                'templates_count': len(compiled),
+                'sentences_generated': n_examples
+            }
+        print(f"✅ {n_examples} phrases multi-entités générées à partir de {len(compiled)} templates")
+    
+    def iter_training_examples(self, entity_files: Dict[str, str],
+                               sentences_per_term: int = 5,
+                               add_variations: bool = True,
+                               progress_callback: Callable[[str, int, int], None] = None,
+                               preview_callback: Callable[[List[Tuple[str, Dict]]], None] = None,
+                               cancel_event=None,
+                               generation_stats: Dict[str, Any] = None,
+                               max_terms_per_type: int = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Produit les exemples d'entraînement un par un, sans les accumuler
+        
+        Les exemples sortent dans l'ordre des fichiers et des termes ; le
+        mélange est laissé à l'appelant (liste complète ou tampon borné).
         
         Args:
             entity_files (Dict[str, str]): Dictionnaire {type_entité: chemin_fichier}
             sentences_per_term (int): Nombre de phrases à générer par terme
             add_variations (bool): Ajouter des variations contextuelles
+            progress_callback (Callable): Appelée avec (type d'entité, termes
+                traités, nombre de termes du type)
+            preview_callback (Callable): Reçoit les premiers exemples générés
+                pour chaque type d'entité
+            cancel_event (threading.Event): Annule la génération lorsqu'il est
+                activé (lève GenerationCancelled)
+            generation_stats (Dict): Rempli au fur et à mesure avec les
+                statistiques par type d'entité
+            max_terms_per_type (int): Nombre maximum de termes tirés de chaque
+                fichier (None : tous les termes)
             
-        Returns:
-            List[Tuple[str, Dict]]: Données d'entraînement au format SpaCy
+        Yields:
+            Tuple[str, Dict]: Exemple au format SpaCy
         """
-        training_data = []
-        generation_stats = {}
+        if generation_stats is None:
+            generation_stats = {}
         
         print("🚀 Début de la génération des données d'entraînement...")
         
@@ -248,54 +712,850 @@ class TrainingDataGenerator:
             
             try:
                 # Charge les termes depuis le fichier
-                terms = self.load_terms_from_file(filepath)
-                generated_count = 0
-                
-                for term in terms:
-                    # Génère plusieurs phrases pour chaque terme
-                    for i in range(sentences_per_term):
-                        try:
-                            # Génère une phrase
-                            sentence = self.generate_sentence_for_term(
-                                term, entity_type, add_variations
-                            )
-                            
-                            # Crée l'annotation SpaCy
-                            annotated_sentence, annotations = self.create_spacy_annotation(
-                                sentence, term, entity_type
-                            )
-                            
-                            # Ajoute aux données d'entraînement
-                            training_data.append((annotated_sentence, annotations))
-                            generated_count += 1
-                            
-                        except Exception as e:
-                            print(f"⚠️ Erreur lors de la génération pour '{term}': {e}")
-                            continue
-                
-                generation_stats[entity_type] = {
-                    'terms_count': len(terms),
-                    'sentences_generated': generated_count
-                }
-                
-                print(f"✅ {generated_count} phrases générées pour {len(terms)} termes de type '{entity_type}'")
+                terms = self.load_terms_from_file(filepath, max_terms_per_type)
+            except Exception as e:
+                print(f"❌ Erreur lors du traitement de '{entity_type}': {e}")
+                generation_stats[entity_type] = {'error': str(e)}
+                continue
+            
+            generated_count = 0
+            preview_examples = [] if preview_callback else None
+            
+            for term_index, term in enumerate(terms):
+                if term_index % self.PROGRESS_INTERVAL == 0:
+                    if cancel_event is not None and cancel_event.is_set():
+                        print("⏹️ Génération annulée")
+                        raise GenerationCancelled("Génération annulée")
+                    if progress_callback:
+                        progress_callback(entity_type, term_index, len(terms))
+                    if preview_examples:
+                        preview_callback(preview_examples)
+                        preview_examples = None
                 
+                # Génère plusieurs phrases pour chaque terme
+                for i in range(sentences_per_term):
+                    try:
+                        # Génère une phrase annotée
+                        example = self.generate_annotated_sentence(
+                            term, entity_type, add_variations
+                        )
+                        
+                    except Exception as e:
+                        print(f"⚠️ Erreur lors de la génération pour '{term}': {e}")
+                        continue
+                    
+                    generated_count += 1
+                    if preview_examples is not None and len(preview_examples) < self.PREVIEW_EXAMPLES_PER_TYPE:
+                        preview_examples.append(example)
+                    yield example
+            
+            if progress_callback:
+                progress_callback(entity_type, len(terms), len(terms))
+            if preview_examples:
+                preview_callback(preview_examples)
+            
+            generation_stats[entity_type] = {
+                'terms_count': len(terms),
+                'sentences_generated': generated_count
+            }
+            
+            print(f"✅ {generated_count} phrases générées pour {len(terms)} termes de type '{entity_type}'")
+    
+    def generate_partition(self, entity_type: str, terms: List[str], partition_index: int,
+                           sentences_per_term: int, add_variations: bool,
+                           seed: int) -> List[Tuple[str, Dict]]:
+        """
+        Génère les exemples d'une partition avec son propre générateur aléatoire
+        
+        La graine de la partition ne dépend que de la graine globale, du type
+        d'entité et de l'index de la partition : le résultat est le même quel
+        que soit le processus qui la calcule.
+        
+        Args:
+            entity_type (str): Type d'entité
+            terms (List[str]): Termes de la partition
+            partition_index (int): Index de la partition dans le type d'entité
+            sentences_per_term (int): Nombre de phrases à générer par terme
+            add_variations (bool): Ajouter des variations contextuelles
+            seed (int): Graine globale de la génération
+            
+        Returns:
+            List[Tuple[str, Dict]]: Exemples de la partition, dans l'ordre des termes
+        """
+        rng = random.Random(f"{seed}:{entity_type}:{partition_index}")
+        examples = []
+        for term in terms:
+            for i in range(sentences_per_term):
+                try:
+                    examples.append(self.generate_annotated_sentence(term, entity_type, add_variations, rng))
+                except Exception as e:
+                    print(f"⚠️ Erreur lors de la génération pour '{term}': {e}")
+        return examples
+    
+    def iter_training_partitions(self, entity_files: Dict[str, str],
+                                 sentences_per_term: int = 5,
+                                 add_variations: bool = True,
+                                 seed: int = 0,
+                                 n_workers: int = 1,
+                                 progress_callback: Callable[[str, int, int], None] = None,
+                                 preview_callback: Callable[[List[Tuple[str, Dict]]], None] = None,
+                                 cancel_event=None,
+                                 generation_stats: Dict[str, Any] = None,
+                                 max_terms_per_type: int = None) -> Iterator[List[Tuple[str, Dict]]]:
+        """
+        Produit les exemples partition par partition, de façon reproductible
+        
+        Le travail est découpé par type d'entité puis par tranches de
+        PARTITION_SIZE termes. Les partitions sont calculées dans un pool de
+        n_workers processus (ou dans le processus courant si n_workers <= 1)
+        et rendues dans leur ordre : pour une graine donnée, la suite des
+        exemples ne dépend pas du nombre de processus.
+        
+        Args:
+            entity_files (Dict[str, str]): Dictionnaire {type_entité: chemin_fichier}
+            sentences_per_term (int): Nombre de phrases à générer par terme
+            add_variations (bool): Ajouter des variations contextuelles
+            seed (int): Graine globale de la génération
+            n_workers (int): Nombre de processus
+            progress_callback (Callable): Appelée avec (type d'entité, termes
+                traités, nombre de termes du type)
+            preview_callback (Callable): Reçoit les premiers exemples générés
+                pour chaque type d'entité
+            cancel_event (threading.Event): Annule la génération lorsqu'il est
+                activé (lève GenerationCancelled)
+            generation_stats (Dict): Rempli au fur et à mesure avec les
+                statistiques par type d'entité
+            max_terms_per_type (int): Nombre maximum de termes tirés de chaque
+                fichier (None : tous les termes)
+            
+        Yields:
+            List[Tuple[str, Dict]]: Exemples d'une partition
+        """
+        if generation_stats is None:
+            generation_stats = {}
+        
+        print(f"🚀 Début de la génération des données d'entraînement (graine {seed}, {n_workers} processus)...")
+        
+        tasks = []
+        for entity_type, filepath in entity_files.items():
+            try:
+                # Échantillon reproductible : ne dépend que de la graine et du type d'entité
+                terms = self.load_terms_from_file(filepath, max_terms_per_type,
+                                                  random.Random(f"{seed}:{entity_type}:terms"))
             except Exception as e:
                 print(f"❌ Erreur lors du traitement de '{entity_type}': {e}")
                 generation_stats[entity_type] = {'error': str(e)}
                 continue
+            
+            generation_stats[entity_type] = {'terms_count': len(terms), 'sentences_generated': 0}
+            for partition_index, start in enumerate(range(0, len(terms), PARTITION_SIZE)):
+                tasks.append((entity_type, terms[start:start + PARTITION_SIZE], partition_index,
+                              sentences_per_term, add_variations, seed))
+        
+        def check_cancelled():
+            if cancel_event is not None and cancel_event.is_set():
+                print("⏹️ Génération annulée")
+                raise GenerationCancelled("Génération annulée")
+        
+        def report(task, examples):
+            entity_type, terms, partition_index = task[:3]
+            type_stats = generation_stats[entity_type]
+            type_stats['sentences_generated'] += len(examples)
+            if progress_callback:
+                done = min(partition_index * PARTITION_SIZE + len(terms), type_stats['terms_count'])
+                progress_callback(entity_type, done, type_stats['terms_count'])
+            if preview_callback and partition_index == 0 and examples:
+                preview_callback(examples[:self.PREVIEW_EXAMPLES_PER_TYPE])
+        
+        if n_workers <= 1:
+            for task in tasks:
+                check_cancelled()
+                examples = self.generate_partition(*task)
+                report(task, examples)
+                yield examples
+            return
+        
+        # Nombre borné de partitions en cours : la mémoire ne dépend pas de la taille totale
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_generator_worker,
+                                 initargs=(self,)) as executor:
+            pending = deque()
+            task_iter = iter(tasks)
+            for task in itertools.islice(task_iter, 2 * n_workers):
+                pending.append((task, executor.submit(_generate_partition, task)))
+            
+            try:
+                while pending:
+                    check_cancelled()
+                    task, future = pending.popleft()
+                    examples = future.result()
+                    next_task = next(task_iter, None)
+                    if next_task is not None:
+                        pending.append((next_task, executor.submit(_generate_partition, next_task)))
+                    report(task, examples)
+                    yield examples
+            finally:
+                for _, future in pending:
+                    future.cancel()
+    
+    def generate_training_data(self, entity_files: Dict[str, str], 
+                             sentences_per_term: int = 5,
+                             add_variations: bool = True,
+                             progress_callback: Callable[[str, int, int], None] = None,
+                             preview_callback: Callable[[List[Tuple[str, Dict]]], None] = None,
+                             cancel_event=None,
+                             seed: int = None,
+                             n_workers: int = None,
+                             multi_slot_examples: int = 0,
+                             deduplicate: bool = True,
+                             near_duplicates: bool = False,
+                             max_terms_per_type: int = None,
+                             cache_dir: str = None,
+                             lang: str = "fr") -> List[Tuple[str, Dict]]:
+        """
+        Génère un ensemble complet de données d'entraînement
+        
+        Avec une graine ou plusieurs processus, la génération est partitionnée
+        (voir iter_training_partitions) : pour une graine donnée, le résultat
+        est identique quel que soit n_workers.
+        
+        Avec une graine et cache_dir, le corpus est mis en cache sur disque
+        sous l'empreinte des fichiers de termes, des templates et des
+        paramètres (voir generation_cache_key) : une demande identique relit
+        le cache au lieu de regénérer. L'entrée contient aussi le corpus
+        DocBin, indiqué dans les statistiques sous CACHE_STATS_KEY. Le cache
+        est limité à GENERATION_CACHE_MAX_ENTRIES entrées et
+        GENERATION_CACHE_MAX_BYTES octets (voir prune_generation_cache).
+        
+        Args:
+            entity_files (Dict[str, str]): Dictionnaire {type_entité: chemin_fichier}
+            sentences_per_term (int): Nombre de phrases à générer par terme
+            add_variations (bool): Ajouter des variations contextuelles
+            progress_callback (Callable): Appelée avec (type d'entité, termes
+                traités, nombre de termes du type)
+            preview_callback (Callable): Reçoit les premiers exemples générés
+                pour chaque type d'entité
+            cancel_event (threading.Event): Annule la génération lorsqu'il est
+                activé (lève GenerationCancelled)
+            seed (int): Graine de la génération (None : non reproductible)
+            n_workers (int): Nombre de processus (None : un seul)
+            multi_slot_examples (int): Nombre de phrases à plusieurs entités
+                ajoutées à partir des templates chargés (load_multi_slot_templates)
+            deduplicate (bool): Retire les exemples identiques avant le mélange
+                (bilan dans les statistiques sous DEDUP_STATS_KEY)
+            near_duplicates (bool): Retire aussi les quasi-doublons (MinHash)
+            max_terms_per_type (int): Nombre maximum de termes tirés de chaque
+                fichier (None : tous les termes)
+            cache_dir (str): Dossier du cache (None : pas de cache ; sans
+                graine, la génération n'est jamais mise en cache)
+            lang (str): Langue du tokenizer du corpus DocBin mis en cache
+            
+        Returns:
+            List[Tuple[str, Dict]]: Données d'entraînement au format SpaCy
+        """
+        cache_entry = None
+        if cache_dir is not None and seed is not None:
+            cache_key = self.generation_cache_key(entity_files, {
+                'sentences_per_term': sentences_per_term,
+                'add_variations': add_variations,
+                'seed': seed,
+                'multi_slot_examples': multi_slot_examples,
+                'deduplicate': deduplicate,
+                'near_duplicates': near_duplicates,
+                'max_terms_per_type': max_terms_per_type,
+                'lang': lang
+            })
+            cache_entry = Path(cache_dir) / cache_key
+            cached = self.load_cached_generation(cache_entry)
+            if cached is not None:
+                return cached
+        
+        generation_stats = {}
+        if seed is None and not n_workers:
+            training_data = list(self.iter_training_examples(
+                entity_files, sentences_per_term, add_variations,
+                progress_callback, preview_callback, cancel_event, generation_stats,
+                max_terms_per_type
+            ))
+            training_data.extend(self.iter_multi_slot_examples(
+                entity_files, multi_slot_examples, cancel_event=cancel_event,
+                generation_stats=generation_stats, max_terms_per_type=max_terms_per_type
+            ))
+            shuffle_rng = random
+        else:
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            training_data = []
+            for examples in self.iter_training_partitions(
+                entity_files, sentences_per_term, add_variations, seed, n_workers or 1,
+                progress_callback, preview_callback, cancel_event, generation_stats,
+                max_terms_per_type
+            ):
+                training_data.extend(examples)
+            training_data.extend(self.iter_multi_slot_examples(
+                entity_files, multi_slot_examples, random.Random(f"{seed}:{self.MULTI_SLOT_STATS_KEY}"),
+                cancel_event, generation_stats, max_terms_per_type
+            ))
+            # Mélange reproductible, indépendant du découpage en processus
+            shuffle_rng = random.Random(seed)
+        
+        if deduplicate:
+            # Avant le mélange : avec une graine, les exemples conservés sont toujours les mêmes
+            deduplicator = ExampleDeduplicator(near_duplicates)
+            training_data = deduplicator.deduplicate(training_data)
+            generation_stats[self.DEDUP_STATS_KEY] = deduplicator.report()
         
         # Mélange les données pour un meilleur entraînement
-        random.shuffle(training_data)
+        shuffle_rng.shuffle(training_data)
         
         print(f"\n🎯 Génération terminée: {len(training_data)} phrases d'entraînement créées")
         
+        if cache_entry is not None and training_data:
+            self.save_cached_generation(cache_entry, training_data, generation_stats, lang)
+            self.prune_generation_cache(cache_dir, keep=cache_entry.name)
+        
+        return training_data, generation_stats
+    
+    def generation_cache_key(self, entity_files: Dict[str, str], parameters: Dict[str, Any]) -> str:
+        """
+        Calcule l'empreinte des entrées d'une génération
+        
+        L'empreinte couvre le contenu des fichiers de termes (dans l'ordre
+        des types d'entité, qui fixe l'ordre de génération), tous les
+        templates et compléments de phrases, les paramètres de génération
+        et GENERATION_CACHE_VERSION. Le nombre de processus n'en fait pas
+        partie : il ne change pas le résultat.
+        
+        Args:
+            entity_files (Dict[str, str]): Dictionnaire {type_entité: chemin_fichier}
+            parameters (Dict): Paramètres qui influent sur le corpus généré
+            
+        Returns:
+            str: Empreinte SHA-256 en hexadécimal
+        """
+        files = []
+        for entity_type, filepath in entity_files.items():
+            file_hash = hashlib.sha256()
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                    file_hash.update(chunk)
+            files.append([entity_type, file_hash.hexdigest()])
+        
+        inputs = {
+            'version': GENERATION_CACHE_VERSION,
+            'partition_size': PARTITION_SIZE,
+            'files': files,
+            'sentence_templates': self.sentence_templates,
+            'generic_templates': self.generic_templates,
+            'connectors': self.connectors,
+            'context_additions': self.context_additions,
+            'multi_slot_templates': [source for source, _, _ in self.multi_slot_templates],
+            'slot_aliases': self.SLOT_ALIASES,
+            'parameters': parameters
+        }
+        return hashlib.sha256(json.dumps(inputs, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def load_cached_generation(self, cache_entry: Path):
+        """
+        Relit un corpus généré depuis le cache
+        
+        Args:
+            cache_entry (Path): Dossier de l'entrée (dossier du cache / empreinte)
+            
+        Returns:
+            Tuple[List, Dict]: (données, statistiques) ou None si l'entrée n'existe pas
+        """
+        stats_path = cache_entry / "stats.json"
+        if not stats_path.exists():
+            return None
+        
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            generation_stats = json.load(f)
+        training_data = list(self.iter_training_file(str(cache_entry / f"examples{JSONL_SUFFIX}")))
+        generation_stats[self.CACHE_STATS_KEY]['hit'] = True
+        # La date de stats.json marque la dernière utilisation (éviction LRU)
+        os.utime(stats_path)
+        
+        print(f"♻️ Corpus identique trouvé en cache : {len(training_data)} exemples relus depuis {cache_entry}")
         return training_data, generation_stats
     
+    def save_cached_generation(self, cache_entry: Path, training_data: List[Tuple[str, Dict]],
+                               generation_stats: Dict[str, Any], lang: str = "fr"):
+        """
+        Enregistre un corpus généré dans le cache (JSON Lines et DocBin)
+        
+        L'entrée est écrite dans un dossier temporaire puis renommée : une
+        entrée présente dans le cache est toujours complète.
+        
+        Args:
+            cache_entry (Path): Dossier de l'entrée (dossier du cache / empreinte)
+            training_data: Données générées
+            generation_stats (Dict): Statistiques de génération, complétées
+                avec la description de l'entrée sous CACHE_STATS_KEY
+            lang (str): Langue du tokenizer du corpus DocBin
+        """
+        cache_entry = Path(cache_entry)
+        cache_entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{cache_entry.name}-", dir=cache_entry.parent))
+        
+        try:
+            with open(tmp_dir / f"examples{JSONL_SUFFIX}", 'w', encoding='utf-8') as f:
+                for text, annotations in training_data:
+                    f.write(json.dumps({"text": text, "entities": annotations["entities"]}, ensure_ascii=False))
+                    f.write("\n")
+            self.save_training_docbin(training_data, filename=str((tmp_dir / f"corpus{DOCBIN_SUFFIX}").resolve()),
+                                      lang=lang)
+            
+            generation_stats[self.CACHE_STATS_KEY] = {
+                'key': cache_entry.name,
+                'docbin_path': str(cache_entry / f"corpus{DOCBIN_SUFFIX}"),
+                'hit': False
+            }
+            with open(tmp_dir / "stats.json", 'w', encoding='utf-8') as f:
+                json.dump(generation_stats, f, indent=2, ensure_ascii=False)
+            
+            # Renommage atomique : une génération identique a pu terminer avant nous
+            os.rename(tmp_dir, cache_entry)
+            print(f"💾 Corpus mis en cache : {cache_entry}")
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not (cache_entry / "stats.json").exists():
+                print(f"⚠️ Impossible de mettre le corpus en cache : {e}")
+                generation_stats.pop(self.CACHE_STATS_KEY, None)
+    
+    @staticmethod
+    def prune_generation_cache(cache_dir: str,
+                               max_entries: int = GENERATION_CACHE_MAX_ENTRIES,
+                               max_bytes: int = GENERATION_CACHE_MAX_BYTES,
+                               keep: str = None) -> Dict[str, int]:
+        """
+        Supprime les entrées les moins récemment utilisées du cache de génération
+        
+        Les entrées sont classées par date de dernière utilisation (date de
+        leur stats.json, mise à jour à chaque relecture) et conservées tant
+        que les deux limites sont respectées. Les dossiers temporaires
+        d'écritures interrompues sont aussi supprimés.
+        
+        Args:
+            cache_dir (str): Dossier du cache
+            max_entries (int): Nombre maximum d'entrées conservées
+            max_bytes (int): Taille totale maximale des entrées conservées
+            keep (str): Empreinte d'une entrée à toujours conserver (ex. celle
+                qui vient d'être écrite)
+            
+        Returns:
+            Dict: Entrées supprimées, octets libérés, entrées et octets restants
+        """
+        report = {'removed_entries': 0, 'freed_bytes': 0, 'remaining_entries': 0, 'remaining_bytes': 0}
+        cache_dir = Path(cache_dir)
+        if not cache_dir.is_dir():
+            return report
+        
+        entries = []
+        for entry in cache_dir.iterdir():
+            if not entry.is_dir():
+                continue
+            try:
+                size = sum(path.stat().st_size for path in entry.iterdir())
+                stats_path = entry / "stats.json"
+                last_used = stats_path.stat().st_mtime if stats_path.exists() else None
+            except OSError:
+                continue
+            if entry.name.startswith("."):
+                # Écriture en cours ou interrompue : supprimée seulement si ancienne
+                if entry.stat().st_mtime < datetime.now().timestamp() - 24 * 3600:
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+            entries.append((entry.name != keep, -(last_used or 0), entry, size))
+        
+        # Entrée à conserver puis les plus récemment utilisées en premier ;
+        # dès qu'une limite est atteinte, toutes les entrées plus anciennes partent
+        full = False
+        for _, _, entry, size in sorted(entries):
+            full = full or report['remaining_entries'] >= max_entries \
+                or report['remaining_bytes'] + size > max_bytes
+            if not full or entry.name == keep:
+                report['remaining_entries'] += 1
+                report['remaining_bytes'] += size
+            else:
+                shutil.rmtree(entry, ignore_errors=True)
+                report['removed_entries'] += 1
+                report['freed_bytes'] += size
+        
+        if report['removed_entries']:
+            print(f"🧹 Cache de génération : {report['removed_entries']} entrée(s) supprimée(s), "
+                  f"{report['freed_bytes'] / 1e6:.1f} Mo libérés")
+        return report
+    
+    @staticmethod
+    def clear_generation_cache(cache_dir: str) -> Dict[str, int]:
+        """
+        Vide le cache de génération
+        
+        Args:
+            cache_dir (str): Dossier du cache
+            
+        Returns:
+            Dict: Bilan de la suppression (voir prune_generation_cache)
+        """
+        return TrainingDataGenerator.prune_generation_cache(cache_dir, max_entries=0, max_bytes=0)
+    
+    @staticmethod
+    def shuffle_with_buffer(examples: Iterable[Tuple[str, Dict]], buffer_size: int,
+                            rng: random.Random = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Mélange un flux d'exemples avec un tampon de taille fixe
+        
+        Chaque nouvel exemple prend la place d'un exemple tiré au hasard dans
+        le tampon, qui est émis ; la mémoire utilisée ne dépend que de
+        buffer_size et non de la taille du flux.
+        
+        Args:
+            examples (Iterable): Flux d'exemples
+            buffer_size (int): Nombre d'exemples conservés en mémoire
+            rng (random.Random): Générateur aléatoire (défaut : module random)
+            
+        Yields:
+            Tuple[str, Dict]: Exemples dans un ordre mélangé
+        """
+        rng = rng or random
+        buffer = []
+        for example in examples:
+            if len(buffer) < buffer_size:
+                buffer.append(example)
+                continue
+            index = rng.randrange(buffer_size)
+            yield buffer[index]
+            buffer[index] = example
+        
+        rng.shuffle(buffer)
+        yield from buffer
+    
+    def generate_training_shards(self, entity_files: Dict[str, str],
+                                 sentences_per_term: int = 5,
+                                 add_variations: bool = True,
+                                 output_dir: str = None,
+                                 shard_size: int = DEFAULT_SHARD_SIZE,
+                                 shuffle_buffer_size: int = DEFAULT_SHUFFLE_BUFFER,
+                                 seed: int = None,
+                                 progress_callback: Callable[[str, int, int], None] = None,
+                                 cancel_event=None,
+                                 n_workers: int = None,
+                                 multi_slot_examples: int = 0,
+                                 deduplicate: bool = False,
+                                 near_duplicates: bool = False,
+                                 max_terms_per_type: int = None) -> Dict[str, Any]:
+        """
+        Génère les données d'entraînement directement dans des fragments JSONL
+        
+        Les exemples sont produits à la demande, mélangés dans un tampon borné
+        puis écrits dans des fichiers de shard_size exemples : la mémoire
+        reste constante quelle que soit la taille du jeu de données.
+        
+        Args:
+            entity_files (Dict[str, str]): Dictionnaire {type_entité: chemin_fichier}
+            sentences_per_term (int): Nombre de phrases à générer par terme
+            add_variations (bool): Ajouter des variations contextuelles
+            output_dir (str): Dossier des fragments (défaut : data/training_shards_<date>)
+            shard_size (int): Nombre d'exemples par fragment
+            shuffle_buffer_size (int): Taille du tampon de mélange
+            seed (int): Graine de la génération et du mélange (None : aléatoire)
+            progress_callback (Callable): Appelée avec (type d'entité, termes
+                traités, nombre de termes du type)
+            cancel_event (threading.Event): Annule la génération lorsqu'il est
+                activé (lève GenerationCancelled)
+            n_workers (int): Nombre de processus (None : un seul)
+            multi_slot_examples (int): Nombre de phrases à plusieurs entités
+                ajoutées à partir des templates chargés
+            deduplicate (bool): Retire les exemples identiques ; désactivé par
+                défaut car l'index grandit avec le jeu de données (environ
+                100 octets par exemple)
+            near_duplicates (bool): Retire aussi les quasi-doublons (MinHash)
+            max_terms_per_type (int): Nombre maximum de termes tirés de chaque
+                fichier (None : tous les termes)
+            
+        Returns:
+            Dict: Manifeste (fragments, nombre d'exemples, statistiques)
+        """
+        if output_dir is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_dir = Path("data") / f"training_shards_{timestamp}"
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        generation_stats = {}
+        if seed is None and not n_workers:
+            examples = self.iter_training_examples(
+                entity_files, sentences_per_term, add_variations,
+                progress_callback=progress_callback, cancel_event=cancel_event,
+                generation_stats=generation_stats, max_terms_per_type=max_terms_per_type
+            )
+            multi_slot_rng = random
+        else:
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            examples = itertools.chain.from_iterable(self.iter_training_partitions(
+                entity_files, sentences_per_term, add_variations, seed, n_workers or 1,
+                progress_callback=progress_callback, cancel_event=cancel_event,
+                generation_stats=generation_stats, max_terms_per_type=max_terms_per_type
+            ))
+            multi_slot_rng = random.Random(f"{seed}:{self.MULTI_SLOT_STATS_KEY}")
+        examples = itertools.chain(examples, self.iter_multi_slot_examples(
+            entity_files, multi_slot_examples, multi_slot_rng, cancel_event, generation_stats,
+            max_terms_per_type
+        ))
+        deduplicator = ExampleDeduplicator(near_duplicates) if deduplicate else None
+        if deduplicator:
+            examples = deduplicator.filter(examples)
+        
+        shards = []
+        total_examples = 0
+        shard_file = None
+        try:
+            for example in self.shuffle_with_buffer(examples, shuffle_buffer_size, random.Random(seed)):
+                if total_examples % shard_size == 0:
+                    if shard_file:
+                        shard_file.close()
+                    shard_name = f"shard_{len(shards):05d}{SHARD_SUFFIX}"
+                    shards.append(shard_name)
+                    shard_file = open(output_dir / shard_name, 'w', encoding='utf-8')
+                
+                text, annotations = example
+                shard_file.write(json.dumps({"text": text, "entities": annotations["entities"]},
+                                            ensure_ascii=False))
+                shard_file.write("\n")
+                total_examples += 1
+        finally:
+            if shard_file:
+                shard_file.close()
+        
+        if deduplicator:
+            print(deduplicator.format_report())
+            generation_stats[self.DEDUP_STATS_KEY] = deduplicator.report()
+        
+        manifest = {
+            'shards': shards,
+            'shard_size': shard_size,
+            'total_examples': total_examples,
+            'generation_stats': generation_stats,
+            'seed': seed,
+            'creation_date': datetime.now().isoformat()
+        }
+        with open(output_dir / SHARD_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        
+        print(f"\n🎯 Génération terminée: {total_examples} exemples écrits dans {len(shards)} fragment(s) ({output_dir})")
+        return manifest
+    
+    @staticmethod
+    def iter_shard_examples(shards_dir: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Relit à la demande les exemples d'un dossier de fragments JSONL
+        
+        Args:
+            shards_dir (str): Dossier produit par generate_training_shards
+            
+        Yields:
+            Tuple[str, Dict]: Exemple au format SpaCy
+        """
+        shards_dir = Path(shards_dir)
+        with open(shards_dir / SHARD_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        
+        for shard_name in manifest['shards']:
+            with open(shards_dir / shard_name, 'r', encoding='utf-8') as f:
+                for line in f:
+                    item = json.loads(line)
+                    yield item['text'], {"entities": [tuple(ent) for ent in item['entities']]}
+    
+    @staticmethod
+    def iter_training_file(filepath: str,
+                           progress_callback: Callable[[int, int], None] = None,
+                           cancel_event=None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Relit en flux un fichier d'exemples JSON (liste) ou JSON Lines
+        
+        Le fichier est lu par blocs de STREAM_CHUNK_SIZE octets et les
+        exemples sont décodés un par un : ni le fichier ni la liste complète
+        ne sont gardés en mémoire. Les éléments sans 'text' ou 'entities'
+        sont ignorés.
+        
+        Args:
+            filepath (str): Fichier .json (liste d'exemples) ou .jsonl
+            progress_callback (Callable): Appelée avec (octets lus, taille du fichier)
+            cancel_event (threading.Event): Interrompt la lecture lorsqu'il est
+                activé (lève GenerationCancelled)
+            
+        Yields:
+            Tuple[str, Dict]: Exemple au format SpaCy
+            
+        Raises:
+            ValueError: Si le fichier n'est ni une liste JSON ni du JSON Lines
+        """
+        total_size = Path(filepath).stat().st_size
+        
+        with open(filepath, 'rb') as f:
+            # Liste JSON classique ou un objet par ligne (JSON Lines)
+            is_array = f.read(STREAM_CHUNK_SIZE).lstrip()[:1] == b'['
+            f.seek(0)
+            
+            if is_array:
+                items = TrainingDataGenerator._iter_json_array(f, filepath, total_size,
+                                                               progress_callback, cancel_event)
+            else:
+                items = TrainingDataGenerator._iter_json_lines(f, filepath, total_size,
+                                                               progress_callback, cancel_event)
+            for item in items:
+                if isinstance(item, dict) and 'text' in item and 'entities' in item:
+                    yield item['text'], {"entities": [tuple(ent) for ent in item['entities']]}
+                elif not isinstance(item, dict):
+                    raise ValueError("Le fichier doit contenir une liste d'exemples ou un exemple JSON par ligne.")
+    
+    @staticmethod
+    def _check_stream_progress(bytes_read: int, total_size: int,
+                               progress_callback: Callable[[int, int], None] = None,
+                               cancel_event=None):
+        """
+        Signale l'avancement d'une lecture en flux et vérifie son annulation
+        
+        Args:
+            bytes_read (int): Octets lus depuis le début du fichier
+            total_size (int): Taille du fichier
+            progress_callback (Callable): Appelée avec (octets lus, taille du fichier)
+            cancel_event (threading.Event): Lève GenerationCancelled s'il est activé
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            raise GenerationCancelled("Chargement annulé")
+        if progress_callback:
+            progress_callback(bytes_read, total_size)
+    
+    @staticmethod
+    def _iter_json_lines(f, filepath: str, total_size: int,
+                         progress_callback: Callable[[int, int], None] = None,
+                         cancel_event=None) -> Iterator[Any]:
+        """
+        Décode un fichier JSON Lines ligne par ligne
+        
+        Chaque ligne est un document complet : une erreur de décodage est
+        une vraie erreur et non un exemple coupé.
+        
+        Args:
+            f: Fichier ouvert en binaire
+            filepath (str): Chemin du fichier (pour les messages d'erreur)
+            total_size (int): Taille du fichier
+            progress_callback (Callable): Appelée avec (octets lus, taille du fichier)
+            cancel_event (threading.Event): Interrompt la lecture lorsqu'il est activé
+        
+        Yields:
+            Any: Valeur JSON de chaque ligne non vide
+        
+        Raises:
+            ValueError: Si une ligne n'est pas un document JSON valide
+        """
+        bytes_read = 0
+        next_report = STREAM_CHUNK_SIZE
+        for line_number, line in enumerate(f, 1):
+            bytes_read += len(line)
+            if bytes_read >= next_report:
+                next_report = bytes_read + STREAM_CHUNK_SIZE
+                TrainingDataGenerator._check_stream_progress(bytes_read, total_size,
+                                                             progress_callback, cancel_event)
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise ValueError(f"Ligne {line_number} invalide dans {filepath} : {e}")
+        
+        TrainingDataGenerator._check_stream_progress(bytes_read, total_size,
+                                                     progress_callback, cancel_event)
+    
+    @staticmethod
+    def _iter_json_array(f, filepath: str, total_size: int,
+                         progress_callback: Callable[[int, int], None] = None,
+                         cancel_event=None) -> Iterator[Any]:
+        """
+        Décode en flux les éléments d'une liste JSON
+        
+        Un élément qui ne se décode pas est supposé coupé en fin de bloc et
+        le bloc suivant est lu, dans la limite de MAX_ITEM_BYTES octets par
+        élément : un élément invalide n'entraîne pas la lecture de tout le
+        reste du fichier.
+        
+        Args:
+            f: Fichier ouvert en binaire
+            filepath (str): Chemin du fichier (pour les messages d'erreur)
+            total_size (int): Taille du fichier
+            progress_callback (Callable): Appelée avec (octets lus, taille du fichier)
+            cancel_event (threading.Event): Interrompt la lecture lorsqu'il est activé
+        
+        Yields:
+            Any: Éléments de la liste
+        
+        Raises:
+            ValueError: Si la liste est invalide, tronquée ou contient un
+                élément de plus de MAX_ITEM_BYTES octets
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ""
+        position = 0
+        # Octets des parties du tampon déjà retirées
+        buffer_offset = 0
+        bytes_read = 0
+        eof = False
+        started = False
+        
+        def read_chunk():
+            nonlocal buffer, position, buffer_offset, bytes_read, eof
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            bytes_read += len(chunk)
+            eof = not chunk
+            buffer_offset += len(buffer[:position].encode('utf-8'))
+            buffer = buffer[position:] + text_decoder.decode(chunk, final=eof)
+            position = 0
+            TrainingDataGenerator._check_stream_progress(bytes_read, total_size,
+                                                         progress_callback, cancel_event)
+        
+        while True:
+            # Saute les blancs et les séparateurs entre deux éléments
+            while True:
+                while position < len(buffer) and (buffer[position].isspace()
+                                                  or (started and buffer[position] == ',')):
+                    position += 1
+                if position < len(buffer) or eof:
+                    break
+                read_chunk()
+            
+            if position >= len(buffer):
+                break
+            if not started:
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                break
+            
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Élément coupé en fin de bloc : lit la suite, dans la limite de MAX_ITEM_BYTES
+                item_offset = buffer_offset + len(buffer[:position].encode('utf-8'))
+                if eof:
+                    raise ValueError(f"Fichier JSON invalide ou tronqué : {filepath} "
+                                     f"(élément à l'octet {item_offset})")
+                if len(buffer[position:].encode('utf-8')) > MAX_ITEM_BYTES:
+                    raise ValueError(f"Élément invalide ou de plus de {MAX_ITEM_BYTES} octets "
+                                     f"dans {filepath} (octet {item_offset})")
+                read_chunk()
+                continue
+            
+            position = end
+            yield item
+    
     def save_training_data(self, training_data: List[Tuple[str, Dict]], 
                       filename: str = None) -> str:
     # """
-    # Sauvegarde les données d'entraînement au format JSON
+    # Sauvegarde les données d'entraînement au format JSON (JSON Lines si filename finit par .jsonl)
     
     # Args:
     #     training_data: Données d'entraînement générées
@@ -335,9 +1595,15 @@ class TrainingDataGenerator:
             if not json_data:
                 raise ValueError("Aucune donnée valide à sauvegarder")
         
-            # Sauvegarde au format JSON standard
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
+                if filepath.suffix == JSONL_SUFFIX:
+                    # JSON Lines : relisible en flux par iter_training_file
+                    for item in json_data:
+                        f.write(json.dumps(item, ensure_ascii=False))
+                        f.write("\n")
+                else:
+                    # Sauvegarde au format JSON standard
+                    json.dump(json_data, f, indent=2, ensure_ascii=False)
         
             print(f"💾 {len(json_data)} exemples sauvegardés dans: {filepath}")
             return str(filepath)
@@ -345,14 +1611,98 @@ class TrainingDataGenerator:
         except Exception as e:
             raise Exception(f"Erreur lors de la sauvegarde: {e}")
     
+    def save_training_docbin(self, training_data: List[Tuple[str, Dict]],
+                             filename: str = None, lang: str = "fr") -> str:
+        """
+        Sauvegarde les données d'entraînement au format binaire DocBin
+        
+        Les textes sont tokenisés une seule fois ici : le trainer relit
+        directement les tokens et les entités, sans repasser par le
+        tokenizer. Le format JSON reste celui des échanges.
+        
+        Args:
+            training_data: Données d'entraînement générées
+            filename: Nom du fichier dans data/ ou chemin absolu (généré
+                automatiquement si None)
+            lang: Langue du tokenizer (doit correspondre au modèle de base)
+            
+        Returns:
+            str: Chemin du fichier sauvegardé
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"training_data_{timestamp}{DOCBIN_SUFFIX}"
+        
+        data_dir = Path("data")
+        data_dir.mkdir(exist_ok=True)
+        filepath = data_dir / filename
+        
+        tokenizer = spacy.blank(lang).tokenizer
+        doc_bin = DocBin(attrs=["ORTH", "SPACY", "ENT_IOB", "ENT_TYPE"])
+        misaligned = 0
+        
+        texts = (text for text, _ in training_data)
+        for doc, (text, annotations) in zip(tokenizer.pipe(texts, batch_size=1000), training_data):
+            spans = []
+            missing = []
+            for start, end, label in annotations["entities"]:
+                span = doc.char_span(start, end, label=label)
+                if span is not None:
+                    spans.append(span)
+                    continue
+                # Comme Example.from_dict : les tokens d'une entité mal alignée restent inconnus
+                misaligned += 1
+                covering = doc.char_span(start, end, alignment_mode="expand")
+                if covering is not None:
+                    missing.append(covering)
+            entities = filter_spans(spans)
+            try:
+                doc.set_ents(entities, missing=missing, default="outside")
+            except ValueError:
+                doc.set_ents(entities, default="outside")
+            doc_bin.add(doc)
+        
+        doc_bin.to_disk(filepath)
+        if misaligned:
+            print(f"⚠️ {misaligned} entités non alignées sur les tokens ont été ignorées")
+        print(f"💾 {len(doc_bin)} exemples sauvegardés (DocBin) dans: {filepath}")
+        return str(filepath)
+    
+    @staticmethod
+    def load_training_docbin(filepath: str, limit: int = None,
+                             deduplicator: ExampleDeduplicator = None) -> List[Tuple[str, Dict]]:
+        """
+        Relit un fichier DocBin au format (texte, {"entities": [...]})
+        
+        Args:
+            filepath: Chemin vers le fichier .spacy
+            limit: Nombre maximum d'exemples (None = tous)
+            deduplicator: Index de dédoublonnage (None = tous les exemples sont gardés)
+            
+        Returns:
+            List[Tuple[str, Dict]]: Exemples avec les positions des entités en caractères
+        """
+        vocab = spacy.blank("xx").vocab
+        training_data = []
+        for doc in DocBin().from_disk(filepath).get_docs(vocab):
+            if limit is not None and len(training_data) >= limit:
+                break
+            annotations = {"entities": [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]}
+            if deduplicator is None or deduplicator.add(doc.text, annotations):
+                training_data.append((doc.text, annotations))
+        return training_data
+    
     def preview_training_data(self, training_data: List[Tuple[str, Dict]], 
-                            max_examples: int = 10) -> str:
+                            max_examples: int = 10,
+                            statistics: Dict[str, Any] = None) -> str:
         """
         Génère un aperçu des données d'entraînement pour prévisualisation
         
         Args:
             training_data: Données d'entraînement
             max_examples: Nombre maximum d'exemples à afficher
+            statistics: Statistiques déjà calculées sur le corpus complet
+                (corpus lu en flux dont training_data n'est qu'un extrait)
             
         Returns:
             str: Texte de prévisualisation formaté
@@ -362,7 +1712,11 @@ class TrainingDataGenerator:
         
         preview_text = f"📊 APERÇU DES DONNÉES D'ENTRAÎNEMENT\n"
         preview_text += f"{'='*50}\n\n"
-        preview_text += f"Total d'exemples générés: {len(training_data)}\n\n"
+        if statistics is None:
+            # Statistiques calculées une seule fois pour cette liste (voir get_training_statistics)
+            statistics = self.get_training_statistics(training_data)
+        
+        preview_text += f"Total d'exemples générés: {statistics['total_examples']}\n\n"
         
         # Affiche quelques exemples
         preview_text += f"🔍 EXEMPLES ({min(max_examples, len(training_data))} premiers):\n"
@@ -382,72 +1736,165 @@ class TrainingDataGenerator:
             
             preview_text += "\n"
         
-        # Statistiques par type d'entité
-        entity_stats = {}
-        for sentence, annotations in training_data:
-            for start, end, label in annotations["entities"]:
-                entity_stats[label] = entity_stats.get(label, 0) + 1
+        length_stats = statistics['sentence_length_stats']
+        preview_text += f"📏 LONGUEUR DES PHRASES (mots): min {length_stats['min']}, "
+        preview_text += f"moyenne {length_stats['avg']:.1f}, max {length_stats['max']}\n\n"
         
-        if entity_stats:
+        if statistics['entity_distribution']:
             preview_text += f"📈 STATISTIQUES PAR TYPE D'ENTITÉ:\n"
             preview_text += f"{'-'*30}\n"
-            for entity_type, count in sorted(entity_stats.items()):
+            for entity_type, count in sorted(statistics['entity_distribution'].items()):
                 preview_text += f"{entity_type}: {count} occurrences\n"
         
+        if statistics['invalid_examples']:
+            preview_text += f"\n⚠️ {statistics['invalid_examples']} exemple(s) avec des entités invalides "
+            preview_text += f"ou qui se chevauchent\n"
+        
         return preview_text
     
-    def validate_training_data(self, training_data: List[Tuple[str, Dict]]) -> Dict[str, Any]:
+    def get_training_statistics(self, training_data: List[Tuple[str, Dict]]) -> Dict[str, Any]:
         """
-        Valide la qualité des données d'entraînement générées
+        Retourne les statistiques d'une liste d'exemples, en les mettant en cache
+        
+        Le cache est lié à la liste (sans la référencer) : les aperçus
+        successifs des mêmes données ne reparcourent pas le corpus. Il est
+        recalculé si la liste est remplacée ou si sa taille change.
         
         Args:
-            training_data: Données à valider
+            training_data: Données d'entraînement
             
         Returns:
-            Dict: Rapport de validation avec statistiques et erreurs
+            Dict: Statistiques (voir compute_training_statistics)
         """
-        validation_report = {
-            'total_examples': len(training_data),
-            'valid_examples': 0,
-            'invalid_examples': 0,
-            'errors': [],
-            'entity_distribution': {},
+        key = self._statistics_key(training_data)
+        cached = self._statistics_cache
+        # Identifiant et taille comparés par valeur, exemples par identité
+        if cached is None or cached[0][:2] != key[:2] or \
+                any(a is not b for a, b in zip(cached[0][2:], key[2:])):
+            cached = (key, self.compute_training_statistics(training_data))
+            self._statistics_cache = cached
+        return cached[1]
+    
+    def compute_training_statistics(self, training_data: Iterable[Tuple[str, Dict]],
+                                    check_alignment: bool = False,
+                                    lang: str = "fr") -> Dict[str, Any]:
+        """
+        Calcule en un seul passage les statistiques et les erreurs d'un corpus
+        
+        Les exemples sont lus en flux (liste, générateur ou fragments JSONL) :
+        seules les longueurs et les identifiants d'étiquettes sont conservés,
+        dans des tableaux compacts agrégés ensuite par NumPy.
+        
+        Args:
+            training_data: Exemples au format SpaCy (tout itérable)
+            check_alignment (bool): Vérifie que chaque entité tombe sur des
+                frontières de tokens SpaCy (tokenisation de tous les textes)
+            lang (str): Langue du tokenizer utilisé pour l'alignement
+            
+        Returns:
+            Dict: Nombre d'exemples et d'entités, exemples invalides, entités
+                invalides, chevauchantes ou mal alignées, distribution et
+                longueur moyenne (caractères) des entités par type, statistiques
+                de longueur des phrases (mots) et premières erreurs
+        """
+        sentence_lengths = array('I')
+        entity_label_ids = array('I')
+        entity_lengths = array('I')
+        label_ids = {}
+        errors = []
+        counters = {'invalid_examples': 0, 'invalid_positions': 0,
+                    'overlapping_entities': 0, 'misaligned_entities': 0}
+        
+        def report_error(message):
+            if len(errors) < self.MAX_REPORTED_ERRORS:
+                errors.append(message)
+        
+        tokenizer = spacy.blank(lang).tokenizer if check_alignment else None
+        examples = iter(training_data)
+        index = 0
+        while True:
+            batch = list(itertools.islice(examples, self.STATISTICS_BATCH_SIZE))
+            if not batch:
+                break
+            docs = tokenizer.pipe(text for text, _ in batch) if tokenizer else itertools.repeat(None)
+            
+            for (sentence, annotations), doc in zip(batch, docs):
+                sentence_lengths.append(len(sentence.split()))
+                is_valid = True
+                previous_end = 0
+                
+                for start, end, label in sorted(annotations.get("entities", [])):
+                    entity_label_ids.append(label_ids.setdefault(label, len(label_ids)))
+                    entity_lengths.append(max(0, end - start))
+                    
+                    # Vérifie que les positions sont valides
+                    if start < 0 or start >= end or end > len(sentence):
+                        counters['invalid_positions'] += 1
+                        report_error(f"Exemple {index}: Position d'entité invalide ({start}-{end})")
+                        is_valid = False
+                        continue
+                    if start < previous_end:
+                        counters['overlapping_entities'] += 1
+                        report_error(f"Exemple {index}: Entités qui se chevauchent ({start}-{end}, {label})")
+                        is_valid = False
+                    elif doc is not None and doc.char_span(start, end) is None:
+                        counters['misaligned_entities'] += 1
+                        report_error(f"Exemple {index}: '{sentence[start:end]}' ({label}) ne correspond "
+                                     f"pas à des frontières de tokens")
+                        is_valid = False
+                    previous_end = max(previous_end, end)
+                
+                if not is_valid:
+                    counters['invalid_examples'] += 1
+                index += 1
+        
+        lengths = np.frombuffer(sentence_lengths, dtype=np.uintc) if sentence_lengths else np.zeros(1, dtype=np.uintc)
+        labels = np.frombuffer(entity_label_ids, dtype=np.uintc)
+        entity_counts = np.bincount(labels, minlength=len(label_ids))
+        entity_char_totals = np.bincount(labels, weights=np.frombuffer(entity_lengths, dtype=np.uintc),
+                                         minlength=len(label_ids))
+        
+        statistics = {
+            'total_examples': index,
+            'total_entities': int(labels.size),
+            'entity_distribution': {label: int(entity_counts[label_id]) for label, label_id in label_ids.items()},
+            'entity_length_stats': {label: float(entity_char_totals[label_id] / entity_counts[label_id])
+                                    for label, label_id in label_ids.items()},
             'sentence_length_stats': {
-                'min': float('inf'),
-                'max': 0,
-                'avg': 0
-            }
+                'min': int(lengths.min()),
+                'max': int(lengths.max()),
+                'avg': float(lengths.mean()),
+                'median': float(np.median(lengths)),
+                'p95': float(np.percentile(lengths, 95))
+            },
+            'errors': errors
         }
+        statistics.update(counters)
+        return statistics
+    
+    def validate_training_data(self, training_data: Iterable[Tuple[str, Dict]],
+                               check_alignment: bool = True,
+                               lang: str = "fr") -> Dict[str, Any]:
+        """
+        Valide la qualité des données d'entraînement générées
         
-        sentence_lengths = []
-        
-        for i, (sentence, annotations) in enumerate(training_data):
-            is_valid = True
-            sentence_length = len(sentence.split())
-            sentence_lengths.append(sentence_length)
-            
-            # Vérifie que les annotations sont cohérentes
-            for start, end, label in annotations.get("entities", []):
-                # Vérifie que les positions sont valides
-                if start >= end or end > len(sentence):
-                    validation_report['errors'].append(
-                        f"Exemple {i}: Position d'entité invalide ({start}-{end})"
-                    )
-                    is_valid = False
-                
-                # Compte les entités par type
-                validation_report['entity_distribution'][label] = \
-                    validation_report['entity_distribution'].get(label, 0) + 1
+        Un exemple est invalide si une entité sort de la phrase, en chevauche
+        une autre ou (avec check_alignment) ne tombe pas sur des frontières
+        de tokens : SpaCy ignorerait alors l'entité à l'entraînement.
+        
+        Args:
+            training_data: Données à valider (tout itérable, lu une seule fois)
+            check_alignment (bool): Vérifie l'alignement sur les tokens SpaCy
+            lang (str): Langue du tokenizer utilisé pour l'alignement
             
-            if is_valid:
-                validation_report['valid_examples'] += 1
-            else:
-                validation_report['invalid_examples'] += 1
+        Returns:
+            Dict: Rapport de validation avec statistiques et erreurs
+                (seules les MAX_REPORTED_ERRORS premières sont détaillées)
+        """
+        validation_report = self.compute_training_statistics(training_data, check_alignment, lang)
+        validation_report['valid_examples'] = validation_report['total_examples'] - validation_report['invalid_examples']
         
-        # Calcule les statistiques de longueur
-        if sentence_lengths:
-            validation_report['sentence_length_stats']['min'] = min(sentence_lengths)
-            validation_report['sentence_length_stats']['max'] = max(sentence_lengths)
-            validation_report['sentence_length_stats']['avg'] = sum(sentence_lengths) / len(sentence_lengths)
+        if isinstance(training_data, list):
+            self._statistics_cache = (self._statistics_key(training_data), validation_report)
         
         return validation_report
\ No newline at end of file
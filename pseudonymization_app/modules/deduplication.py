@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dédoublonnage des exemples d'entraînement
+=========================================
+
+Ce module retire les exemples identiques (même texte et mêmes entités)
+produits par la génération ou présents dans un corpus chargé : un doublon
+coûte du temps à chaque époque d'entraînement sans rien apporter.
+
+Les doublons exacts sont repérés par une empreinte de 16 octets par
+exemple. Un filtre optionnel de quasi-doublons (MinHash et LSH sur les
+trigrammes de mots) retire aussi les phrases presque identiques portant
+les mêmes entités.
+"""
+
+import hashlib
+import zlib
+import numpy as np
+from typing import List, Dict, Tuple, Any, Iterable, Iterator
+
+# Nombre de permutations de la signature MinHash
+MINHASH_PERMUTATIONS = 64
+# Découpage de la signature en bandes pour le LSH : deux phrases sont
+# comparées si une bande est identique. Avec 4 bandes de 16 valeurs, le
+# seuil de similarité (Jaccard) est d'environ (1/4) ** (1/16) ≈ 0.92
+MINHASH_BANDS = 4
+# Nombre de mots par fragment (shingle) comparé
+SHINGLE_SIZE = 3
+# Part minimale de valeurs communes entre deux signatures (similarité de
+# Jaccard estimée) pour qu'un exemple rapproché par le LSH soit retiré
+MINHASH_THRESHOLD = 0.9
+
+
+class ExampleDeduplicator:
+    """
+    Index des exemples déjà vus, à utiliser pendant la génération ou le chargement
+    
+    Le premier exemple rencontré est conservé, les suivants identiques sont
+    retirés : le résultat ne dépend que de l'ordre des exemples.
+    """
+    
+    def __init__(self, near_duplicates: bool = False):
+        """
+        Initialise un index vide
+        
+        Args:
+            near_duplicates (bool): Retire aussi les quasi-doublons (MinHash)
+        """
+        self.near_duplicates = near_duplicates
+        self.seen_hashes = set()
+        # Pour chaque bande : clé (bande de signature et entités) → indices des signatures
+        self.band_buckets = [{} for _ in range(MINHASH_BANDS)]
+        self.signatures = np.zeros((0, MINHASH_PERMUTATIONS), dtype=np.uint32)
+        self.signature_count = 0
+        
+        self.examined = 0
+        self.exact_duplicates = 0
+        self.near_duplicates_removed = 0
+        
+        # Permutations fixes : les signatures sont comparables d'un index à l'autre
+        permutation_rng = np.random.default_rng(1)
+        self._perm_a = permutation_rng.integers(0, 1 << 64, MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+        self._perm_b = permutation_rng.integers(0, 1 << 64, MINHASH_PERMUTATIONS, dtype=np.uint64)
+    
+    @staticmethod
+    def example_hash(text: str, annotations: Dict[str, List]) -> bytes:
+        """
+        Calcule l'empreinte d'un exemple (texte et entités)
+        
+        Args:
+            text (str): Texte de l'exemple
+            annotations (Dict): Annotations SpaCy ({"entities": [...]})
+        
+        Returns:
+            bytes: Empreinte de 16 octets
+        """
+        entities = "|".join(f"{start}:{end}:{label}" for start, end, label in annotations.get("entities", []))
+        return hashlib.blake2b(f"{text}\0{entities}".encode('utf-8'), digest_size=16).digest()
+    
+    def minhash_signature(self, text: str) -> np.ndarray:
+        """
+        Calcule la signature MinHash des trigrammes de mots d'un texte
+        
+        Args:
+            text (str): Texte à signer
+        
+        Returns:
+            np.ndarray: Signature de MINHASH_PERMUTATIONS valeurs
+        """
+        words = text.lower().split()
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE])
+                    for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # Hachage multiply-shift (a * h + b modulo 2**64, bits de poids fort)
+        # pour chaque permutation, puis minimum sur les fragments
+        return ((np.outer(hashes, self._perm_a) + self._perm_b) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+    
+    def _store_signature(self, signature: np.ndarray) -> int:
+        """
+        Conserve une signature pour les comparaisons suivantes
+        
+        Args:
+            signature (np.ndarray): Signature MinHash
+        
+        Returns:
+            int: Indice de la signature
+        """
+        if self.signature_count == len(self.signatures):
+            grown = np.zeros((max(1024, 2 * len(self.signatures)), MINHASH_PERMUTATIONS), dtype=np.uint32)
+            grown[:self.signature_count] = self.signatures[:self.signature_count]
+            self.signatures = grown
+        self.signatures[self.signature_count] = signature
+        self.signature_count += 1
+        return self.signature_count - 1
+    
+    def add(self, text: str, annotations: Dict[str, List]) -> bool:
+        """
+        Ajoute un exemple à l'index
+        
+        Args:
+            text (str): Texte de l'exemple
+            annotations (Dict): Annotations SpaCy
+        
+        Returns:
+            bool: True si l'exemple est nouveau, False si c'est un doublon
+        """
+        self.examined += 1
+        
+        example_hash = self.example_hash(text, annotations)
+        if example_hash in self.seen_hashes:
+            self.exact_duplicates += 1
+            return False
+        
+        if self.near_duplicates:
+            signature = self.minhash_signature(text)
+            # Les entités (positions et labels) font partie de la clé : deux phrases
+            # proches annotées différemment ne sont pas des quasi-doublons
+            entities = "|".join(f"{start}:{end}:{label}" for start, end, label in annotations.get("entities", []))
+            entities_key = entities.encode('utf-8')
+            band_keys = [band.tobytes() + entities_key for band in signature.reshape(MINHASH_BANDS, -1)]
+            
+            candidates = set()
+            for key, bucket in zip(band_keys, self.band_buckets):
+                candidates.update(bucket.get(key, ()))
+            # Une bande commune ne suffit pas : la similarité estimée doit atteindre le seuil
+            if candidates and (self.signatures[list(candidates)] == signature).mean(axis=1).max() >= MINHASH_THRESHOLD:
+                # Les copies exactes suivantes seront comptées comme doublons exacts
+                self.seen_hashes.add(example_hash)
+                self.near_duplicates_removed += 1
+                return False
+            
+            index = self._store_signature(signature)
+            for key, bucket in zip(band_keys, self.band_buckets):
+                bucket.setdefault(key, []).append(index)
+        
+        self.seen_hashes.add(example_hash)
+        return True
+    
+    def filter(self, examples: Iterable[Tuple[str, Dict]]) -> Iterator[Tuple[str, Dict]]:
+        """
+        Ne laisse passer que les exemples nouveaux, sans accumuler le flux
+        
+        Args:
+            examples (Iterable): Exemples au format SpaCy
+        
+        Yields:
+            Tuple[str, Dict]: Exemples qui ne sont pas des doublons
+        """
+        for text, annotations in examples:
+            if self.add(text, annotations):
+                yield text, annotations
+    
+    def deduplicate(self, examples: Iterable[Tuple[str, Dict]]) -> List[Tuple[str, Dict]]:
+        """
+        Retire les doublons d'une liste d'exemples et affiche le bilan
+        
+        Args:
+            examples (Iterable): Exemples au format SpaCy
+        
+        Returns:
+            List[Tuple[str, Dict]]: Exemples conservés, dans leur ordre d'origine
+        """
+        kept = list(self.filter(examples))
+        print(self.format_report())
+        return kept
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Retourne le bilan du dédoublonnage
+        
+        Returns:
+            Dict: Exemples examinés, conservés et retirés (exacts et quasi-doublons)
+        """
+        removed = self.exact_duplicates + self.near_duplicates_removed
+        return {
+            'examined': self.examined,
+            'kept': self.examined - removed,
+            'exact_duplicates': self.exact_duplicates,
+            'near_duplicates': self.near_duplicates_removed,
+            'removed': removed
+        }
+    
+    def format_report(self) -> str:
+        """
+        Résume le bilan du dédoublonnage en une ligne
+        
+        Returns:
+            str: Message affichable
+        """
+        report = self.report()
+        message = (f"🧹 Dédoublonnage : {report['removed']} exemple(s) retiré(s) sur {report['examined']} "
+                   f"({report['exact_duplicates']} doublon(s) exact(s)")
+        if self.near_duplicates:
+            message += f", {report['near_duplicates']} quasi-doublon(s)"
+        return message + ")"
@@ -19,7 +19,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
 import sys
-import json
+import time
 import threading
 from pathlib import Path
 from datetime import datetime
@@ -29,10 +29,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
 # Import des modules personnalisés
 try:
-    from data_generator import TrainingDataGenerator
+    from data_generator import TrainingDataGenerator, GenerationCancelled, DOCBIN_SUFFIX, JSONL_SUFFIX, GENERATION_CACHE_DIR
     from model_trainer import SpacyModelTrainer
-    from pseudonymizer import TextPseudonymizer
+    from pseudonymizer import TextPseudonymizer, OperationCancelled
     from utils import AppUtils
+    from text_viewer import PagedTextViewer
+    from deduplication import ExampleDeduplicator
 except ImportError as e:
     print(f"Erreur d'import des modules: {e}")
     print("Assurez-vous que tous les modules sont présents dans le dossier 'modules'")
@@ -65,9 +67,21 @@ class PseudonymizationApp:
         self.trained_model_path = ""
         self.entity_files = {}
         self.generated_training_data = None
+        self.training_docbin_path = ""  # Corpus binaire correspondant aux données courantes
+        self.training_stream_path = ""  # Fichier JSON/JSONL relu en flux à l'entraînement
         self.pseudonymizer = None
         self.correspondence_file_path = ""
         self.training_in_progress = False
+        self.model_loading = False
+        self.model_load_token = 0  # Ignore les préchargements devenus obsolètes
+        self.text_operation_in_progress = False
+        self.operation_cancel_event = threading.Event()
+        self.generation_in_progress = False
+        self.generation_cancel_event = threading.Event()
+        self.generation_dialog = None
+        self.loading_in_progress = False
+        self.loading_cancel_event = threading.Event()
+        self.loading_dialog = None
         
         # Initialisation des modules
         self.data_generator = TrainingDataGenerator()
@@ -152,6 +166,9 @@ class PseudonymizationApp:
         add_file_button = tk.Button(import_frame, text="Ajouter Fichier de Termes", command=self.add_terms_file, bg="#4CAF50", fg="white")
         add_file_button.pack(pady=5)
         
+        add_templates_button = tk.Button(import_frame, text="Ajouter Fichier de Phrases Types (multi-entités)", command=self.add_templates_file, bg="#4CAF50", fg="white")
+        add_templates_button.pack(pady=5)
+        
         self.imported_files_list = tk.Listbox(import_frame, height=5)
         self.imported_files_list.pack(fill=tk.X, padx=10, pady=5)
         
@@ -166,8 +183,33 @@ class PseudonymizationApp:
         sentences_spinbox = tk.Spinbox(sentences_frame, from_=1, to=50, textvariable=self.sentences_per_term, width=10)
         sentences_spinbox.pack(side=tk.LEFT, padx=5)
         
-        generate_button = tk.Button(data_gen_frame, text="Générer Données d'Entraînement", command=self.generate_training_data, bg="#FF9800", fg="white", font=("Arial", 12))
-        generate_button.pack(pady=20)
+        max_terms_frame = tk.Frame(params_frame)
+        max_terms_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(max_terms_frame, text="Termes max par entité (0 = tous):").pack(side=tk.LEFT)
+        self.max_terms_per_type = tk.IntVar(value=0)
+        tk.Spinbox(max_terms_frame, from_=0, to=10_000_000, increment=1000, textvariable=self.max_terms_per_type, width=10).pack(side=tk.LEFT, padx=5)
+        
+        multi_slot_frame = tk.Frame(params_frame)
+        multi_slot_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(multi_slot_frame, text="Nombre de phrases multi-entités:").pack(side=tk.LEFT)
+        self.multi_slot_examples = tk.IntVar(value=1000)
+        tk.Spinbox(multi_slot_frame, from_=0, to=1_000_000, increment=500, textvariable=self.multi_slot_examples, width=10).pack(side=tk.LEFT, padx=5)
+        
+        seed_frame = tk.Frame(params_frame)
+        seed_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(seed_frame, text="Graine (vide = aléatoire, sans cache):").pack(side=tk.LEFT)
+        self.generation_seed = tk.StringVar(value="")
+        tk.Entry(seed_frame, textvariable=self.generation_seed, width=12).pack(side=tk.LEFT, padx=5)
+        tk.Button(seed_frame, text="Vider le cache", command=self.clear_generation_cache).pack(side=tk.LEFT, padx=5)
+        
+        self.remove_near_duplicates = tk.BooleanVar(value=False)
+        tk.Checkbutton(params_frame, text="Retirer aussi les quasi-doublons (MinHash)", variable=self.remove_near_duplicates).pack(anchor=tk.W, padx=10, pady=5)
+        
+        self.generate_button = tk.Button(data_gen_frame, text="Générer Données d'Entraînement", command=self.generate_training_data, bg="#FF9800", fg="white", font=("Arial", 12))
+        self.generate_button.pack(pady=20)
         
         preview_frame = ttk.LabelFrame(data_gen_frame, text="Aperçu des Données Générées")
         preview_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -253,13 +295,22 @@ class PseudonymizationApp:
         input_buttons_frame.pack(fill=tk.X, padx=10, pady=5)
         
         tk.Button(input_buttons_frame, text="Importer Fichier", command=lambda: self.import_text_file(self.input_text), bg="#2196F3", fg="white").pack(side=tk.LEFT, padx=5)
-        tk.Button(input_buttons_frame, text="Effacer", command=lambda: self.input_text.delete(1.0, tk.END), bg="#FF5722", fg="white").pack(side=tk.LEFT, padx=5)
+        tk.Button(input_buttons_frame, text="Effacer", command=lambda: self.input_text.clear(), bg="#FF5722", fg="white").pack(side=tk.LEFT, padx=5)
         
-        self.input_text = scrolledtext.ScrolledText(input_frame, height=8, wrap=tk.WORD)
+        self.input_text = PagedTextViewer(input_frame, height=8, wrap=tk.WORD)
         self.input_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        pseudo_button = tk.Button(pseudo_frame, text="Pseudonymiser", command=self.pseudonymize_text, bg="#FF9800", fg="white", font=("Arial", 12))
-        pseudo_button.pack(pady=10)
+        pseudo_actions_frame = tk.Frame(pseudo_frame)
+        pseudo_actions_frame.pack(pady=10)
+        
+        self.pseudo_button = tk.Button(pseudo_actions_frame, text="Pseudonymiser", command=self.pseudonymize_text, bg="#FF9800", fg="white", font=("Arial", 12))
+        self.pseudo_button.pack(side=tk.LEFT, padx=5)
+        
+        self.pseudo_cancel_button = tk.Button(pseudo_actions_frame, text="Annuler", command=self.cancel_text_operation, bg="#f44336", fg="white", state='disabled')
+        self.pseudo_cancel_button.pack(side=tk.LEFT, padx=5)
+        
+        self.pseudo_progress_var = tk.DoubleVar()
+        ttk.Progressbar(pseudo_actions_frame, variable=self.pseudo_progress_var, maximum=100, length=300).pack(side=tk.LEFT, padx=5)
         
         output_frame = ttk.LabelFrame(pseudo_frame, text="Texte Pseudonymisé")
         output_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -270,7 +321,7 @@ class PseudonymizationApp:
         tk.Button(output_buttons_frame, text="Exporter Fichier", command=lambda: self.export_text_file(self.output_text, "texte_pseudonymise.txt"), bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
         tk.Button(output_buttons_frame, text="Copier vers Dépseudonymisation", command=self.copy_to_depseudo, bg="#9C27B0", fg="white").pack(side=tk.LEFT, padx=5)
         
-        self.output_text = scrolledtext.ScrolledText(output_frame, height=8, wrap=tk.WORD)
+        self.output_text = PagedTextViewer(output_frame, height=8, wrap=tk.WORD)
         self.output_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
     def create_depseudonymization_tab(self):
@@ -298,13 +349,25 @@ class PseudonymizationApp:
         pseudo_buttons_frame.pack(fill=tk.X, padx=10, pady=5)
         
         tk.Button(pseudo_buttons_frame, text="Importer Fichier", command=lambda: self.import_text_file(self.pseudo_input_text), bg="#2196F3", fg="white").pack(side=tk.LEFT, padx=5)
-        tk.Button(pseudo_buttons_frame, text="Effacer", command=lambda: self.pseudo_input_text.delete(1.0, tk.END), bg="#FF5722", fg="white").pack(side=tk.LEFT, padx=5)
+        tk.Button(pseudo_buttons_frame, text="Effacer", command=lambda: self.pseudo_input_text.clear(), bg="#FF5722", fg="white").pack(side=tk.LEFT, padx=5)
         
-        self.pseudo_input_text = scrolledtext.ScrolledText(pseudo_input_frame, height=8, wrap=tk.WORD)
+        self.pseudo_input_text = PagedTextViewer(pseudo_input_frame, height=8, wrap=tk.WORD)
         self.pseudo_input_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        depseudo_button = tk.Button(depseudo_frame, text="Dépseudonymiser", command=self.depseudonymize_text, bg="#9C27B0", fg="white", font=("Arial", 12))
-        depseudo_button.pack(pady=10)
+        depseudo_actions_frame = tk.Frame(depseudo_frame)
+        depseudo_actions_frame.pack(pady=10)
+        
+        self.depseudo_button = tk.Button(depseudo_actions_frame, text="Dépseudonymiser", command=self.depseudonymize_text, bg="#9C27B0", fg="white", font=("Arial", 12))
+        self.depseudo_button.pack(side=tk.LEFT, padx=5)
+        
+        self.depseudo_files_button = tk.Button(depseudo_actions_frame, text="Dépseudonymiser des Fichiers", command=self.depseudonymize_files, bg="#673AB7", fg="white")
+        self.depseudo_files_button.pack(side=tk.LEFT, padx=5)
+        
+        self.depseudo_cancel_button = tk.Button(depseudo_actions_frame, text="Annuler", command=self.cancel_text_operation, bg="#f44336", fg="white", state='disabled')
+        self.depseudo_cancel_button.pack(side=tk.LEFT, padx=5)
+        
+        self.depseudo_progress_var = tk.DoubleVar()
+        ttk.Progressbar(depseudo_actions_frame, variable=self.depseudo_progress_var, maximum=100, length=300).pack(side=tk.LEFT, padx=5)
         
         depseudo_output_frame = ttk.LabelFrame(depseudo_frame, text="Texte Original Restauré")
         depseudo_output_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -314,7 +377,7 @@ class PseudonymizationApp:
         
         tk.Button(restore_buttons_frame, text="Exporter Fichier", command=lambda: self.export_text_file(self.depseudo_output_text, "texte_original.txt"), bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
         
-        self.depseudo_output_text = scrolledtext.ScrolledText(depseudo_output_frame, height=8, wrap=tk.WORD)
+        self.depseudo_output_text = PagedTextViewer(depseudo_output_frame, height=8, wrap=tk.WORD)
         self.depseudo_output_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
     
     # ==============================================================================
@@ -369,76 +432,276 @@ class PseudonymizationApp:
             self.imported_files_list.insert(tk.END, display_text)
             self.update_status(f"Fichier ajouté pour l'entité {selected_entity}")
 
+    def add_templates_file(self):
+        """ Ajoute un fichier de phrases types à plusieurs entités ({NOM} travaille chez {ORG}). """
+        filepath = filedialog.askopenfilename(title="Sélectionner un fichier de phrases types", filetypes=[("Fichiers texte", "*.txt")])
+        if not filepath:
+            return
+        
+        try:
+            added = self.data_generator.load_multi_slot_templates(filepath)
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Impossible de charger les phrases types : {e}")
+            return
+        
+        self.imported_files_list.insert(tk.END, f"Phrases types: {Path(filepath).name} ({added} templates)")
+        self.update_status(f"{added} phrases types multi-entités ajoutées")
+
+    def clear_generation_cache(self):
+        """ Supprime les corpus générés mis en cache (génération avec graine). """
+        if not messagebox.askyesno("Cache de génération", "Supprimer tous les corpus générés mis en cache ?"):
+            return
+        
+        report = TrainingDataGenerator.clear_generation_cache(GENERATION_CACHE_DIR)
+        # Le corpus DocBin courant peut provenir du cache : les exemples en mémoire restent utilisables
+        if self.training_docbin_path and Path(GENERATION_CACHE_DIR).resolve() in Path(self.training_docbin_path).resolve().parents:
+            self.training_docbin_path = ""
+        self.update_status(f"Cache de génération vidé : {report['removed_entries']} corpus, "
+                           f"{report['freed_bytes'] / 1e6:.1f} Mo libérés")
+
     def generate_training_data(self):
-        """ Lance la génération automatique des données d'entraînement. """
+        """ Lance la génération automatique des données d'entraînement (dans un thread séparé). """
         if not self.entity_files:
             messagebox.showwarning("Fichiers manquants", "Veuillez ajouter des fichiers de termes pour vos entités.")
             return
+        if self.generation_in_progress:
+            return
+        
+        seed_text = self.generation_seed.get().strip()
+        if seed_text and not seed_text.isdigit():
+            messagebox.showwarning("Graine invalide", "La graine doit être un entier positif.")
+            return
+        
+        self.generation_in_progress = True
+        self.generation_cancel_event.clear()
+        self.generate_button.config(state='disabled')
+        self.preview_text.delete(1.0, tk.END)
+        self.generation_dialog = ProgressDialog(self.root, "Génération des données d'entraînement...",
+                                                cancel_command=self.cancel_generation)
+        
+        generation_thread = threading.Thread(
+            target=self._run_generation,
+            args=(dict(self.entity_files), self.sentences_per_term.get(), int(seed_text) if seed_text else None,
+                  self.multi_slot_examples.get(), self.remove_near_duplicates.get(),
+                  self.max_terms_per_type.get() or None, self.selected_base_model.get()[:2]),
+            daemon=True
+        )
+        generation_thread.start()
+
+    def _run_generation(self, entity_files, sentences_per_term, seed, multi_slot_examples, near_duplicates, max_terms_per_type, lang):
+        """ Exécute la génération dans un thread pour que le dialogue de progression reste réactif. """
+        entity_types = list(entity_files)
+        
+        def progress_callback(entity_type, processed_terms, total_terms):
+            # Chaque type d'entité occupe une part égale de la barre
+            type_fraction = processed_terms / total_terms if total_terms else 1
+            overall = (entity_types.index(entity_type) + type_fraction) / len(entity_types) * 100
+            detail = f"{entity_type} : {processed_terms}/{total_terms} termes"
+            self.root.after(0, self._update_generation_progress, overall, detail)
+        
+        def preview_callback(examples):
+            self.root.after(0, self._append_generation_preview, examples)
         
         try:
-            progress_dialog = ProgressDialog(self.root, "Génération des données d'entraînement...")
-            self.generated_training_data, stats = self.data_generator.generate_training_data(
-                self.entity_files,
-                sentences_per_term=self.sentences_per_term.get()
+            training_data, stats = self.data_generator.generate_training_data(
+                entity_files,
+                sentences_per_term=sentences_per_term,
+                progress_callback=progress_callback,
+                preview_callback=preview_callback,
+                cancel_event=self.generation_cancel_event,
+                seed=seed,
+                n_workers=os.cpu_count(),  # Résultat identique pour une graine donnée
+                multi_slot_examples=multi_slot_examples,
+                near_duplicates=near_duplicates,
+                max_terms_per_type=max_terms_per_type,
+                cache_dir=GENERATION_CACHE_DIR,  # Avec une graine : demande identique relue du cache
+                lang=lang
             )
-            progress_dialog.destroy()
-            
-            if self.generated_training_data:
-                preview_text = self.data_generator.preview_training_data(self.generated_training_data, max_examples=5)
-                self.preview_text.delete(1.0, tk.END)
-                self.preview_text.insert(1.0, preview_text)
-                
-                if messagebox.askyesno("Sauvegarde", f"{len(self.generated_training_data)} exemples générés.\nVoulez-vous les sauvegarder ?"):
-                    self.save_generated_data()
-                self.update_status(f"Génération terminée : {len(self.generated_training_data)} exemples créés.")
-                self.data_status_label.config(text=f"✅ {len(self.generated_training_data)} exemples prêts", fg="green")
-            else:
-                messagebox.showwarning("Génération échouée", "Aucune donnée n'a pu être générée.")
+            self.root.after(0, self._handle_generation_result, training_data, stats)
+            
+        except GenerationCancelled:
+            self.root.after(0, self._handle_generation_cancelled)
         except Exception as e:
-            messagebox.showerror("Erreur de génération", f"Une erreur est survenue : {e}")
+            self.root.after(0, self._finish_generation)
+            self.root.after(0, lambda err=e: messagebox.showerror("Erreur de génération", f"Une erreur est survenue : {err}"))
+
+    def _update_generation_progress(self, value, detail):
+        """ Met à jour le dialogue de progression de la génération. """
+        if self.generation_dialog is not None:
+            self.generation_dialog.update_progress(value, detail)
+
+    def _append_generation_preview(self, examples):
+        """ Ajoute à l'aperçu les premiers exemples générés pour un type d'entité. """
+        for sentence, annotations in examples:
+            labels = ", ".join(sorted({label for _, _, label in annotations["entities"]}))
+            self.preview_text.insert(tk.END, f"[{labels}] {sentence}\n")
+        self.preview_text.see(tk.END)
+
+    def cancel_generation(self):
+        """ Demande l'annulation de la génération en cours. """
+        if self.generation_in_progress:
+            self.generation_cancel_event.set()
+            self.update_status("⏹️ Annulation de la génération...")
+
+    def _finish_generation(self):
+        """ Ferme le dialogue de progression et réactive la génération. """
+        if self.generation_dialog is not None:
+            self.generation_dialog.destroy()
+            self.generation_dialog = None
+        self.generation_in_progress = False
+        self.generate_button.config(state='normal')
+
+    def _handle_generation_cancelled(self):
+        """ Réactive l'interface après l'annulation de la génération. """
+        self._finish_generation()
+        self.update_status("⏹️ Génération annulée.")
+
+    def _handle_generation_result(self, training_data, stats):
+        """ Affiche l'aperçu final et propose la sauvegarde des données générées. """
+        self._finish_generation()
+        self.generated_training_data = training_data
+        # Corpus binaire du cache de génération, utilisable directement par le trainer
+        cache_info = stats.get(self.data_generator.CACHE_STATS_KEY, {})
+        self.training_docbin_path = cache_info.get('docbin_path', "")
+        self.training_stream_path = ""
+        
+        if self.generated_training_data:
+            preview_text = self.data_generator.preview_training_data(self.generated_training_data, max_examples=5)
+            self.preview_text.delete(1.0, tk.END)
+            self.preview_text.insert(1.0, preview_text)
+            
+            if messagebox.askyesno("Sauvegarde", f"{len(self.generated_training_data)} exemples générés.\nVoulez-vous les sauvegarder ?"):
+                self.save_generated_data()
+            dedup_report = stats.get(self.data_generator.DEDUP_STATS_KEY, {})
+            origin = "relus du cache" if cache_info.get('hit') else "créés"
+            self.update_status(f"Génération terminée : {len(self.generated_training_data)} exemples {origin} "
+                               f"({dedup_report.get('removed', 0)} doublon(s) retiré(s)).")
+            self.data_status_label.config(text=f"✅ {len(self.generated_training_data)} exemples prêts", fg="green")
+        else:
+            messagebox.showwarning("Génération échouée", "Aucune donnée n'a pu être générée.")
     
     def save_generated_data(self):
         """ Sauvegarde les données générées dans un fichier JSON. """
         try:
             saved_path = self.data_generator.save_training_data(self.generated_training_data)
             self.training_data_path = saved_path
-            messagebox.showinfo("Sauvegarde réussie", f"Données sauvegardées dans :\n{saved_path}")
+            # Copie binaire (tokens et entités alignés) utilisée pour l'entraînement
+            self.training_docbin_path = self.data_generator.save_training_docbin(
+                self.generated_training_data,
+                filename=Path(saved_path).stem + DOCBIN_SUFFIX,
+                lang=self.selected_base_model.get()[:2]
+            )
+            messagebox.showinfo("Sauvegarde réussie", f"Données sauvegardées dans :\n{saved_path}\n{self.training_docbin_path}")
         except Exception as e:
             messagebox.showerror("Erreur de sauvegarde", f"Erreur : {e}")
 
     def load_training_data(self):
-        """ Charge des données d'entraînement depuis un fichier JSON. """
-        filepath = filedialog.askopenfilename(title="Charger un fichier de données JSON", filetypes=[("Fichiers JSON", "*.json")])
+        """ Charge des données d'entraînement depuis un fichier JSON, JSON Lines ou DocBin. """
+        filepath = filedialog.askopenfilename(title="Charger un fichier de données", filetypes=[("Données d'entraînement", f"*.json *{JSONL_SUFFIX} *{DOCBIN_SUFFIX}"), ("Fichiers JSON", "*.json"), ("Fichiers JSON Lines", f"*{JSONL_SUFFIX}"), ("Corpus DocBin", f"*{DOCBIN_SUFFIX}")])
         if not filepath:
             return
         
+        if filepath.endswith(DOCBIN_SUFFIX):
+            self._load_training_docbin(filepath)
+            return
+        if self.loading_in_progress:
+            return
+        
+        self.loading_in_progress = True
+        self.loading_cancel_event.clear()
+        self.loading_dialog = ProgressDialog(self.root, "Chargement des données d'entraînement...",
+                                             cancel_command=self.cancel_training_data_loading)
+        
+        loading_thread = threading.Thread(
+            target=self._run_training_data_loading,
+            args=(filepath, self.remove_near_duplicates.get()),
+            daemon=True
+        )
+        loading_thread.start()
+
+    def _run_training_data_loading(self, filepath, near_duplicates):
+        """ Lit le fichier en flux dans un thread : seuls l'aperçu et les statistiques sont conservés. """
+        def progress_callback(bytes_read, total_size):
+            detail = f"{bytes_read / 1e6:.1f} / {total_size / 1e6:.1f} Mo"
+            self.root.after(0, self._update_loading_progress, bytes_read / max(total_size, 1) * 100, detail)
+        
+        preview_examples = []
+        
+        def collect_preview(examples):
+            for example in examples:
+                if len(preview_examples) < 3:
+                    preview_examples.append(example)
+                yield example
+        
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
-            
-            if not isinstance(json_data, list):
-                raise ValueError("Le fichier JSON doit contenir une liste d'exemples.")
-            
-            # Conversion au format SpaCy interne : [(text, {"entities": ...}), ...]
-            training_data = []
-            for item in json_data:
-                if 'text' in item and 'entities' in item:
-                    training_data.append((item['text'], {"entities": item['entities']}))
+            deduplicator = ExampleDeduplicator(near_duplicates)
+            examples = TrainingDataGenerator.iter_training_file(filepath, progress_callback, self.loading_cancel_event)
+            statistics = self.data_generator.compute_training_statistics(collect_preview(deduplicator.filter(examples)))
+            print(deduplicator.format_report())
+            self.root.after(0, self._handle_training_data_loaded, filepath, statistics, preview_examples,
+                            deduplicator.report())
             
+        except GenerationCancelled:
+            self.root.after(0, self._finish_training_data_loading)
+            self.root.after(0, self.update_status, "⏹️ Chargement annulé.")
+        except Exception as e:
+            self.root.after(0, self._finish_training_data_loading)
+            self.root.after(0, lambda err=e: messagebox.showerror("Erreur de chargement", f"Impossible de charger ou de valider le fichier :\n{err}"))
+
+    def _update_loading_progress(self, value, detail):
+        """ Met à jour le dialogue de progression du chargement. """
+        if self.loading_dialog is not None:
+            self.loading_dialog.update_progress(value, detail)
+
+    def cancel_training_data_loading(self):
+        """ Demande l'interruption du chargement en cours. """
+        if self.loading_in_progress:
+            self.loading_cancel_event.set()
+
+    def _finish_training_data_loading(self):
+        """ Ferme le dialogue de progression du chargement. """
+        if self.loading_dialog is not None:
+            self.loading_dialog.destroy()
+            self.loading_dialog = None
+        self.loading_in_progress = False
+
+    def _handle_training_data_loaded(self, filepath, statistics, preview_examples, dedup_report):
+        """ Retient le fichier chargé : l'entraînement le relira en flux, sans liste intermédiaire. """
+        self._finish_training_data_loading()
+        if not statistics['total_examples']:
+            messagebox.showerror("Erreur de chargement", "Aucune donnée valide trouvée dans le fichier.")
+            return
+        
+        self.generated_training_data = None
+        self.training_data_path = filepath
+        self.training_docbin_path = ""
+        self.training_stream_path = filepath
+        
+        self.data_status_label.config(text=f"✅ {statistics['total_examples']} exemples chargés", fg="green")
+        self.update_status(f"Données chargées : {statistics['total_examples']} exemples ({dedup_report['removed']} doublon(s) retiré(s)).")
+        
+        if messagebox.askyesno("Aperçu", "Voulez-vous voir un aperçu des données chargées ?"):
+            preview = self.data_generator.preview_training_data(preview_examples, max_examples=3, statistics=statistics)
+            messagebox.showinfo("Aperçu des Données", preview)
+
+    def _load_training_docbin(self, filepath):
+        """ Charge un corpus DocBin : l'entraînement relira directement les tokens du fichier. """
+        try:
+            # Mêmes doublons exacts que ceux ignorés par le trainer à la relecture du fichier
+            deduplicator = ExampleDeduplicator()
+            training_data = self.data_generator.load_training_docbin(filepath, deduplicator=deduplicator)
             if not training_data:
-                raise ValueError("Aucune donnée valide trouvée dans le fichier.")
-                
+                raise ValueError("Aucun exemple trouvé dans le fichier.")
+            
             self.generated_training_data = training_data
             self.training_data_path = filepath
+            self.training_docbin_path = filepath
+            self.training_stream_path = ""
             
-            self.data_status_label.config(text=f"✅ {len(training_data)} exemples chargés", fg="green")
-            self.update_status(f"Données chargées : {len(training_data)} exemples.")
-            
-            if messagebox.askyesno("Aperçu", "Voulez-vous voir un aperçu des données chargées ?"):
-                preview = self.data_generator.preview_training_data(training_data, max_examples=3)
-                messagebox.showinfo("Aperçu des Données", preview)
+            self.data_status_label.config(text=f"✅ {len(training_data)} exemples chargés (DocBin)", fg="green")
+            self.update_status(f"Données chargées : {len(training_data)} exemples ({deduplicator.report()['removed']} doublon(s) retiré(s)).")
         except Exception as e:
-            messagebox.showerror("Erreur de chargement", f"Impossible de charger ou de valider le fichier :\n{e}")
+            messagebox.showerror("Erreur de chargement", f"Impossible de charger le corpus DocBin :\n{e}")
 
     # --- MÉTHODES D'ENTRAÎNEMENT CORRIGÉES ---
 
@@ -464,7 +727,7 @@ class PseudonymizationApp:
             messagebox.showwarning("Entraînement en cours", "Veuillez attendre la fin de l'entraînement actuel.")
             return
 
-        if not self.generated_training_data:
+        if not self.generated_training_data and not self.training_stream_path:
             messagebox.showwarning("Données manquantes", "Veuillez générer ou charger des données d'entraînement.")
             return
             
@@ -496,9 +759,19 @@ class PseudonymizationApp:
             self.log_training_message("🚀 Initialisation de l'entraînement...\n")
             self.training_log.config(state='disabled')
 
+            if self.training_docbin_path:
+                # Le corpus binaire évite de re-tokeniser tous les textes
+                training_data = self.training_docbin_path
+            elif self.training_stream_path:
+                # Fichier relu en flux par le trainer, avec le même dédoublonnage qu'au chargement
+                deduplicator = ExampleDeduplicator(self.remove_near_duplicates.get())
+                training_data = deduplicator.filter(TrainingDataGenerator.iter_training_file(self.training_stream_path))
+            else:
+                training_data = self.generated_training_data
+            
             training_thread = threading.Thread(
                 target=self._run_training,
-                args=(training_config,),
+                args=(training_config, training_data),
                 daemon=True
             )
             training_thread.start()
@@ -506,7 +779,7 @@ class PseudonymizationApp:
         except Exception as e:
             messagebox.showerror("Erreur de lancement", f"Impossible de démarrer l'entraînement : {e}")
 
-    def _run_training(self, config):
+    def _run_training(self, config, training_data):
         """ Exécute l'entraînement dans un thread pour ne pas geler l'interface. """
         try:
             self.training_in_progress = True
@@ -517,7 +790,7 @@ class PseudonymizationApp:
                 log_msg = f"Époque {current_epoch}/{total_epochs} | Perte: {epoch_info.get('train_loss', 0):.4f} | F1-Score (Val): {epoch_info.get('val_f1', 0):.3f}\n"
                 self.root.after(0, self.log_training_message, log_msg)
             
-            results = self.model_trainer.train_model(self.generated_training_data, config, progress_callback)
+            results = self.model_trainer.train_model(training_data, config, progress_callback)
             self.root.after(0, self._handle_training_results, results)
             
         except Exception as e:
@@ -579,29 +852,66 @@ class PseudonymizationApp:
         self.root.update_idletasks()
 
     def select_trained_model(self):
-        """ Permet de sélectionner un dossier contenant un modèle entraîné. """
+        """ Permet de sélectionner un dossier contenant un modèle entraîné et le précharge en arrière-plan. """
         model_path = filedialog.askdirectory(title="Sélectionner le dossier du modèle entraîné")
         if not model_path:
             return
 
+        model_name = Path(model_path).name
+        self.model_load_token += 1
+        self.model_loading = True
+        self.model_status_label.config(text=f"⏳ Chargement: {model_name}", fg="orange")
+        self.update_status(f"⏳ Chargement du modèle {model_name} en arrière-plan...")
+        
+        preload_thread = threading.Thread(
+            target=self._preload_model, args=(model_path, self.model_load_token), daemon=True
+        )
+        preload_thread.start()
+    
+    def _preload_model(self, model_path, token):
+        """ Charge et préchauffe le modèle dans un thread séparé (ne touche pas à l'interface). """
         try:
-            # On utilise une instance temporaire pour ne pas écraser le trainer actuel
-            test_trainer = SpacyModelTrainer()
-            if test_trainer.load_trained_model(model_path):
-                self.trained_model_path = model_path
-                model_name = Path(model_path).name
-                self.model_status_label.config(text=f"✅ Modèle chargé: {model_name}", fg="green")
-                
-                model_info = test_trainer.get_model_info()
-                info_text = (f"Modèle: {model_info.get('base_model', 'N/A')}\n"
-                             f"Entités: {', '.join(model_info.get('custom_entities', []))}\n"
-                             f"Pipeline: {', '.join(model_info.get('pipeline_components', []))}")
-                messagebox.showinfo("Modèle Chargé", info_text)
-                self.update_status(f"Modèle sélectionné : {model_name}")
-            else:
-                messagebox.showerror("Erreur", "Le dossier sélectionné ne semble pas contenir un modèle SpaCy valide.")
+            start_time = time.time()
+            preloaded = TextPseudonymizer()
+            if not preloaded.load_model(model_path):
+                raise ValueError("Le dossier sélectionné ne semble pas contenir un modèle SpaCy valide.")
+            load_time = time.time() - start_time
+            warmup_time = preloaded.warm_up()
+            self.root.after(0, self._on_model_preloaded, token, model_path, preloaded, load_time, warmup_time)
         except Exception as e:
-            messagebox.showerror("Erreur de chargement", f"Erreur : {e}")
+            self.root.after(0, self._on_model_preload_failed, token, model_path, e)
+    
+    def _on_model_preloaded(self, token, model_path, preloaded, load_time, warmup_time):
+        """ Installe le modèle préchargé (thread principal). """
+        if token != self.model_load_token:
+            return
+        self.model_loading = False
+        
+        # Les correspondances déjà chargées sont conservées
+        if self.pseudonymizer is None:
+            self.pseudonymizer = preloaded
+        else:
+            self.pseudonymizer.set_model(preloaded.nlp, model_path)
+        self.trained_model_path = model_path
+        
+        model_name = Path(model_path).name
+        nlp = self.pseudonymizer.nlp
+        self.model_status_label.config(text=f"✅ Modèle chargé: {model_name}", fg="green")
+        self.update_status(f"✅ Modèle {model_name} prêt (chargement {load_time:.1f}s, préchauffage {warmup_time:.1f}s)")
+        
+        info_text = (f"Modèle: {nlp.meta.get('name', model_name)}\n"
+                     f"Entités: {', '.join(nlp.get_pipe('ner').labels)}\n"
+                     f"Pipeline: {', '.join(nlp.pipe_names)}")
+        messagebox.showinfo("Modèle Chargé", info_text)
+    
+    def _on_model_preload_failed(self, token, model_path, error):
+        """ Signale l'échec du préchargement (thread principal). """
+        if token != self.model_load_token:
+            return
+        self.model_loading = False
+        self.model_status_label.config(text="Aucun modèle sélectionné", fg="red")
+        self.update_status(f"❌ Échec du chargement du modèle {Path(model_path).name}")
+        messagebox.showerror("Erreur de chargement", f"Erreur : {error}")
 
     def test_trained_model(self):
         """ Permet de tester le modèle actuellement chargé. """
@@ -633,12 +943,17 @@ class PseudonymizationApp:
             messagebox.showerror("Erreur de test", f"Erreur : {e}")
     
     def pseudonymize_text(self):
-        """ Pseudonymise le texte de l'onglet de pseudonymisation. """
+        """ Pseudonymise le texte de l'onglet de pseudonymisation (dans un thread séparé). """
+        if self.text_operation_in_progress:
+            return
+        if self.model_loading:
+            messagebox.showinfo("Chargement en cours", "Le modèle est en cours de chargement, veuillez patienter.")
+            return
         if not self.trained_model_path:
             messagebox.showwarning("Modèle manquant", "Veuillez sélectionner un modèle entraîné.")
             return
         
-        input_text = self.input_text.get(1.0, tk.END).strip()
+        input_text = self.input_text.get_text().strip()
         if not input_text:
             messagebox.showwarning("Texte manquant", "Veuillez saisir un texte à pseudonymiser.")
             return
@@ -646,6 +961,7 @@ class PseudonymizationApp:
         try:
             if self.pseudonymizer is None:
                 self.pseudonymizer = TextPseudonymizer()
+            if self.pseudonymizer.nlp is None:
                 self.pseudonymizer.load_model(self.trained_model_path)
 
             # Utilise les entités du modèle chargé pour le dialogue
@@ -655,21 +971,42 @@ class PseudonymizationApp:
             if entity_selection.result is None: # L'utilisateur a annulé
                 return
 
+            self._start_text_operation(self._run_pseudonymization, input_text,
+                                       entity_selection.result if entity_selection.result else None)
+            
+        except Exception as e:
+            messagebox.showerror("Erreur de pseudonymisation", f"Erreur : {e}")
+
+    def _run_pseudonymization(self, input_text, entity_types_to_mask):
+        """ Exécute la pseudonymisation dans un thread pour ne pas geler l'interface. """
+        try:
+            def progress_callback(processed, total):
+                self.root.after(0, self.pseudo_progress_var.set, (processed / total) * 100 if total else 100)
+            
             pseudonymized_text, stats = self.pseudonymizer.pseudonymize_text(
                 input_text,
-                entity_types_to_mask=entity_selection.result if entity_selection.result else None
+                entity_types_to_mask=entity_types_to_mask,
+                n_workers=os.cpu_count(),  # Utilisé seulement pour les gros documents
+                progress_callback=progress_callback,
+                cancel_event=self.operation_cancel_event
             )
+            self.root.after(0, self._handle_pseudonymization_result, pseudonymized_text, stats)
             
-            self.output_text.delete(1.0, tk.END)
-            self.output_text.insert(1.0, pseudonymized_text)
-            
-            stats_message = self._format_pseudonymization_stats(stats)
-            if messagebox.askyesno("Sauvegarde", f"Pseudonymisation terminée !\n\n{stats_message}\n\nVoulez-vous sauvegarder le fichier de correspondance ?"):
-                self.save_correspondence_file(stats)
-            self.update_status(f"Pseudonymisation terminée : {stats['entities_processed']} entités traitées.")
-            
+        except OperationCancelled:
+            self.root.after(0, self._handle_text_operation_cancelled, "Pseudonymisation")
         except Exception as e:
-            messagebox.showerror("Erreur de pseudonymisation", f"Erreur : {e}")
+            self.root.after(0, self.set_text_operation_state, False)
+            self.root.after(0, lambda err=e: messagebox.showerror("Erreur de pseudonymisation", f"Erreur : {err}"))
+
+    def _handle_pseudonymization_result(self, pseudonymized_text, stats):
+        """ Affiche le texte pseudonymisé puis propose la sauvegarde. """
+        self.output_text.set_text(pseudonymized_text)
+        self.set_text_operation_state(False)
+        self.update_status(f"Pseudonymisation terminée : {stats['entities_processed']} entités traitées.")
+        
+        stats_message = self._format_pseudonymization_stats(stats)
+        if messagebox.askyesno("Sauvegarde", f"Pseudonymisation terminée !\n\n{stats_message}\n\nVoulez-vous sauvegarder le fichier de correspondance ?"):
+            self.save_correspondence_file(stats)
 
     def _format_pseudonymization_stats(self, stats):
         """ Met en forme les statistiques de pseudonymisation pour l'affichage. """
@@ -691,10 +1028,9 @@ class PseudonymizationApp:
 
     def copy_to_depseudo(self):
         """ Copie le texte pseudonymisé vers l'onglet de dépseudonymisation. """
-        pseudonymized_text = self.output_text.get(1.0, tk.END).strip()
+        pseudonymized_text = self.output_text.get_text().strip()
         if pseudonymized_text:
-            self.pseudo_input_text.delete(1.0, tk.END)
-            self.pseudo_input_text.insert(1.0, pseudonymized_text)
+            self.pseudo_input_text.set_text(pseudonymized_text)
             self.notebook.select(4)
             self.update_status("Texte copié pour la dépseudonymisation.")
         else:
@@ -722,24 +1058,135 @@ class PseudonymizationApp:
             messagebox.showerror("Erreur de chargement", f"Erreur : {e}")
 
     def depseudonymize_text(self):
-        """ Dépseudonymise le texte en utilisant le fichier de correspondance chargé. """
+        """ Dépseudonymise le texte en utilisant le fichier de correspondance chargé (dans un thread séparé). """
+        if self.text_operation_in_progress:
+            return
         if not self.correspondence_file_path:
             messagebox.showwarning("Fichier manquant", "Veuillez charger un fichier de correspondance.")
             return
         
-        pseudo_text = self.pseudo_input_text.get(1.0, tk.END).strip()
+        pseudo_text = self.pseudo_input_text.get_text().strip()
         if not pseudo_text:
             messagebox.showwarning("Texte manquant", "Veuillez saisir un texte à dépseudonymiser.")
             return
         
+        self._start_text_operation(self._run_depseudonymization, pseudo_text)
+
+    def _run_depseudonymization(self, pseudo_text):
+        """ Exécute la dépseudonymisation dans un thread pour ne pas geler l'interface. """
         try:
-            depseudonymized_text = self.pseudonymizer.depseudonymize_text(pseudo_text)
-            self.depseudo_output_text.delete(1.0, tk.END)
-            self.depseudo_output_text.insert(1.0, depseudonymized_text)
-            self.update_status("Dépseudonymisation terminée avec succès.")
+            def progress_callback(processed, total):
+                self.root.after(0, self.depseudo_progress_var.set, (processed / total) * 100 if total else 100)
+            
+            depseudonymized_text = self.pseudonymizer.depseudonymize_text(
+                pseudo_text,
+                progress_callback=progress_callback,
+                cancel_event=self.operation_cancel_event
+            )
+            self.root.after(0, self._handle_depseudonymization_result, depseudonymized_text)
+            
+        except OperationCancelled:
+            self.root.after(0, self._handle_text_operation_cancelled, "Dépseudonymisation")
         except Exception as e:
-            messagebox.showerror("Erreur de dépseudonymisation", f"Erreur : {e}")
-    
+            self.root.after(0, self.set_text_operation_state, False)
+            self.root.after(0, lambda err=e: messagebox.showerror("Erreur de dépseudonymisation", f"Erreur : {err}"))
+
+    def _handle_depseudonymization_result(self, depseudonymized_text):
+        """ Affiche le texte restauré. """
+        self.depseudo_output_text.set_text(depseudonymized_text)
+        self.set_text_operation_state(False)
+        self.update_status("Dépseudonymisation terminée avec succès.")
+
+    def depseudonymize_files(self):
+        """ Dépseudonymise des fichiers complets en flux, sans passer par les zones de texte. """
+        if self.text_operation_in_progress:
+            return
+        if not self.correspondence_file_path:
+            messagebox.showwarning("Fichier manquant", "Veuillez charger un fichier de correspondance.")
+            return
+        
+        input_paths = filedialog.askopenfilenames(title="Fichiers pseudonymisés à restaurer", filetypes=[("Fichiers texte", "*.txt"), ("Tous les fichiers", "*.*")])
+        if not input_paths:
+            return
+        output_dir = filedialog.askdirectory(title="Dossier de sortie des fichiers restaurés")
+        if not output_dir:
+            return
+        if any(Path(p).parent.resolve() == Path(output_dir).resolve() for p in input_paths):
+            messagebox.showwarning("Dossier invalide", "Le dossier de sortie doit être différent de celui des fichiers d'entrée.")
+            return
+        
+        self._start_text_operation(self._run_file_depseudonymization, list(input_paths), output_dir)
+
+    def _run_file_depseudonymization(self, input_paths, output_dir):
+        """ Exécute la dépseudonymisation des fichiers dans un thread séparé. """
+        try:
+            def progress_callback(processed_bytes, total_bytes):
+                self.root.after(0, self.depseudo_progress_var.set, (processed_bytes / total_bytes) * 100 if total_bytes else 100)
+            
+            results = self.pseudonymizer.depseudonymize_files(
+                input_paths, output_dir,
+                progress_callback=progress_callback,
+                cancel_event=self.operation_cancel_event
+            )
+            self.root.after(0, self._handle_file_depseudonymization_result, results, output_dir)
+            
+        except OperationCancelled:
+            self.root.after(0, self._handle_text_operation_cancelled, "Dépseudonymisation des fichiers")
+        except Exception as e:
+            self.root.after(0, self.set_text_operation_state, False)
+            self.root.after(0, lambda err=e: messagebox.showerror("Erreur de dépseudonymisation", f"Erreur : {err}"))
+
+    def _handle_file_depseudonymization_result(self, results, output_dir):
+        """ Résume la dépseudonymisation des fichiers. """
+        self.set_text_operation_state(False)
+        total_replacements = sum(results.values())
+        self.update_status(f"Dépseudonymisation terminée : {len(results)} fichier(s), {total_replacements} remplacements.")
+        messagebox.showinfo("Dépseudonymisation terminée", f"{len(results)} fichier(s) restauré(s) dans :\n{output_dir}\n\n{total_replacements} remplacements effectués.")
+
+    # --- OPÉRATIONS LONGUES SUR LES TEXTES ---
+
+    def _start_text_operation(self, target, *args):
+        """ Lance une opération de (dé)pseudonymisation dans un thread séparé. """
+        self.operation_cancel_event.clear()
+        self.pseudo_progress_var.set(0)
+        self.depseudo_progress_var.set(0)
+        self.set_text_operation_state(True)
+        self.update_status("⏳ Traitement en cours...")
+        
+        operation_thread = threading.Thread(target=target, args=args, daemon=True)
+        operation_thread.start()
+
+    def set_text_operation_state(self, is_running):
+        """ Active ou désactive les contrôles pendant une opération sur les textes. """
+        self.text_operation_in_progress = is_running
+        action_state = 'disabled' if is_running else 'normal'
+        cancel_state = 'normal' if is_running else 'disabled'
+        
+        self.pseudo_button.config(state=action_state)
+        self.depseudo_button.config(state=action_state)
+        self.depseudo_files_button.config(state=action_state)
+        self.pseudo_cancel_button.config(state=cancel_state)
+        self.depseudo_cancel_button.config(state=cancel_state)
+        
+        # Les autres onglets modifieraient le modèle ou les correspondances en cours d'utilisation
+        current_tab = self.notebook.index(self.notebook.select())
+        for i, tab in enumerate(self.notebook.tabs()):
+            if i != current_tab:
+                self.notebook.tab(i, state=action_state)
+
+    def cancel_text_operation(self):
+        """ Demande l'annulation de l'opération en cours. """
+        if self.text_operation_in_progress:
+            self.operation_cancel_event.set()
+            self.update_status("⏹️ Annulation en cours...")
+
+    def _handle_text_operation_cancelled(self, operation_name):
+        """ Réactive l'interface après une annulation. """
+        self.set_text_operation_state(False)
+        self.pseudo_progress_var.set(0)
+        self.depseudo_progress_var.set(0)
+        self.update_status(f"⏹️ {operation_name} annulée.")
+
     def import_text_file(self, text_widget):
         """ Utilitaire pour importer un fichier texte dans une zone de texte. """
         filepath = filedialog.askopenfilename(title="Importer un fichier texte", filetypes=[("Fichiers texte", "*.txt")])
@@ -747,24 +1194,22 @@ class PseudonymizationApp:
             try:
                 with open(filepath, 'r', encoding='utf-8') as f:
                     content = f.read()
-                text_widget.delete(1.0, tk.END)
-                text_widget.insert(1.0, content)
+                text_widget.set_text(content)
                 self.update_status(f"Fichier importé : {Path(filepath).name}")
             except Exception as e:
                 messagebox.showerror("Erreur d'importation", f"Erreur : {e}")
 
     def export_text_file(self, text_widget, default_name="exported_text.txt"):
         """ Utilitaire pour exporter le contenu d'une zone de texte. """
-        content = text_widget.get(1.0, tk.END).strip()
-        if not content:
+        if not text_widget.get_text().strip():
             messagebox.showwarning("Contenu vide", "Il n'y a rien à exporter.")
             return
         
         filepath = filedialog.asksaveasfilename(title="Exporter le texte", defaultextension=".txt", initialfile=default_name, filetypes=[("Fichiers texte", "*.txt")])
         if filepath:
             try:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                # Le document complet est écrit, y compris les pages non affichées
+                text_widget.save_to_file(filepath)
                 messagebox.showinfo("Export réussi", f"Fichier exporté vers :\n{filepath}")
             except Exception as e:
                 messagebox.showerror("Erreur d'exportation", f"Erreur : {e}")
@@ -972,11 +1417,14 @@ class TestModelDialog:
 class ProgressDialog:
     """
     Dialogue de progression simple
+    
+    Sans cancel_command, la barre est indéterminée ; avec, elle est pilotée
+    par update_progress et un bouton permet d'annuler l'opération.
     """
-    def __init__(self, parent, message):
+    def __init__(self, parent, message, cancel_command=None):
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Progression")
-        self.dialog.geometry("400x100")
+        self.dialog.geometry("400x150" if cancel_command else "400x100")
         self.dialog.transient(parent)
         self.dialog.grab_set()
         
@@ -985,14 +1433,31 @@ class ProgressDialog:
         
         tk.Label(self.dialog, text=message, font=("Arial", 10)).pack(pady=10)
         
-        # Barre de progression indéterminée
-        self.progress = ttk.Progressbar(self.dialog, mode='indeterminate')
-        self.progress.pack(pady=10, padx=20, fill=tk.X)
-        self.progress.start()
+        if cancel_command:
+            # Barre de progression déterminée, mise à jour par l'opération
+            self.progress_var = tk.DoubleVar()
+            self.progress = ttk.Progressbar(self.dialog, mode='determinate', variable=self.progress_var, maximum=100)
+            self.progress.pack(pady=5, padx=20, fill=tk.X)
+            
+            self.detail_label = tk.Label(self.dialog, text="", font=("Arial", 9), fg="gray")
+            self.detail_label.pack()
+            
+            tk.Button(self.dialog, text="Annuler", command=cancel_command).pack(pady=5)
+            self.dialog.protocol("WM_DELETE_WINDOW", cancel_command)
+        else:
+            # Barre de progression indéterminée
+            self.progress = ttk.Progressbar(self.dialog, mode='indeterminate')
+            self.progress.pack(pady=10, padx=20, fill=tk.X)
+            self.progress.start()
         
         # Met à jour l'affichage
         self.dialog.update()
     
+    def update_progress(self, value, detail=""):
+        """ Met à jour la barre (0-100) et le détail affiché. """
+        self.progress_var.set(value)
+        self.detail_label.config(text=detail)
+    
     def destroy(self):
         self.progress.stop()
         self.dialog.destroy()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chargement des modèles SpaCy entraînés
+======================================
+
+Ce module centralise le chargement des modèles utilisés par l'application,
+quel que soit leur format sur disque (dossier SpaCy standard, modèle
+quantifié ou archive d'inférence) et le backend d'inférence choisi, afin que le pseudonymiseur,
+ses processus de travail et le trainer chargent les modèles de la même
+manière.
+"""
+
+import os
+import mmap
+import struct
+import spacy
+import srsly
+import shutil
+import tarfile
+import argparse
+import tempfile
+import numpy as np
+from spacy import util
+from pathlib import Path
+from thinc.api import Config
+
+from model_quantizer import ModelQuantizer
+from benchmark import ModelBenchmark
+
+# Backends d'inférence disponibles pour le NER
+INFERENCE_BACKENDS = ('native', 'openvino')
+# Nom des couches thinc remplacées par un encodeur OpenVINO compilé
+OPENVINO_LAYER_NAME = "openvino_encoder"
+# Dossier de décompression des archives de modèles
+ARCHIVE_CACHE_DIR = Path(tempfile.gettempdir()) / "pseudonymization_models"
+# Extension des modèles sérialisés en un seul fichier (config + nlp.to_bytes)
+BLOB_SUFFIX = ".nlpblob"
+# En-tête du fichier : signature puis longueur de l'en-tête msgpack
+BLOB_MAGIC = b"NLPBLOB1"
+BLOB_ALIGNMENT = 64
+
+
+class ModelLoader:
+    """
+    Classe contenant les fonctions de chargement des modèles
+    """
+    
+    @staticmethod
+    def get_model_format(model_path: str) -> str:
+        """
+        Détermine le format d'un modèle sur disque
+        
+        Args:
+            model_path (str): Chemin vers le modèle
+        
+        Returns:
+            str: 'blob', 'archive', 'quantized' ou 'directory'
+        """
+        if str(model_path).endswith(BLOB_SUFFIX):
+            return 'blob'
+        if str(model_path).endswith(".tar.gz"):
+            return 'archive'
+        if ModelQuantizer.is_quantized_model(model_path):
+            return 'quantized'
+        return 'directory'
+    
+    @staticmethod
+    def load(model_path: str, inference_backend: str = 'native', mmap_vectors: bool = False,
+             export_ir: bool = True):
+        """
+        Charge un modèle SpaCy quel que soit son format
+        
+        Args:
+            model_path (str): Chemin vers le modèle
+            inference_backend (str): 'native' (thinc) ou 'openvino' ; un modèle
+                quantifié utilise toujours OpenVINO pour exécuter ses poids
+                int8/float16. En cas d'échec d'OpenVINO, le modèle reste en
+                thinc natif
+            mmap_vectors (bool): Projette la table de vecteurs en mémoire en
+                lecture seule au lieu de la copier (partagée entre processus) ;
+                sans effet sur un modèle sérialisé en un seul fichier
+            export_ir (bool): Exporte les fichiers IR d'OpenVINO absents du
+                cache ; False dans les processus du pool, qui relisent les IR
+                exportés par le processus principal
+        
+        Returns:
+            Language: Pipeline SpaCy chargé
+        """
+        if not Path(model_path).exists():
+            raise OSError(f"Le modèle {model_path} n'a pas été trouvé")
+        if inference_backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Backend d'inférence inconnu : {inference_backend}")
+        
+        if ModelLoader.get_model_format(model_path) == 'archive':
+            model_path = ModelLoader.extract_archive(model_path)
+        
+        mmap_vectors = mmap_vectors and ModelLoader.has_vectors_file(model_path)
+        exclude = ["vectors"] if mmap_vectors else []
+        
+        model_format = ModelLoader.get_model_format(model_path)
+        if model_format == 'blob':
+            nlp = ModelLoader.load_blob(model_path)
+        elif model_format == 'quantized':
+            nlp = ModelQuantizer.load_quantized_model(model_path, exclude=exclude)
+        else:
+            nlp = spacy.load(model_path, exclude=exclude)
+        
+        if mmap_vectors:
+            ModelLoader.attach_mmap_vectors(nlp, model_path)
+        
+        if inference_backend == 'openvino' or model_format == 'quantized':
+            # Import différé : OpenVINO est une dépendance optionnelle
+            from openvino_backend import OpenVINOBackend
+            OpenVINOBackend().apply(nlp, model_path, export=export_ir)
+        return nlp
+    
+    @staticmethod
+    def get_inference_backend(nlp) -> str:
+        """
+        Indique le backend d'inférence effectivement utilisé par le NER
+        
+        Args:
+            nlp (Language): Pipeline chargé par load
+        
+        Returns:
+            str: 'openvino' si un encodeur OpenVINO est actif, sinon 'native'
+        """
+        if "ner" in nlp.pipe_names and any(node.name == OPENVINO_LAYER_NAME
+                                           for node in nlp.get_pipe("ner").model.walk()):
+            return 'openvino'
+        return 'native'
+
+    
+    @staticmethod
+    def pack_model(model_path: str, blob_path: str = None) -> str:
+        """
+        Sérialise un modèle en un seul fichier
+        
+        Le fichier contient un en-tête msgpack (configuration, méta,
+        nlp.to_bytes sans les vecteurs, index des vecteurs) suivi de la table
+        de vecteurs brute, alignée pour être projetée en mémoire telle quelle.
+        
+        Args:
+            model_path (str): Chemin vers le modèle (tout format supporté)
+            blob_path (str): Fichier de sortie (défaut : <modèle>.nlpblob)
+        
+        Returns:
+            str: Chemin du fichier créé
+        """
+        nlp = ModelLoader.load(model_path)
+        blob_path = Path(blob_path or str(model_path).rstrip("/\\") + BLOB_SUFFIX)
+        if not blob_path.name.endswith(BLOB_SUFFIX):
+            blob_path = blob_path.with_name(blob_path.name + BLOB_SUFFIX)
+        
+        vectors = nlp.vocab.vectors
+        vectors_data = np.ascontiguousarray(vectors.data, dtype='<f4') if vectors.shape[0] else None
+        header = srsly.msgpack_dumps({
+            'config': nlp.config.to_str(),
+            'meta': nlp.meta,
+            'nlp': nlp.to_bytes(exclude=["vectors"]),
+            'vectors': vectors.to_bytes(exclude=["strings", "vectors"]),
+            'vectors_shape': list(vectors_data.shape) if vectors_data is not None else None
+        })
+        
+        prefix_size = len(BLOB_MAGIC) + 8 + len(header)
+        padding = -prefix_size % BLOB_ALIGNMENT
+        with open(blob_path, 'wb') as f:
+            f.write(BLOB_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            f.write(b"\0" * padding)
+            if vectors_data is not None:
+                f.write(vectors_data.tobytes())
+        
+        print(f"📦 Modèle sérialisé : {blob_path} ({blob_path.stat().st_size / 1e6:.1f} Mo)")
+        return str(blob_path)
+    
+    @staticmethod
+    def load_blob(blob_path: str):
+        """
+        Charge un modèle sérialisé par pack_model
+        
+        L'en-tête est décodé en une seule passe depuis le fichier projeté en
+        mémoire ; la table de vecteurs reste projetée (numpy.memmap en lecture
+        seule) et n'est pas copiée.
+        
+        Args:
+            blob_path (str): Chemin vers le fichier .nlpblob
+        
+        Returns:
+            Language: Pipeline SpaCy chargé
+        """
+        with open(blob_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if mapped[:len(BLOB_MAGIC)] != BLOB_MAGIC:
+                    raise ValueError(f"{blob_path} n'est pas un modèle sérialisé valide")
+                header_start = len(BLOB_MAGIC) + 8
+                header_size = struct.unpack('<Q', mapped[len(BLOB_MAGIC):header_start])[0]
+                blob = srsly.msgpack_loads(mapped[header_start:header_start + header_size])
+        
+        config = Config().from_str(blob['config'])
+        nlp = util.load_model_from_config(config, meta=blob['meta'])
+        nlp.from_bytes(blob['nlp'], exclude=["vectors"])
+        
+        if blob['vectors_shape']:
+            prefix_size = header_start + header_size
+            nlp.vocab.vectors.from_bytes(blob['vectors'], exclude=["strings", "vectors"])
+            nlp.vocab.vectors.data = np.memmap(blob_path, dtype='<f4', mode='r',
+                                               offset=prefix_size + (-prefix_size % BLOB_ALIGNMENT),
+                                               shape=tuple(blob['vectors_shape']))
+            nlp.vocab.vectors._sync_unset()
+        return nlp
+    
+    @staticmethod
+    def extract_archive(archive_path: str) -> str:
+        """
+        Décompresse une archive de modèle (.tar.gz) dans le cache local
+        
+        Le dossier de cache dépend de la taille et de la date de l'archive :
+        une archive déjà décompressée (par exemple par un autre processus du
+        pool) n'est pas décompressée une seconde fois.
+        
+        Args:
+            archive_path (str): Chemin vers l'archive
+        
+        Returns:
+            str: Dossier du modèle décompressé
+        """
+        archive = Path(archive_path)
+        stat = archive.stat()
+        name = archive.name[:-len(".tar.gz")]
+        model_dir = ARCHIVE_CACHE_DIR / f"{name}-{stat.st_size}-{stat.st_mtime_ns}"
+        if model_dir.exists():
+            return str(model_dir)
+        
+        ARCHIVE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{name}-", dir=ARCHIVE_CACHE_DIR))
+        with tarfile.open(archive, "r:gz") as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(tmp_dir, filter="data")
+            else:
+                tar.extractall(tmp_dir)
+        
+        # Renommage atomique : un autre processus a pu terminer avant nous
+        try:
+            os.rename(tmp_dir, model_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return str(model_dir)
+    
+    @staticmethod
+    def has_vectors_file(model_path: str) -> bool:
+        """
+        Indique si le modèle contient une table de vecteurs non vide
+        
+        Args:
+            model_path (str): Chemin vers le modèle
+        
+        Returns:
+            bool: True si vocab/vectors existe et contient des données
+        """
+        vectors_file = Path(model_path) / "vocab" / "vectors"
+        return vectors_file.is_file() and vectors_file.stat().st_size > 128
+    
+    @staticmethod
+    def attach_mmap_vectors(nlp, model_path: str):
+        """
+        Associe au vocabulaire la table de vecteurs projetée en mémoire
+        
+        Le fichier vocab/vectors (format .npy) est ouvert avec
+        numpy.load(mmap_mode='r') : les pages sont lues à la demande et
+        partagées par tous les processus via le cache du système.
+        
+        Args:
+            nlp (Language): Pipeline chargé sans ses vecteurs (exclude=["vectors"])
+            model_path (str): Chemin vers le modèle
+        """
+        vocab_dir = Path(model_path) / "vocab"
+        vectors = nlp.vocab.vectors
+        
+        # Index (key2row) et configuration, sans la table elle-même
+        vectors.from_disk(vocab_dir, exclude=["strings", "vectors"])
+        vectors.data = np.load(str(vocab_dir / "vectors"), mmap_mode='r')
+        vectors._sync_unset()
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande : sérialisation en un seul fichier
+    et comparaison des temps de chargement
+    """
+    parser = argparse.ArgumentParser(description="Sérialisation des modèles en un seul fichier")
+    parser.add_argument("model_path", help="Dossier du modèle entraîné")
+    parser.add_argument("--output", help="Fichier de sortie (défaut : <modèle>.nlpblob)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare le chargement du dossier et du fichier unique")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    
+    blob_path = ModelLoader.pack_model(args.model_path, args.output)
+    if args.benchmark:
+        ModelBenchmark.compare_load_times({
+            'directory': lambda: ModelLoader.load(args.model_path),
+            'blob': lambda: ModelLoader.load(blob_path)
+        }, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quantification des poids des modèles SpaCy pour l'inférence CPU
+===============================================================
+
+Ce module convertit les poids thinc d'un modèle entraîné (tok2vec et ner
+par défaut) en int8 ou float16 pour réduire la taille du modèle sur disque
+et le volume lu au chargement. À l'inférence, les matrices des encodeurs
+sont transmises telles quelles (int8 ou float16) au backend OpenVINO, qui
+les décompresse dans son graphe ; les autres poids, dont les tables
+d'embeddings (et l'ensemble du modèle si OpenVINO est absent), sont
+reconvertis en float32 pour thinc : la mémoire utilisée à l'inférence ne
+diminue pas. Un contrôle de parité compare les sorties, la vitesse et la
+taille au modèle d'origine.
+"""
+
+import spacy
+import srsly
+import json
+import shutil
+import argparse
+import multiprocessing
+import numpy as np
+from spacy import util
+from pathlib import Path
+from typing import List, Dict, Any
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark import ModelBenchmark
+
+# Fichier décrivant la quantification à la racine du modèle
+QUANTIZATION_FILE = "quantization.json"
+# Fichier des poids quantifiés dans le dossier de chaque composant
+QUANTIZED_WEIGHTS_FILE = "model.quant"
+
+
+
+def _measure_model(model_path: str, heldout_file: str, limit: int) -> Dict[str, Any]:
+    """
+    Charge un modèle avec le backend OpenVINO et le mesure (processus dédié)
+    
+    Args:
+        model_path (str): Chemin du modèle
+        heldout_file (str): Fichier d'exemples annotés
+        limit (int): Nombre maximum d'exemples utilisés
+    
+    Returns:
+        Dict: Chargement, mémoire, F1, débit et entités de chaque texte
+    """
+    # Import différé : model_loader dépend de ce module
+    from model_loader import ModelLoader
+    
+    examples = ModelBenchmark.load_training_file(heldout_file, limit)
+    texts = [text for text, _ in examples]
+    
+    rss_before = ModelBenchmark.current_rss_mb()
+    nlp, load_seconds = ModelBenchmark.time_model_load(lambda: ModelLoader.load(model_path, 'openvino'))
+    return {
+        'load_seconds': load_seconds,
+        'rss_delta_mb': ModelBenchmark.current_rss_mb() - rss_before,
+        'f1': ModelBenchmark.evaluate_f1(nlp, examples),
+        **ModelBenchmark.measure_throughput(nlp, texts),
+        'entities': ModelBenchmark.extract_entity_sets(nlp, texts)
+    }
+
+
+class ModelQuantizer:
+    """
+    Outil de quantification des poids d'un modèle SpaCy
+    
+    Seuls les tableaux de poids volumineux (tables d'embeddings, matrices)
+    sont quantifiés ; les petits vecteurs (biais, normalisation) restent
+    en float32.
+    """
+    
+    SUPPORTED_DTYPES = ('int8', 'float16')
+    # Taille minimale d'un tableau pour être quantifié
+    MIN_QUANTIZED_SIZE = 1024
+    
+    def __init__(self, dtype: str = 'int8', components: List[str] = None):
+        """
+        Initialise l'outil de quantification
+        
+        Args:
+            dtype (str): Type cible des poids ('int8' ou 'float16')
+            components (List[str]): Composants à quantifier (défaut : tok2vec et ner)
+        """
+        if dtype not in self.SUPPORTED_DTYPES:
+            raise ValueError(f"Type de quantification non supporté : {dtype}")
+        
+        self.dtype = dtype
+        self.components = components or ['tok2vec', 'ner']
+    
+    def _quantize_array(self, array: np.ndarray) -> Any:
+        """
+        Quantifie un tableau de poids
+        
+        Args:
+            array (np.ndarray): Poids en float32
+        
+        Returns:
+            Any: Tableau d'origine s'il est trop petit, sinon dictionnaire
+                décrivant le tableau quantifié
+        """
+        array = np.asarray(array)
+        if array.dtype.kind != 'f' or array.ndim < 2 or array.size < self.MIN_QUANTIZED_SIZE:
+            return array
+        
+        if self.dtype == 'float16':
+            return {'dtype': 'float16', 'data': array.astype(np.float16)}
+        
+        # int8 symétrique avec une échelle par ligne (dernier axe)
+        max_abs = np.abs(array).max(axis=-1, keepdims=True)
+        scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        data = np.clip(np.rint(array / scale), -127, 127).astype(np.int8)
+        return {'dtype': 'int8', 'data': data, 'scale': scale}
+    
+    @staticmethod
+    def _dequantize_array(value: Any) -> Any:
+        """
+        Reconvertit un tableau quantifié en float32
+        
+        Args:
+            value (Any): Tableau ou dictionnaire produit par _quantize_array
+        
+        Returns:
+            Any: Tableau float32 (ou valeur d'origine si non quantifiée)
+        """
+        if not isinstance(value, dict):
+            return value
+        if value['dtype'] == 'int8':
+            return value['data'].astype(np.float32) * value['scale']
+        return value['data'].astype(np.float32)
+    
+    def quantize_model(self, model_path: str, output_path: str) -> Dict[str, Any]:
+        """
+        Crée une copie quantifiée d'un modèle entraîné
+        
+        Args:
+            model_path (str): Chemin du modèle d'origine (float32)
+            output_path (str): Dossier de sortie du modèle quantifié
+        
+        Returns:
+            Dict: Statistiques de quantification (tailles des poids par composant)
+        """
+        print(f"🗜️ Quantification {self.dtype} du modèle : {model_path}")
+        nlp = spacy.load(model_path)
+        
+        output_dir = Path(output_path)
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        nlp.to_disk(output_dir)
+        
+        components = [name for name in self.components if name in nlp.pipe_names]
+        if not components:
+            raise ValueError(f"Aucun des composants {self.components} n'est présent dans le modèle")
+        
+        report = {'dtype': self.dtype, 'components': {}}
+        for name in components:
+            msg = nlp.get_pipe(name).model.to_dict()
+            original_bytes = quantized_bytes = 0
+            
+            for node_params in msg['params']:
+                for param_name, value in node_params.items():
+                    if value is None:
+                        continue
+                    original_bytes += value.nbytes
+                    quantized = self._quantize_array(value)
+                    if isinstance(quantized, dict):
+                        quantized_bytes += quantized['data'].nbytes
+                        quantized_bytes += quantized.get('scale', np.zeros(0)).nbytes
+                    else:
+                        quantized_bytes += quantized.nbytes
+                    node_params[param_name] = quantized
+            
+            # Les poids quantifiés remplacent le fichier de poids float32
+            component_dir = output_dir / name
+            (component_dir / "model").unlink()
+            with open(component_dir / QUANTIZED_WEIGHTS_FILE, 'wb') as f:
+                f.write(srsly.msgpack_dumps(msg))
+            
+            report['components'][name] = {
+                'float32_bytes': original_bytes,
+                'quantized_bytes': quantized_bytes
+            }
+            print(f"  - {name}: {original_bytes / 1e6:.2f} Mo → {quantized_bytes / 1e6:.2f} Mo")
+        
+        quantization_info = {
+            'dtype': self.dtype,
+            'components': components,
+            'source_model': str(model_path),
+            'quantization_date': datetime.now().isoformat()
+        }
+        with open(output_dir / QUANTIZATION_FILE, 'w', encoding='utf-8') as f:
+            json.dump(quantization_info, f, indent=2)
+        
+        print(f"💾 Modèle quantifié sauvegardé dans : {output_dir}")
+        return report
+    
+    @staticmethod
+    def is_quantized_model(model_path: str) -> bool:
+        """
+        Indique si un dossier contient un modèle quantifié
+        
+        Args:
+            model_path (str): Chemin vers le modèle
+        
+        Returns:
+            bool: True si le modèle a été produit par quantize_model
+        """
+        return (Path(model_path) / QUANTIZATION_FILE).exists()
+    
+    @staticmethod
+    def load_quantized_model(model_path: str, exclude: List[str] = None):
+        """
+        Charge un modèle quantifié pour l'inférence
+        
+        Le pipeline est construit depuis sa configuration, les composants non
+        quantifiés sont chargés normalement, puis les poids quantifiés sont
+        reconvertis en float32 dans les composants concernés.
+        
+        Args:
+            model_path (str): Chemin vers le modèle quantifié
+            exclude (List[str]): Champs supplémentaires à ne pas charger (ex. vectors)
+        
+        Returns:
+            Language: Pipeline SpaCy prêt pour l'inférence
+        """
+        model_dir = Path(model_path)
+        with open(model_dir / QUANTIZATION_FILE, 'r', encoding='utf-8') as f:
+            quantization_info = json.load(f)
+        components = quantization_info['components']
+        
+        config = util.load_config(model_dir / "config.cfg")
+        nlp = util.load_model_from_config(config, meta=util.get_model_meta(model_dir))
+        nlp.from_disk(model_dir, exclude=components + (exclude or []))
+        
+        for name in components:
+            proc = nlp.get_pipe(name)
+            proc.from_disk(model_dir / name, exclude=["vocab", "model"])
+            
+            with open(model_dir / name / QUANTIZED_WEIGHTS_FILE, 'rb') as f:
+                msg = srsly.msgpack_loads(f.read())
+            for node_params in msg['params']:
+                for param_name, value in node_params.items():
+                    node_params[param_name] = ModelQuantizer._dequantize_array(value)
+            proc.model.from_dict(msg)
+        
+        return nlp
+    
+    @staticmethod
+    def read_quantized_params(nlp, model_path: str) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """
+        Relit les poids quantifiés d'un modèle, rattachés aux nœuds thinc chargés
+        
+        Les paramètres de model.quant suivent l'ordre de model.walk() : ils
+        sont associés aux nœuds du pipeline par leur identifiant, pour qu'un
+        backend d'inférence puisse utiliser les poids int8/float16 d'origine.
+        
+        Args:
+            nlp (Language): Pipeline chargé depuis model_path
+            model_path (str): Chemin vers le modèle quantifié
+        
+        Returns:
+            Dict: Identifiant de nœud → {nom du paramètre: tableau quantifié}
+        """
+        model_dir = Path(model_path)
+        with open(model_dir / QUANTIZATION_FILE, 'r', encoding='utf-8') as f:
+            components = json.load(f)['components']
+        
+        quantized_params = {}
+        for name in components:
+            if name not in nlp.pipe_names:
+                continue
+            with open(model_dir / name / QUANTIZED_WEIGHTS_FILE, 'rb') as f:
+                msg = srsly.msgpack_loads(f.read())
+            for node, node_params in zip(nlp.get_pipe(name).model.walk(), msg['params']):
+                quantized = {param_name: value for param_name, value in node_params.items()
+                             if isinstance(value, dict)}
+                if quantized:
+                    quantized_params[node.id] = quantized
+        return quantized_params
+    
+    def check_parity(self, original_path: str, quantized_path: str,
+                     heldout_file: str, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Vérifie la parité des sorties et compare vitesse, mémoire et taille
+        
+        Chaque modèle est chargé et mesuré dans un processus neuf, avec le
+        backend OpenVINO : aucun des deux ne supporte seul le démarrage
+        d'OpenVINO ou ne profite des caches de l'autre. Seules les matrices
+        maxout sont exécutées en int8/float16 ; le gain attendu porte
+        surtout sur la taille sur disque.
+        
+        Args:
+            original_path (str): Chemin du modèle d'origine (float32)
+            quantized_path (str): Chemin du modèle quantifié
+            heldout_file (str): Fichier d'exemples annotés (ex. training_data_*.json)
+            limit (int): Nombre maximum d'exemples utilisés
+        
+        Returns:
+            Dict: Rapport de parité, de F1, de vitesse, de mémoire et de taille
+        """
+        print(f"🔍 Contrôle de parité sur : {heldout_file}")
+        
+        report = {}
+        entities = {}
+        for name, path in (('original', original_path), ('quantized', quantized_path)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                measures = executor.submit(_measure_model, path, heldout_file, limit).result()
+            entities[name] = measures.pop('entities')
+            report[name] = {'disk_bytes': ModelBenchmark.directory_size(path), **measures}
+        
+        report['parity'] = ModelBenchmark.compare_entity_sets(entities['original'], entities['quantized'])
+        report['speedup'] = report['quantized']['docs_per_second'] / report['original']['docs_per_second']
+        report['disk_ratio'] = report['quantized']['disk_bytes'] / report['original']['disk_bytes']
+        
+        parity = report['parity']
+        print(f"📊 Documents identiques : {parity['identical_documents_rate']:.1%} "
+              f"| F1 vs original : {parity['f1']:.4f}")
+        for name in ('original', 'quantized'):
+            info = report[name]
+            print(f"  - {name}: {info['disk_bytes'] / 1e6:.1f} Mo, chargement {info['load_seconds']:.2f}s, "
+                  f"+{info['rss_delta_mb']:.0f} Mo RSS, {info['docs_per_second']:.0f} docs/s, F1 {info['f1']:.3f}")
+        print(f"💾 Taille sur disque : x{report['disk_ratio']:.2f} | débit : x{report['speedup']:.2f} "
+              f"(poids d'embeddings reconvertis en float32 : mémoire à l'inférence inchangée)")
+        
+        return report
+
+def main():
+    """
+    Point d'entrée en ligne de commande de l'outil de quantification
+    """
+    parser = argparse.ArgumentParser(description="Quantification des poids d'un modèle SpaCy")
+    parser.add_argument("model_path", help="Dossier du modèle entraîné")
+    parser.add_argument("output_path", help="Dossier de sortie du modèle quantifié")
+    parser.add_argument("--dtype", choices=ModelQuantizer.SUPPORTED_DTYPES, default='int8')
+    parser.add_argument("--components", nargs='+', default=['tok2vec', 'ner'])
+    parser.add_argument("--heldout", help="Fichier training_data_*.json pour le contrôle de parité")
+    args = parser.parse_args()
+    
+    quantizer = ModelQuantizer(args.dtype, args.components)
+    quantizer.quantize_model(args.model_path, args.output_path)
+    if args.heldout:
+        quantizer.check_parity(args.model_path, args.output_path, args.heldout)
+
+
+if __name__ == "__main__":
+    main()
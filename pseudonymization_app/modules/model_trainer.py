@@ -12,15 +12,27 @@ Version corrigée et stabilisée.
 
 import spacy
 from spacy.training import Example
+from spacy.tokens import DocBin
 from spacy.util import minibatch, compounding
+from spacy.attrs import ORTH
 import random
 import json
 import time
+import shutil
+import tarfile
+import tempfile
+import argparse
+import srsly
+import numpy as np
 from pathlib import Path
-from typing import List, Dict, Tuple, Callable, Any
+from typing import List, Dict, Tuple, Callable, Any, Iterator, Iterable
 from datetime import datetime
 import traceback
 
+from model_loader import ModelLoader
+from benchmark import ModelBenchmark
+from deduplication import ExampleDeduplicator
+
 class SpacyModelTrainer:
     """
     Gestionnaire d'entraînement pour les modèles SpaCy NER personnalisés.
@@ -75,17 +87,38 @@ class SpacyModelTrainer:
         print(f"🎯 Entités configurées dans le modèle : {self.custom_entities}")
         return True
     
-    def prepare_training_data(self, raw_training_data: List[Tuple[str, Dict]]) -> List[Example]:
-        """ Prépare les données brutes au format SpaCy Example. """
+    def prepare_training_data(self, raw_training_data: Iterable[Tuple[str, Dict]]) -> List[Example]:
+        """ Prépare les données brutes (liste ou flux) au format SpaCy Example (les doublons exacts sont ignorés). """
         examples = []
-        print(f"🔄 Préparation de {len(raw_training_data)} exemples...")
+        deduplicator = ExampleDeduplicator()
+        print("🔄 Préparation des exemples...")
         for text, annotations in raw_training_data:
+            if not deduplicator.add(text, annotations):
+                continue
             try:
                 doc = self.nlp.make_doc(text)
                 example = Example.from_dict(doc, annotations)
                 examples.append(example)
             except Exception as e:
                 print(f"⚠️ Erreur de préparation pour l'exemple '{text[:50]}...' : {e}")
+        print(deduplicator.format_report())
+        print(f"✅ {len(examples)} exemples préparés avec succès.")
+        return examples
+    
+    def load_docbin_examples(self, filepath: str) -> List[Example]:
+        """ Charge un corpus DocBin (.spacy) en Examples, sans re-tokeniser les textes (doublons exacts ignorés). """
+        print(f"🔄 Chargement du corpus binaire : {filepath}")
+        examples = []
+        deduplicator = ExampleDeduplicator()
+        for reference in DocBin().from_disk(filepath).get_docs(self.nlp.vocab):
+            entities = [(ent.start_char, ent.end_char, ent.label_) for ent in reference.ents]
+            if not deduplicator.add(reference.text, {"entities": entities}):
+                continue
+            # Le document prédit reprend les tokens de la référence, sans ses entités
+            predicted = reference.copy()
+            predicted.set_ents([], default="missing")
+            examples.append(Example(predicted, reference))
+        print(deduplicator.format_report())
         print(f"✅ {len(examples)} exemples préparés avec succès.")
         return examples
     
@@ -104,11 +137,13 @@ class SpacyModelTrainer:
             return {"ents_p": 0.0, "ents_r": 0.0, "ents_f": 0.0}
         return self.nlp.evaluate(examples)
 
-    def train_model(self, training_data: List[Tuple[str, Dict]], 
+    def train_model(self, training_data: Iterable[Tuple[str, Dict]], 
                    config: Dict[str, Any] = None,
                    progress_callback: Callable[[int, int, Dict], None] = None) -> Dict[str, Any]:
         """
         Effectue l'entraînement du modèle avec la logique corrigée.
+        training_data peut être une liste, un flux d'exemples (lu une seule fois)
+        ou le chemin d'un corpus DocBin (.spacy).
         """
         if config is None:
             config = self.default_config.copy()
@@ -116,7 +151,10 @@ class SpacyModelTrainer:
         print(f"🚀 Début de l'entraînement avec la configuration : {config}")
         
         try:
-            examples = self.prepare_training_data(training_data)
+            if isinstance(training_data, str):
+                examples = self.load_docbin_examples(training_data)
+            else:
+                examples = self.prepare_training_data(training_data)
             if not examples:
                 raise ValueError("Aucun exemple valide pour l'entraînement.")
             
@@ -203,8 +241,12 @@ class SpacyModelTrainer:
             traceback.print_exc() # Imprime une trace détaillée de l'erreur dans la console
             return {'success': False, 'error': str(e)}
 
-    def save_model(self, output_path: str, model_info: Dict[str, Any] = None) -> str:
-        """ Sauvegarde le modèle entraîné sur le disque. """
+    def save_model(self, output_path: str, model_info: Dict[str, Any] = None,
+                   inference_only: bool = False) -> str:
+        """ Sauvegarde le modèle entraîné sur le disque (ou une archive minimale pour l'inférence). """
+        if inference_only:
+            return self.export_inference_model(output_path, model_info)
+        
         output_dir = Path(output_path)
         output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -222,10 +264,210 @@ class SpacyModelTrainer:
         print(f"💾 Modèle sauvegardé dans : {output_dir}")
         return str(output_dir)
     
+    @staticmethod
+    def iter_corpus_texts(corpus_files: List[str]) -> Iterator[str]:
+        """ Parcourt les textes d'un corpus (training_data_*.json ou fichiers texte, une ligne par texte). """
+        for corpus_file in corpus_files:
+            if corpus_file.endswith('.json'):
+                with open(corpus_file, 'r', encoding='utf-8') as f:
+                    for item in json.load(f):
+                        if 'text' in item:
+                            yield item['text']
+            else:
+                with open(corpus_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            yield line.strip()
+    
+    def prune_vectors(self, model_path: str, output_path: str, n_vectors: int,
+                      corpus_files: List[str], heldout_file: str = None) -> Dict[str, Any]:
+        """
+        Réduit la table de vecteurs statiques aux n_vectors clés les plus fréquentes du corpus.
+        Les autres mots sont redirigés vers le vecteur conservé le plus proche (cosinus).
+        """
+        print(f"✂️ Élagage des vecteurs de {model_path} à {n_vectors} entrées")
+        nlp = ModelLoader.load(model_path)
+        vocab = nlp.vocab
+        if vocab.vectors.shape[0] <= n_vectors:
+            raise ValueError(f"La table ne contient que {vocab.vectors.shape[0]} vecteurs")
+        
+        # Fréquences des formes (ORTH) dans nos corpus
+        orth_arrays = [doc.to_array(ORTH) for doc in nlp.tokenizer.pipe(self.iter_corpus_texts(corpus_files))]
+        if not any(len(orth_array) for orth_array in orth_arrays):
+            raise ValueError("Le corpus d'élagage est vide")
+        orths, counts = np.unique(np.concatenate(orth_arrays), return_counts=True)
+        print(f"📚 {int(counts.sum())} tokens, {len(orths)} formes distinctes dans le corpus")
+        
+        # prune_vectors conserve les lexèmes de plus forte probabilité ; les formes
+        # absentes du corpus gardent la probabilité par défaut et l'ordre d'origine
+        created_prob_table = not vocab.lookups.has_table("lexeme_prob")
+        if created_prob_table:
+            vocab.lookups.add_table("lexeme_prob")
+        log_probs = np.log(counts / counts.sum())
+        for orth, log_prob in zip(orths.tolist(), log_probs.tolist()):
+            vocab[orth].prob = log_prob
+        
+        remapped = vocab.prune_vectors(n_vectors)
+        if created_prob_table:
+            vocab.lookups.remove_table("lexeme_prob")
+        
+        output_dir = Path(output_path)
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        nlp.to_disk(output_dir)
+        for extra_file in ("model_metadata.json",):
+            if (Path(model_path) / extra_file).exists():
+                shutil.copy(Path(model_path) / extra_file, output_dir / extra_file)
+        print(f"💾 Modèle élagué sauvegardé dans : {output_dir} ({len(remapped)} mots redirigés)")
+        
+        report = {'n_vectors': n_vectors, 'remapped_words': len(remapped)}
+        examples = ModelBenchmark.load_training_file(heldout_file) if heldout_file else []
+        for name, path in (('original', model_path), ('pruned', str(output_dir))):
+            loaded_nlp, load_seconds = ModelBenchmark.time_model_load(lambda: ModelLoader.load(path))
+            report[name] = {
+                'disk_bytes': ModelBenchmark.directory_size(path),
+                'load_seconds': load_seconds,
+                'f1': ModelBenchmark.evaluate_f1(loaded_nlp, examples) if examples else None
+            }
+            f1 = report[name]['f1']
+            print(f"  - {name}: {report[name]['disk_bytes'] / 1e6:.1f} Mo, chargement {load_seconds:.2f}s"
+                  + (f", F1 {f1:.3f}" if f1 is not None else ""))
+        return report
+    
+    def distill_model(self, teacher_path: str, corpus_files: List[str],
+                      config: Dict[str, Any] = None, heldout_file: str = None,
+                      progress_callback: Callable[[int, int, Dict], None] = None) -> Dict[str, Any]:
+        """
+        Entraîne un élève compact (tok2vec + ner) sur les annotations produites par un modèle enseignant.
+        Le corpus non annoté est étiqueté par l'enseignant via nlp.pipe, puis train_model
+        (avec son arrêt anticipé) est réutilisé sur ces annotations « silver ».
+        """
+        print(f"🎓 Distillation du modèle enseignant : {teacher_path}")
+        teacher = ModelLoader.load(teacher_path)
+        if "ner" not in teacher.pipe_names:
+            raise ValueError("Le modèle enseignant ne contient pas de composant NER")
+        
+        texts = list(self.iter_corpus_texts(corpus_files))
+        if not texts:
+            raise ValueError("Le corpus de distillation est vide")
+        
+        start_time = time.time()
+        silver_data = []
+        for doc in teacher.pipe(texts, batch_size=64):
+            entities = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
+            silver_data.append((doc.text, {"entities": entities}))
+        print(f"🏷️ {len(silver_data)} textes annotés par l'enseignant en {time.time() - start_time:.1f}s")
+        
+        # Élève : pipeline vide avec un NER et son propre tok2vec (sans vecteurs statiques)
+        self.nlp = spacy.blank(teacher.lang)
+        self.base_model_name = f"distilled:{teacher_path}"
+        self.ner = self.nlp.add_pipe("ner")
+        for label in teacher.get_pipe("ner").labels:
+            self.ner.add_label(label)
+        self.custom_entities = list(self.ner.labels)
+        sample_examples = self.prepare_training_data(silver_data[:100])
+        self.nlp.initialize(lambda: sample_examples)
+        
+        training_result = self.train_model(silver_data, config, progress_callback)
+        if not training_result.get('success'):
+            return training_result
+        
+        # Comparaison enseignant / élève sur le fichier annoté (ou un extrait du corpus)
+        gold_examples = ModelBenchmark.load_training_file(heldout_file) if heldout_file else []
+        eval_texts = [text for text, _ in gold_examples] or texts[:1000]
+        teacher_speed = ModelBenchmark.measure_throughput(teacher, eval_texts)
+        student_speed = ModelBenchmark.measure_throughput(self.nlp, eval_texts)
+        
+        report = {
+            'training': training_result,
+            'silver_examples': len(silver_data),
+            'speed_ratio': student_speed['docs_per_second'] / teacher_speed['docs_per_second'],
+            'teacher_docs_per_second': teacher_speed['docs_per_second'],
+            'student_docs_per_second': student_speed['docs_per_second'],
+            'agreement': ModelBenchmark.compare_entities(teacher, self.nlp, eval_texts)
+        }
+        if gold_examples:
+            report['teacher_f1'] = ModelBenchmark.evaluate_f1(teacher, gold_examples)
+            report['student_f1'] = ModelBenchmark.evaluate_f1(self.nlp, gold_examples)
+            report['f1_gap'] = report['teacher_f1'] - report['student_f1']
+        
+        print(f"📊 Élève x{report['speed_ratio']:.1f} plus rapide que l'enseignant, "
+              f"accord F1 {report['agreement']['f1']:.3f}"
+              + (f", écart de F1 {report['f1_gap']:+.3f}" if gold_examples else ""))
+        return report
+    
+    def export_inference_model(self, output_path: str, model_info: Dict[str, Any] = None) -> str:
+        """
+        Exporte une archive .tar.gz ne contenant que le tokenizer, le NER et le tok2vec qu'il écoute.
+        Les chaînes inutiles à l'inférence sont retirées de strings.json ; la taille et le temps
+        de chargement du modèle minimal sont enregistrés dans model_metadata.json.
+        """
+        if not self.nlp or "ner" not in self.nlp.pipe_names:
+            raise ValueError("Aucun modèle avec composant NER à exporter")
+        
+        kept_components = ["ner"]
+        if "tok2vec" in self.nlp.pipe_names and \
+                "ner" in getattr(self.nlp.get_pipe("tok2vec"), "listening_components", []):
+            kept_components.insert(0, "tok2vec")
+        
+        # Pipeline minimal partageant le vocabulaire (vecteurs, tables de normalisation)
+        slim_nlp = spacy.blank(self.nlp.lang, vocab=self.nlp.vocab)
+        slim_nlp.tokenizer = self.nlp.tokenizer
+        for name in kept_components:
+            slim_nlp.add_pipe(name, source=self.nlp)
+        slim_nlp.meta.update({key: value for key, value in self.nlp.meta.items()
+                              if key in ("name", "version", "description", "author")})
+        
+        archive_path = Path(output_path)
+        if not archive_path.name.endswith(".tar.gz"):
+            archive_path = archive_path.with_name(archive_path.name + ".tar.gz")
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with tempfile.TemporaryDirectory(prefix="slim_model_") as tmp_dir:
+            model_dir = Path(tmp_dir)
+            slim_nlp.to_disk(model_dir)
+            
+            # Chaînes conservées : celles de la langue, des labels et des composants gardés
+            needed_strings = set(spacy.blank(self.nlp.lang).vocab.strings)
+            for name in kept_components:
+                needed_strings.update(getattr(slim_nlp.get_pipe(name), "labels", ()))
+            all_strings = srsly.read_json(model_dir / "vocab" / "strings.json")
+            kept_strings = [string for string in all_strings if string in needed_strings]
+            srsly.write_json(model_dir / "vocab" / "strings.json", kept_strings)
+            
+            _, load_seconds = ModelBenchmark.time_model_load(lambda: ModelLoader.load(str(model_dir)))
+            metadata = {
+                'base_model': self.base_model_name,
+                'custom_entities': self.custom_entities,
+                'training_date': datetime.now().isoformat(),
+                'model_info': model_info or {},
+                'inference_export': {
+                    'components': kept_components,
+                    'strings_kept': len(kept_strings),
+                    'strings_dropped': len(all_strings) - len(kept_strings),
+                    'disk_bytes': ModelBenchmark.directory_size(model_dir),
+                    'load_seconds': load_seconds
+                }
+            }
+            with open(model_dir / "model_metadata.json", 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2)
+            
+            with tarfile.open(archive_path, "w:gz") as archive:
+                for item in sorted(model_dir.iterdir()):
+                    archive.add(item, arcname=item.name)
+        
+        export_info = metadata['inference_export']
+        print(f"📦 Modèle d'inférence exporté : {archive_path} "
+              f"({ModelBenchmark.directory_size(archive_path) / 1e6:.1f} Mo compressé, "
+              f"{export_info['disk_bytes'] / 1e6:.1f} Mo décompressé, "
+              f"chargement {export_info['load_seconds']:.2f}s, "
+              f"{export_info['strings_dropped']} chaînes retirées)")
+        return str(archive_path)
+    
     def load_trained_model(self, model_path: str) -> bool:
         """ Charge un modèle précédemment entraîné. """
         try:
-            self.nlp = spacy.load(model_path)
+            self.nlp = ModelLoader.load(model_path)
             print(f"✅ Modèle chargé depuis : {model_path}")
             return True
         except Exception as e:
@@ -253,4 +495,51 @@ class SpacyModelTrainer:
             entities = [{"text": ent.text, "label": ent.label_} for ent in doc.ents]
             return {"entities": entities, "processed_successfully": True}
         except Exception as e:
-            return {"error": str(e), "processed_successfully": False}
\ No newline at end of file
+            return {"error": str(e), "processed_successfully": False}
+
+
+def main():
+    """ Point d'entrée en ligne de commande des outils d'optimisation de modèles. """
+    parser = argparse.ArgumentParser(description="Optimisation des modèles SpaCy entraînés")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    prune_parser = subparsers.add_parser("prune-vectors", help="Élague la table de vecteurs statiques")
+    prune_parser.add_argument("model_path", help="Dossier du modèle entraîné")
+    prune_parser.add_argument("output_path", help="Dossier de sortie du modèle élagué")
+    prune_parser.add_argument("--n-vectors", type=int, default=20000)
+    prune_parser.add_argument("--corpus", nargs='+', required=True,
+                              help="Fichiers training_data_*.json ou textes (une ligne par texte)")
+    prune_parser.add_argument("--heldout", help="Fichier training_data_*.json pour le F1 avant/après")
+    distill_parser = subparsers.add_parser("distill", help="Distille un modèle enseignant dans un élève compact")
+    distill_parser.add_argument("teacher_path", help="Dossier du modèle enseignant (ex. data/modele_lg_multi)")
+    distill_parser.add_argument("output_path", help="Dossier de sortie du modèle élève")
+    distill_parser.add_argument("--corpus", nargs='+', required=True,
+                                help="Textes non annotés (fichiers texte ou training_data_*.json)")
+    distill_parser.add_argument("--heldout", help="Fichier training_data_*.json pour l'écart de F1")
+    distill_parser.add_argument("--n-iter", type=int, default=30)
+    export_parser = subparsers.add_parser("export-inference", help="Exporte une archive NER minimale")
+    export_parser.add_argument("model_path", help="Dossier du modèle entraîné")
+    export_parser.add_argument("output_path", help="Archive de sortie (.tar.gz)")
+    args = parser.parse_args()
+    
+    trainer = SpacyModelTrainer()
+    if args.command == "prune-vectors":
+        trainer.prune_vectors(args.model_path, args.output_path, args.n_vectors,
+                              args.corpus, args.heldout)
+    elif args.command == "distill":
+        config = dict(trainer.default_config, n_iter=args.n_iter)
+        report = trainer.distill_model(args.teacher_path, args.corpus, config, args.heldout)
+        if 'speed_ratio' in report:
+            trainer.save_model(args.output_path, {
+                'distilled_from': args.teacher_path,
+                'speed_ratio': report['speed_ratio'],
+                'f1_gap': report.get('f1_gap')
+            })
+    elif args.command == "export-inference":
+        if trainer.load_trained_model(args.model_path):
+            trainer.custom_entities = list(trainer.nlp.get_pipe("ner").labels)
+            trainer.save_model(args.output_path, inference_only=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backend d'inférence OpenVINO pour le NER
+========================================
+
+Ce module exporte le réseau d'encodage du NER (pile résiduelle
+fenêtre + maxout + normalisation de MaxoutWindowEncoder) vers le format
+IR d'OpenVINO et l'exécute avec le plugin CPU. SpaCy conserve la
+tokenisation, les embeddings hachés et le décodage par transitions.
+Pour un modèle quantifié, les matrices maxout sont exportées en int8 ou
+float16 et décompressées dans le graphe par le plugin.
+
+OpenVINO est optionnel : si la bibliothèque est absente ou si
+l'architecture du modèle n'est pas reconnue, le modèle reste en thinc natif.
+"""
+
+import os
+import shutil
+import hashlib
+import argparse
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Any
+from thinc.api import Model
+
+from benchmark import ModelBenchmark
+from model_loader import ModelLoader, OPENVINO_LAYER_NAME
+from model_quantizer import ModelQuantizer
+
+try:
+    import openvino as ov
+    from openvino.runtime import opset13 as ov_ops
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    OPENVINO_AVAILABLE = False
+
+# Cache des fichiers IR exportés, hors des dossiers de modèles (un fichier
+# par empreinte des poids de l'encodeur)
+OPENVINO_CACHE_DIR = Path(tempfile.gettempdir()) / "pseudonymization_openvino"
+# À incrémenter lorsque le graphe exporté change : les IR en cache deviennent obsolètes
+OPENVINO_EXPORT_VERSION = 1
+# Préfixe du nom des encodeurs dans le graphe thinc
+ENCODER_PREFIX = "with_array(residual(expand_window>>maxout>>layernorm"
+# Epsilon de la normalisation thinc (LayerNorm)
+LAYERNORM_EPS = 1e-08
+
+
+def _openvino_forward(model: Model, X, is_train: bool):
+    """
+    Exécute l'encodeur compilé par OpenVINO (inférence uniquement)
+    """
+    if is_train:
+        raise ValueError("Le backend OpenVINO ne supporte que l'inférence")
+    
+    compiled = model.attrs['compiled_model']
+    X = np.ascontiguousarray(model.ops.to_numpy(X), dtype=np.float32)
+    if len(X) == 0:
+        return X, lambda dY: dY
+    Y = compiled([X])[compiled.output(0)]
+    return model.ops.asarray2f(Y), lambda dY: dY
+
+
+class OpenVINOBackend:
+    """
+    Remplace les encodeurs thinc d'un pipeline par leur version OpenVINO
+    """
+    
+    def __init__(self, device: str = "CPU", precision: str = "f32"):
+        """
+        Initialise le backend
+        
+        Args:
+            device (str): Plugin OpenVINO utilisé pour l'inférence
+            precision (str): Précision de calcul ('f32' pour la parité avec
+                thinc ; 'bf16' plus rapide sur les CPU compatibles, au prix
+                d'écarts numériques)
+        """
+        self.device = device
+        self.precision = precision
+        self.core = ov.Core() if OPENVINO_AVAILABLE else None
+    
+    def _find_encoders(self, nlp) -> List[Model]:
+        """
+        Recherche les encodeurs MaxoutWindowEncoder utilisés par le NER
+        
+        Si le NER écoute un composant tok2vec partagé, l'encodeur de ce
+        composant est aussi retenu.
+        
+        Args:
+            nlp (Language): Pipeline SpaCy chargé
+        
+        Returns:
+            List[Model]: Nœuds with_array des encodeurs trouvés
+        """
+        targets = [nlp.get_pipe("ner").model]
+        if any(node.name == "tok2vec-listener" for node in targets[0].walk()):
+            if "tok2vec" in nlp.pipe_names:
+                targets.append(nlp.get_pipe("tok2vec").model)
+        
+        encoders = []
+        for target in targets:
+            for node in target.walk():
+                if node.name.startswith(ENCODER_PREFIX) and node not in encoders:
+                    encoders.append(node)
+        return encoders
+    
+    @staticmethod
+    def _read_residual_blocks(encoder: Model, quantized_params: Dict[int, Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Extrait les poids de chaque bloc résiduel d'un encodeur
+        
+        Args:
+            encoder (Model): Nœud with_array de l'encodeur
+            quantized_params (Dict): Poids quantifiés par identifiant de nœud
+                (voir ModelQuantizer.read_quantized_params)
+        
+        Returns:
+            List[Dict]: Pour chaque bloc, taille de fenêtre et poids maxout/layernorm
+        """
+        supported = {"expand_window", "maxout", "layernorm", "dropout"}
+        stack = encoder.layers[0]
+        # Une profondeur de 1 donne directement le bloc, sinon une chaîne de blocs
+        residuals = [stack] if stack.name.startswith("residual(") and len(stack.layers) == 1 \
+            else stack.layers
+        blocks = []
+        for node in residuals:
+            if not node.name.startswith("residual("):
+                raise ValueError(f"Bloc non résiduel dans l'encodeur : {node.name}")
+            block = {}
+            for child in node.walk():
+                if child.name in ("expand_window", "maxout", "layernorm"):
+                    block[child.name] = child
+                elif child is not node and ">>" not in child.name and child.name not in supported:
+                    raise ValueError(f"Couche non supportée dans l'encodeur : {child.name}")
+            if set(block) != {"expand_window", "maxout", "layernorm"}:
+                raise ValueError("Structure de bloc résiduel non reconnue")
+            
+            maxout = block["maxout"]
+            blocks.append({
+                'window_size': block["expand_window"].attrs["window_size"],
+                'nO': maxout.get_dim("nO"),
+                'nP': maxout.get_dim("nP"),
+                'nI': maxout.get_dim("nI"),
+                'W': maxout.ops.to_numpy(maxout.get_param("W")),
+                'W_quantized': (quantized_params or {}).get(maxout.id, {}).get("W"),
+                'b': maxout.ops.to_numpy(maxout.get_param("b")),
+                'G': block["layernorm"].ops.to_numpy(block["layernorm"].get_param("G")),
+                'beta': block["layernorm"].ops.to_numpy(block["layernorm"].get_param("b"))
+            })
+        
+        if not blocks:
+            raise ValueError("Aucun bloc résiduel trouvé dans l'encodeur")
+        return blocks
+    
+    @staticmethod
+    def _build_encoder_graph(blocks: List[Dict[str, Any]], width: int):
+        """
+        Construit le graphe OpenVINO équivalent à la pile résiduelle thinc
+        
+        Args:
+            blocks (List[Dict]): Blocs résiduels lus par _read_residual_blocks
+            width (int): Largeur des vecteurs en entrée de l'encodeur
+        
+        Returns:
+            ov.Model: Graphe OpenVINO (entrée et sortie de forme [N, width])
+        """
+        X = ov_ops.parameter([-1, width], np.float32, name="X")
+        output = X
+        
+        for block in blocks:
+            nW = block['window_size']
+            
+            # Fenêtre glissante (équivalent de seq2col) : [x(i-nW), ..., x(i+nW)]
+            padded = ov_ops.pad(output, np.array([nW, 0], dtype=np.int64),
+                                np.array([nW, 0], dtype=np.int64), "constant",
+                                np.array(0, dtype=np.float32))
+            columns = []
+            for k in range(2 * nW + 1):
+                stop = k - 2 * nW if k < 2 * nW else np.iinfo(np.int64).max
+                columns.append(ov_ops.slice(padded, np.array([k], dtype=np.int64),
+                                            np.array([stop], dtype=np.int64),
+                                            np.array([1], dtype=np.int64),
+                                            np.array([0], dtype=np.int64)))
+            windowed = ov_ops.concat(columns, axis=1)
+            
+            # Maxout : projection puis maximum sur les nP morceaux
+            nO, nP, nI = block['nO'], block['nP'], block['nI']
+            projected = ov_ops.matmul(windowed, OpenVINOBackend._weights_node(block), False, True)
+            projected = ov_ops.add(projected, ov_ops.constant(
+                block['b'].reshape(1, nO * nP).astype(np.float32)))
+            pieces = ov_ops.reshape(projected, np.array([-1, nO, nP], dtype=np.int64), False)
+            best = ov_ops.reduce_max(pieces, np.array([2], dtype=np.int64), False)
+            
+            # Normalisation (LayerNorm thinc) puis connexion résiduelle
+            normalized = ov_ops.mvn(best, np.array([1], dtype=np.int64), True,
+                                    LAYERNORM_EPS, "inside_sqrt")
+            normalized = ov_ops.multiply(normalized, ov_ops.constant(
+                block['G'].reshape(1, -1).astype(np.float32)))
+            normalized = ov_ops.add(normalized, ov_ops.constant(
+                block['beta'].reshape(1, -1).astype(np.float32)))
+            output = ov_ops.add(output, normalized)
+        
+        return ov.Model([output], [X], "ner_encoder")
+    
+    @staticmethod
+    def _weights_node(block: Dict[str, Any]):
+        """
+        Crée le nœud des poids maxout, de forme [nO * nP, nI]
+        
+        Les poids quantifiés restent en int8 (avec leur échelle par ligne)
+        ou en float16 dans le graphe : le plugin CPU les décompresse à la
+        volée dans le produit matriciel.
+        
+        Args:
+            block (Dict): Bloc résiduel lu par _read_residual_blocks
+        
+        Returns:
+            ov.Node: Poids en float32 pour le produit matriciel
+        """
+        nO, nP, nI = block['nO'], block['nP'], block['nI']
+        quantized = block.get('W_quantized')
+        if quantized is None:
+            return ov_ops.constant(np.ascontiguousarray(block['W'].reshape(nO * nP, nI), dtype=np.float32))
+        
+        weights = ov_ops.convert(ov_ops.constant(np.ascontiguousarray(
+            quantized['data'].reshape(nO * nP, nI))), "f32")
+        if quantized['dtype'] == 'int8':
+            weights = ov_ops.multiply(weights, ov_ops.constant(
+                quantized['scale'].reshape(nO * nP, 1).astype(np.float32)))
+        return weights
+    
+    @staticmethod
+    def _encoder_key(blocks: List[Dict[str, Any]]) -> str:
+        """
+        Calcule l'empreinte d'un encodeur (architecture et poids exportés)
+        
+        Args:
+            blocks (List[Dict]): Blocs résiduels lus par _read_residual_blocks
+        
+        Returns:
+            str: Empreinte SHA-256 en hexadécimal
+        """
+        digest = hashlib.sha256(f"{OPENVINO_EXPORT_VERSION}:{ov.get_version()}".encode('utf-8'))
+        for block in blocks:
+            digest.update(f"{block['window_size']}:{block['nO']}:{block['nP']}:{block['nI']}".encode('utf-8'))
+            quantized = block.get('W_quantized')
+            if quantized is None:
+                arrays = [block['W']]
+            else:
+                digest.update(quantized['dtype'].encode('utf-8'))
+                arrays = [quantized['data']] + ([quantized['scale']] if 'scale' in quantized else [])
+            for array in arrays + [block['b'], block['G'], block['beta']]:
+                digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+    
+    def export_model(self, nlp, output_dir: str = OPENVINO_CACHE_DIR,
+                     quantized_params: Dict[int, Dict] = None, export: bool = True) -> List[str]:
+        """
+        Exporte les encodeurs du NER au format IR d'OpenVINO
+        
+        Chaque encodeur est enregistré sous l'empreinte de ses poids : un
+        IR déjà présent est réutilisé tel quel. L'écriture se fait dans un
+        dossier temporaire puis par renommage atomique, le fichier .xml en
+        dernier : un .xml présent dans le cache est toujours complet.
+        
+        Args:
+            nlp (Language): Pipeline SpaCy chargé
+            output_dir (str): Dossier du cache des fichiers IR
+            quantized_params (Dict): Poids quantifiés par identifiant de nœud,
+                exportés sans reconversion en float32
+            export (bool): Exporte les IR absents du cache (False dans les
+                processus du pool, qui ne font que relire les IR exportés par
+                le processus principal)
+        
+        Returns:
+            List[str]: Chemins des fichiers .xml (un par encodeur)
+        """
+        if not OPENVINO_AVAILABLE:
+            raise ImportError("OpenVINO n'est pas installé")
+        
+        encoders = self._find_encoders(nlp)
+        if not encoders:
+            raise ValueError("Aucun encodeur MaxoutWindowEncoder trouvé pour le NER")
+        
+        output_dir = Path(output_dir)
+        xml_paths = []
+        exported = 0
+        for encoder in encoders:
+            blocks = self._read_residual_blocks(encoder, quantized_params)
+            key = self._encoder_key(blocks)
+            xml_path = output_dir / f"ner_encoder_{key}.xml"
+            xml_paths.append(str(xml_path))
+            if xml_path.exists():
+                continue
+            if not export:
+                raise FileNotFoundError(f"IR OpenVINO absent du cache : {xml_path}")
+            
+            output_dir.mkdir(parents=True, exist_ok=True)
+            tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=output_dir))
+            try:
+                graph = self._build_encoder_graph(blocks, blocks[0]['nO'])
+                # Poids conservés dans leur type (compression fp16 par défaut dans save_model)
+                ov.save_model(graph, str(tmp_dir / "encoder.xml"), compress_to_fp16=False)
+                # Un autre processus a pu écrire le même IR : les fichiers sont identiques
+                os.replace(tmp_dir / "encoder.bin", xml_path.with_suffix(".bin"))
+                os.replace(tmp_dir / "encoder.xml", xml_path)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            exported += 1
+        
+        if exported:
+            print(f"📤 {exported} encodeur(s) exporté(s) au format OpenVINO IR : {output_dir}")
+        return xml_paths
+    
+    def apply(self, nlp, model_path: str = None, export: bool = True) -> bool:
+        """
+        Active le backend OpenVINO sur un pipeline chargé
+        
+        Les encodeurs sont exportés dans OPENVINO_CACHE_DIR (voir
+        export_model), compilés pour le plugin CPU puis substitués aux
+        couches thinc. Le dossier du modèle n'est pas modifié. En cas
+        d'échec, le pipeline reste inchangé.
+        
+        Args:
+            nlp (Language): Pipeline SpaCy chargé
+            model_path (str): Dossier du modèle (lecture des poids quantifiés)
+            export (bool): Exporte les IR absents du cache (voir export_model)
+        
+        Returns:
+            bool: True si le backend OpenVINO est actif
+        """
+        if not OPENVINO_AVAILABLE:
+            print("⚠️ OpenVINO n'est pas installé : inférence thinc native conservée")
+            return False
+        
+        try:
+            quantized_params = None
+            if model_path and ModelQuantizer.is_quantized_model(model_path):
+                quantized_params = ModelQuantizer.read_quantized_params(nlp, model_path)
+            xml_paths = self.export_model(nlp, OPENVINO_CACHE_DIR, quantized_params, export)
+            encoders = self._find_encoders(nlp)
+            
+            compiled_layers = []
+            for encoder, xml_path in zip(encoders, xml_paths):
+                compiled = self.core.compile_model(self.core.read_model(xml_path), self.device,
+                                                   {"INFERENCE_PRECISION_HINT": self.precision})
+                compiled_layers.append(Model(
+                    OPENVINO_LAYER_NAME,
+                    _openvino_forward,
+                    attrs={'compiled_model': compiled, 'ir_path': xml_path}
+                ))
+            
+            # Substitution uniquement quand tous les encodeurs ont été compilés
+            for encoder, layer in zip(encoders, compiled_layers):
+                encoder.layers[0] = layer
+            
+            print(f"⚡ Backend OpenVINO ({self.device}) actif pour le NER")
+            return True
+        
+        except Exception as e:
+            print(f"⚠️ Export OpenVINO impossible ({e}) : inférence thinc native conservée")
+            return False
+    
+    def benchmark(self, model_path: str, heldout_file: str, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Compare le backend OpenVINO au thinc natif sur un même modèle
+        
+        Args:
+            model_path (str): Dossier du modèle
+            heldout_file (str): Fichier d'exemples (ex. training_data_*.json)
+            limit (int): Nombre maximum de textes utilisés
+        
+        Returns:
+            Dict: Débits des deux backends, accélération et parité des entités
+        """
+        texts = [text for text, _ in ModelBenchmark.load_training_file(heldout_file, limit)]
+        
+        native_nlp = ModelLoader.load(model_path)
+        openvino_nlp = ModelLoader.load(model_path)
+        openvino_active = self.apply(openvino_nlp, model_path)
+        
+        native = ModelBenchmark.measure_throughput(native_nlp, texts)
+        accelerated = ModelBenchmark.measure_throughput(openvino_nlp, texts)
+        
+        report = {
+            'model_path': model_path,
+            'openvino_active': openvino_active,
+            'native': native,
+            'openvino': accelerated,
+            'speedup': accelerated['docs_per_second'] / native['docs_per_second'],
+            'parity': ModelBenchmark.compare_entities(native_nlp, openvino_nlp, texts)
+        }
+        
+        print(f"📊 {Path(model_path).name} : natif {native['docs_per_second']:.0f} docs/s, "
+              f"OpenVINO {accelerated['docs_per_second']:.0f} docs/s "
+              f"(x{report['speedup']:.2f}), documents identiques "
+              f"{report['parity']['identical_documents_rate']:.1%}")
+        return report
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande : compare OpenVINO et thinc natif
+    """
+    data_dir = Path(__file__).resolve().parent.parent / "data"
+    parser = argparse.ArgumentParser(description="Benchmark du backend OpenVINO pour le NER")
+    parser.add_argument("models", nargs='*', help="Dossiers des modèles (défaut : modèles fournis)",
+                        default=[str(data_dir / name) for name in
+                                 ("modele_test", "modele_tunne", "modele_lg_multi")])
+    parser.add_argument("--heldout", default=str(data_dir / "training_data_20250606_112909.json"))
+    parser.add_argument("--device", default="CPU")
+    parser.add_argument("--precision", choices=("f32", "bf16"), default="f32")
+    args = parser.parse_args()
+    
+    backend = OpenVINOBackend(args.device, args.precision)
+    for model_path in args.models:
+        try:
+            backend.benchmark(model_path, args.heldout)
+        except Exception as e:
+            print(f"❌ Benchmark impossible pour {model_path} : {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,216 @@ des entités sensibles dans des textes, tout en maintenant un fichier de
 correspondance pour permettre la dépseudonymisation.
 """
 
-import spacy
 import json
 import hashlib
 import random
 import string
 import re
+import os
+import mmap
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Callable
 from datetime import datetime
 import uuid
+import numpy as np
+from spacy.attrs import IDX, LENGTH, ENT_IOB, ENT_TYPE, ORTH, IS_ALPHA, IS_TITLE, IS_UPPER, IS_SPACE
+from spacy.strings import get_string_id
+
+from model_loader import ModelLoader
+from benchmark import ModelBenchmark
+
+# Ponctuations de fin de phrase (règles d'escalade du mode cascade)
+_SENTENCE_END_IDS = np.array([get_string_id(p) for p in ('.', '!', '?', '…', ':')], dtype=np.uint64)
+
+# Fin de phrase suivie d'un blanc : frontière de découpage des segments
+_SENTENCE_BOUNDARY = re.compile(r'[.!?…]["»)\]]*\s')
+
+# Modèle NER propre à chaque processus du pool (mode parallèle intra-document)
+_worker_nlp = None
+# Barrière partagée par les processus du pool (mesure de la mémoire)
+_worker_barrier = None
+# Délai maximal d'attente des autres processus à la barrière (en secondes)
+WORKER_BARRIER_TIMEOUT = 120
+
+# Taille des fenêtres parcourues lors de la dépseudonymisation de fichiers
+DEPSEUDO_WINDOW_BYTES = 8 * 1024 * 1024
+# Nombre de caractères parcourus entre deux contrôles d'annulation et de
+# progression lors de la dépseudonymisation d'un texte
+DEPSEUDO_WINDOW_CHARS = 1024 * 1024
+
+
+class OperationCancelled(Exception):
+    """
+    Levée lorsqu'une pseudonymisation ou dépseudonymisation est annulée
+    """
+
+
+def _doc_entity_arrays(doc) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lit en bloc les bornes et labels des entités d'un Doc via Doc.to_array
+    
+    Args:
+        doc (Doc): Document analysé par SpaCy
+        
+    Returns:
+        Tuple[np.ndarray, ...]: (débuts, fins) en caractères et identifiants de labels
+    """
+    token_count = len(doc)
+    if token_count == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.uint64)
+    
+    # Une ligne par token : position, longueur, IOB et type d'entité
+    attrs = doc.to_array([IDX, LENGTH, ENT_IOB, ENT_TYPE])
+    iob = attrs[:, 2]
+    
+    # Une entité commence sur un token B (3) et s'arrête au premier token qui n'est pas I (1)
+    start_tokens = np.flatnonzero(iob == 3)
+    breaks = np.append(np.flatnonzero(iob != 1), token_count)
+    end_tokens = breaks[np.searchsorted(breaks, start_tokens, side='right')]
+    
+    starts = attrs[start_tokens, 0].astype(np.int64)
+    last_tokens = end_tokens - 1
+    ends = (attrs[last_tokens, 0] + attrs[last_tokens, 1]).astype(np.int64)
+    
+    return starts, ends, attrs[start_tokens, 3]
+
+
+def _init_ner_worker(model_path: str, inference_backend: str = 'native',
+                     mmap_vectors: bool = False, barrier=None):
+    """
+    Initialise un processus du pool en y chargeant le modèle une seule fois
+    
+    Args:
+        model_path (str): Chemin vers le modèle SpaCy entraîné
+        inference_backend (str): Backend d'inférence du NER ('native' ou 'openvino')
+        mmap_vectors (bool): Partage la table de vecteurs entre processus (numpy.memmap)
+        barrier (multiprocessing.Barrier): Barrière commune à tous les processus du pool
+    """
+    global _worker_nlp, _worker_barrier
+    _worker_barrier = barrier
+    # Les fichiers IR d'OpenVINO ont été exportés par le processus principal
+    _worker_nlp = ModelLoader.load(model_path, inference_backend, mmap_vectors, export_ir=False)
+
+
+def _report_worker_memory(sample_text: str) -> Tuple[int, float, float]:
+    """
+    Analyse un texte d'exemple puis mesure la mémoire du processus du pool
+    
+    Args:
+        sample_text (str): Texte analysé avant la mesure (pages de vecteurs utilisées)
+    
+    Returns:
+        Tuple[int, float, float]: (pid, RSS en Mo, PSS en Mo)
+    """
+    _worker_nlp(sample_text)
+    # Chaque processus attend les autres : aucun ne peut prendre deux tâches,
+    # les n_workers mesures viennent donc de n_workers processus distincts
+    _worker_barrier.wait(WORKER_BARRIER_TIMEOUT)
+    return os.getpid(), ModelBenchmark.current_rss_mb(), ModelBenchmark.current_pss_mb()
+
+
+def _extract_chunk_entities(chunk: Tuple[int, str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Exécute le NER sur un segment de document dans un processus du pool
+    
+    Args:
+        chunk (Tuple[int, str]): (position du segment dans le document, texte du segment)
+        
+    Returns:
+        Tuple[np.ndarray, ...]: (débuts, fins, labels) en positions absolues dans le document
+    """
+    offset, chunk_text = chunk
+    starts, ends, label_ids = _doc_entity_arrays(_worker_nlp(chunk_text))
+    return starts + offset, ends + offset, label_ids
+
+
+class EntitySpans:
+    """
+    Enregistrements compacts des entités d'un document
+    
+    Les entités sont stockées dans trois tableaux NumPy parallèles
+    (début, fin, identifiant de label) triés dans l'ordre du document.
+    Les labels ne sont convertis en chaînes qu'à la demande.
+    """
+    
+    __slots__ = ('starts', 'ends', 'label_ids', '_strings', '_label_cache')
+    
+    def __init__(self, starts: np.ndarray, ends: np.ndarray,
+                 label_ids: np.ndarray, strings):
+        """
+        Args:
+            starts (np.ndarray): Positions de début (caractères)
+            ends (np.ndarray): Positions de fin (caractères)
+            label_ids (np.ndarray): Identifiants des labels (hash SpaCy)
+            strings (StringStore): Table de chaînes pour résoudre les labels
+        """
+        self.starts = starts
+        self.ends = ends
+        self.label_ids = label_ids
+        self._strings = strings
+        self._label_cache = {}
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def label_of(self, label_id: int) -> str:
+        """
+        Résout un identifiant de label en chaîne (avec cache)
+        
+        Args:
+            label_id (int): Identifiant du label
+            
+        Returns:
+            str: Nom du label
+        """
+        label = self._label_cache.get(label_id)
+        if label is None:
+            label = self._strings[label_id]
+            self._label_cache[label_id] = label
+        return label
+    
+    def filter_labels(self, labels: List[str]) -> 'EntitySpans':
+        """
+        Ne conserve que les entités dont le label fait partie de la liste
+        
+        Args:
+            labels (List[str]): Labels à conserver
+            
+        Returns:
+            EntitySpans: Nouvel ensemble d'entités filtré
+        """
+        wanted = np.array([get_string_id(label) for label in labels], dtype=np.uint64)
+        mask = np.isin(self.label_ids, wanted)
+        return EntitySpans(self.starts[mask], self.ends[mask],
+                           self.label_ids[mask], self._strings)
+    
+    def to_dicts(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Convertit les entités au format dictionnaire de extract_entities
+        
+        Args:
+            text (str): Texte d'origine des entités
+            
+        Returns:
+            List[Dict]: Entités triées par position décroissante
+        """
+        entities = []
+        for start, end, label_id in zip(self.starts.tolist(), self.ends.tolist(),
+                                        self.label_ids.tolist()):
+            entities.append({
+                'text': text[start:end],
+                'label': self.label_of(label_id),
+                'start': start,
+                'end': end,
+                'confidence': 1.0
+            })
+        entities.reverse()
+        return entities
+
 
 class TextPseudonymizer:
     """
@@ -26,24 +226,64 @@ class TextPseudonymizer:
     
     Cette classe permet de :
     - Charger un modèle SpaCy entraîné
-    - Identifier les entités sensibles dans un texte
+    - Identifier les entités sensibles dans un texte (en parallèle pour les gros documents)
+    - Enchaîner plusieurs modèles en cascade (modèle rapide, puis modèle lourd si besoin)
     - Remplacer ces entités par des pseudonymes
     - Maintenir un fichier de correspondance
     - Restaurer le texte original (dépseudonymisation)
     """
     
-    def __init__(self, model_path: str = None):
+    # Taille minimale d'un texte (en caractères) pour activer le mode parallèle
+    PARALLEL_THRESHOLD = 200_000
+    # Bornes de la taille des segments envoyés aux processus du pool
+    MIN_CHUNK_SIZE = 50_000
+    MAX_CHUNK_SIZE = 500_000
+    # Taille des paragraphes évalués par les règles d'escalade du mode cascade
+    CASCADE_CHUNK_SIZE = 2_000
+    # Un paragraphe sur CASCADE_BASELINE_STRIDE est aussi analysé par le modèle
+    # le plus lourd pour estimer son débit sur un échantillon non biaisé
+    CASCADE_BASELINE_STRIDE = 20
+    # Taille des segments lorsque la progression est suivie (analyse séquentielle
+    # d'un texte d'au moins PARALLEL_THRESHOLD caractères)
+    PROGRESS_CHUNK_SIZE = 20_000
+    
+    # Règles d'escalade par défaut du mode cascade
+    DEFAULT_ESCALATION_RULES = {
+        # Part minimale des mots capitalisés (hors début de phrase) couverts par une entité
+        'min_entity_coverage': 0.5,
+        # Nombre de mots capitalisés en dessous duquel la règle de couverture est ignorée
+        'min_capitalized_tokens': 3,
+        # Termes connus (gazetteer) qui doivent être détectés par le modèle
+        'gazetteer': None,
+        # Nombre de termes du gazetteer non détectés toléré avant escalade
+        'max_gazetteer_misses': 0
+    }
+    
+    def __init__(self, model_path: str = None, inference_backend: str = 'native',
+                 mmap_vectors: bool = False):
         """
         Initialise le pseudonymiseur
         
         Args:
             model_path (str): Chemin vers le modèle SpaCy entraîné
+            inference_backend (str): Backend d'inférence du NER ('native' ou 'openvino')
+            mmap_vectors (bool): Dans les processus du pool, charge la table de
+                vecteurs en lecture seule via numpy.memmap (partagée entre
+                processus) ; le processus principal la charge normalement
         """
         self.nlp = None
         self.model_path = model_path
+        self.inference_backend = inference_backend
+        self.mmap_vectors = mmap_vectors
         self.correspondence_map = {}  # {pseudonyme: entité_originale}
         self.reverse_map = {}  # {entité_originale: pseudonyme}
         self.entity_counters = {}  # Compteurs pour générer des pseudonymes uniques
+        self._process_pool = None  # Pool de processus NER (mode parallèle)
+        self._pool_config = None  # (modèle, backend, memmap, nombre de processus) du pool actif
+        self.cascade_tiers = []  # Modèles du mode cascade, du plus rapide au plus lourd
+        self.cascade_baseline = {'characters': 0, 'seconds': 0.0}  # Modèle lourd sur l'échantillon
+        self.escalation_rules = dict(self.DEFAULT_ESCALATION_RULES)
+        self._gazetteer_pattern = None  # Expression compilée des termes du gazetteer
         
         # Stratégies de pseudonymisation par type d'entité
         self.pseudonym_strategies = {
@@ -83,12 +323,14 @@ class TextPseudonymizer:
         if model_path:
             self.load_model(model_path)
     
-    def load_model(self, model_path: str) -> bool:
+    def load_model(self, model_path: str, inference_backend: str = None) -> bool:
         """
         Charge un modèle SpaCy depuis un chemin donné
         
         Args:
             model_path (str): Chemin vers le modèle
+            inference_backend (str): Backend d'inférence du NER ('native' ou
+                'openvino') ; par défaut celui de l'instance
             
         Returns:
             bool: True si le chargement a réussi
@@ -96,9 +338,11 @@ class TextPseudonymizer:
         try:
             print(f"📥 Chargement du modèle depuis: {model_path}")
             
-            # Charge le modèle SpaCy
-            self.nlp = spacy.load(model_path)
-            self.model_path = model_path
+            if inference_backend:
+                self.inference_backend = inference_backend
+            
+            # Charge le modèle SpaCy (dossier standard ou modèle quantifié)
+            self.set_model(ModelLoader.load(model_path, self.inference_backend), model_path)
             
             # Vérifie que le composant NER est présent
             if "ner" not in self.nlp.pipe_names:
@@ -112,6 +356,47 @@ class TextPseudonymizer:
             print(f"❌ Erreur lors du chargement du modèle: {e}")
             return False
     
+    def set_model(self, nlp, model_path: str):
+        """
+        Utilise un modèle déjà chargé (par exemple préchargé en arrière-plan)
+        
+        Les correspondances déjà établies sont conservées.
+        
+        Args:
+            nlp (Language): Pipeline SpaCy chargé
+            model_path (str): Chemin du modèle (utilisé par le pool de processus)
+        """
+        self.nlp = nlp
+        self.model_path = model_path
+        
+        # Un pool existant travaille avec l'ancien modèle
+        self.shutdown_process_pool()
+    
+    def warm_up(self, text: str = None) -> float:
+        """
+        Analyse un document de préchauffage pour absorber le coût du premier appel
+        
+        Le premier passage dans le modèle alloue les tampons de thinc et
+        remplit les caches du vocabulaire ; le faire à l'avance rend la
+        première vraie demande aussi rapide que les suivantes.
+        
+        Args:
+            text (str): Document de préchauffage (défaut : texte représentatif)
+            
+        Returns:
+            float: Durée du préchauffage en secondes
+        """
+        if not self.nlp:
+            raise ValueError("Aucun modèle chargé")
+        
+        if text is None:
+            text = ("Jean Dupont travaille chez ACME Corp à Paris depuis 2019. "
+                    "Marie Martin, directrice de l'établissement, réside à Lyon.\n") * 20
+        
+        start_time = time.time()
+        self.nlp(text)
+        return time.time() - start_time
+    
     def generate_pseudonym(self, original_entity: str, entity_type: str, 
                           strategy: str = 'structured') -> str:
         """
@@ -188,6 +473,56 @@ class TextPseudonymizer:
         
         return pseudonym
     
+    def extract_entity_spans(self, text: str,
+                             progress_callback: Callable[[int, int], None] = None,
+                             cancel_event=None) -> EntitySpans:
+        """
+        Extrait les entités d'un texte sous forme d'enregistrements compacts
+        
+        Les bornes et labels sont lus en bloc via Doc.to_array, sans créer
+        d'objet Python par entité.
+        
+        Un texte de moins de PARALLEL_THRESHOLD caractères est analysé d'un
+        seul tenant, avec ou sans suivi : le résultat ne dépend pas de
+        l'appelant. Au-delà, avec un suivi de progression ou une annulation,
+        le texte est analysé par segments (coupés aux fins de paragraphe ou
+        de phrase) afin de pouvoir rendre la main entre deux segments.
+        
+        Args:
+            text (str): Texte à analyser
+            progress_callback (Callable): Appelée avec (caractères traités, total)
+            cancel_event (threading.Event): Annule l'analyse lorsqu'il est activé
+            
+        Returns:
+            EntitySpans: Entités détectées, dans l'ordre du document
+        """
+        if not self.nlp:
+            raise ValueError("Aucun modèle chargé")
+        
+        if (progress_callback is None and cancel_event is None) or len(text) < self.PARALLEL_THRESHOLD:
+            self._check_cancelled(cancel_event)
+            # Analyse du texte avec SpaCy
+            doc = self.nlp(text)
+            self._check_cancelled(cancel_event)
+            if progress_callback:
+                progress_callback(len(text), len(text))
+            
+            starts, ends, label_ids = _doc_entity_arrays(doc)
+            return EntitySpans(starts, ends, label_ids, self.nlp.vocab.strings)
+        
+        chunks = self.split_text_into_chunks(text, self.PROGRESS_CHUNK_SIZE)
+        results = []
+        processed = 0
+        for (offset, chunk), doc in zip(chunks, self.nlp.pipe(chunk for _, chunk in chunks)):
+            self._check_cancelled(cancel_event)
+            starts, ends, label_ids = _doc_entity_arrays(doc)
+            results.append((starts + offset, ends + offset, label_ids))
+            processed += len(chunk)
+            if progress_callback:
+                progress_callback(processed, len(text))
+        
+        return self._merge_chunk_results(results)
+    
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
         Extrait les entités d'un texte avec le modèle NER
@@ -196,33 +531,504 @@ class TextPseudonymizer:
             text (str): Texte à analyser
             
         Returns:
-            List[Dict]: Liste des entités détectées avec leurs informations
+            List[Dict]: Liste des entités détectées avec leurs informations,
+                triées par position décroissante (important pour le remplacement)
+        """
+        return self.extract_entity_spans(text).to_dicts(text)
+    
+    @staticmethod
+    def _check_cancelled(cancel_event):
+        """
+        Interrompt l'opération en cours si l'annulation a été demandée
+        
+        Args:
+            cancel_event (threading.Event): Événement d'annulation (ou None)
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            raise OperationCancelled("Opération annulée par l'utilisateur")
+    
+    def _merge_chunk_results(self, results: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> EntitySpans:
+        """
+        Fusionne les entités de segments consécutifs (positions déjà absolues)
+        
+        Args:
+            results (List[Tuple]): (débuts, fins, labels) de chaque segment, dans l'ordre
+            
+        Returns:
+            EntitySpans: Entités du document entier
+        """
+        if not results:
+            empty = np.zeros(0, dtype=np.int64)
+            return EntitySpans(empty, empty, np.zeros(0, dtype=np.uint64), self.nlp.vocab.strings)
+        
+        return EntitySpans(
+            np.concatenate([starts for starts, _, _ in results]),
+            np.concatenate([ends for _, ends, _ in results]),
+            np.concatenate([label_ids for _, _, label_ids in results]),
+            self.nlp.vocab.strings
+        )
+    
+    def split_text_into_chunks(self, text: str, chunk_size: int) -> List[Tuple[int, str]]:
+        """
+        Découpe un texte en segments en privilégiant les frontières naturelles
+        
+        La coupe se fait sur un saut de ligne, sinon sur une fin de phrase,
+        afin de ne pas couper une entité. Sans frontière avant la limite, le
+        segment est prolongé jusqu'à la frontière suivante (il peut alors
+        dépasser chunk_size).
+        
+        Args:
+            text (str): Texte à découper
+            chunk_size (int): Taille maximale d'un segment (en caractères)
+            
+        Returns:
+            List[Tuple[int, str]]: Liste de (position du segment, texte du segment)
+        """
+        chunks = []
+        start = 0
+        text_length = len(text)
+        
+        while start < text_length:
+            end = min(start + chunk_size, text_length)
+            
+            if end < text_length:
+                # Recherche de la meilleure frontière avant la limite du segment
+                cut = text.rfind('\n', start, end)
+                if cut > start:
+                    end = cut + 1
+                else:
+                    sentence_ends = [match.end() for match in _SENTENCE_BOUNDARY.finditer(text, start, end)]
+                    if sentence_ends:
+                        end = sentence_ends[-1]
+                    else:
+                        # Aucune frontière : le segment s'étend jusqu'à la suivante
+                        next_line = text.find('\n', end)
+                        next_sentence = _SENTENCE_BOUNDARY.search(text, end)
+                        candidates = [position for position in (
+                            next_line + 1 if next_line >= 0 else -1,
+                            next_sentence.end() if next_sentence else -1
+                        ) if position > 0]
+                        end = min(candidates) if candidates else text_length
+            
+            chunks.append((start, text[start:end]))
+            start = end
+        
+        return chunks
+    
+    def _get_process_pool(self, n_workers: int) -> ProcessPoolExecutor:
+        """
+        Retourne le pool de processus NER, en le (re)créant si nécessaire
+        
+        Args:
+            n_workers (int): Nombre de processus souhaités
+            
+        Returns:
+            ProcessPoolExecutor: Pool dont chaque processus a chargé le modèle
+        """
+        # Backend effectif du modèle principal : tous les processus utilisent le même
+        inference_backend = ModelLoader.get_inference_backend(self.nlp)
+        pool_config = (self.model_path, inference_backend, self.mmap_vectors, n_workers)
+        if self._process_pool is None or self._pool_config != pool_config:
+            self.shutdown_process_pool()
+            print(f"⚙️ Démarrage de {n_workers} processus NER...")
+            # Les threads d'OpenVINO ne survivent pas à fork : processus démarrés à neuf
+            mp_context = multiprocessing.get_context("spawn" if inference_backend == 'openvino' else None)
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=mp_context,
+                initializer=_init_ner_worker,
+                initargs=(self.model_path, inference_backend, self.mmap_vectors, mp_context.Barrier(n_workers))
+            )
+            self._pool_config = pool_config
+        return self._process_pool
+    
+    def shutdown_process_pool(self):
+        """
+        Arrête le pool de processus NER s'il est actif
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+            self._pool_config = None
+    
+    def get_worker_memory_usage(self, n_workers: int = None,
+                                sample_text: str = "Jean Dupont habite à Paris.") -> List[Dict[str, float]]:
+        """
+        Mesure la mémoire de chaque processus du pool NER
+        
+        Args:
+            n_workers (int): Nombre de processus (None = nombre de cœurs)
+            sample_text (str): Texte analysé par chaque processus avant la mesure
+            
+        Returns:
+            List[Dict]: Pour chaque processus, pid, RSS et PSS en Mo
+        """
+        if not self.model_path:
+            raise ValueError("La mesure nécessite un modèle chargé depuis le disque")
+        
+        n_workers = n_workers or os.cpu_count() or 1
+        pool = self._get_process_pool(n_workers)
+        
+        usage = {}
+        for pid, rss_mb, pss_mb in pool.map(_report_worker_memory, [sample_text] * n_workers):
+            usage[pid] = {'pid': pid, 'rss_mb': rss_mb, 'pss_mb': pss_mb}
+        return list(usage.values())
+    
+    @staticmethod
+    def compare_worker_memory(model_path: str, n_workers: int = 4) -> Dict[str, Any]:
+        """
+        Compare la mémoire par processus avec et sans partage des vecteurs
+        
+        Args:
+            model_path (str): Chemin vers le modèle (ex. data/modele_lg_multi)
+            n_workers (int): Nombre de processus du pool
+            
+        Returns:
+            Dict: Moyennes RSS/PSS par processus pour chaque mode et économie réalisée
+        """
+        report = {}
+        for mode, mmap_vectors in (('private', False), ('mmap', True)):
+            pseudonymizer = TextPseudonymizer(mmap_vectors=mmap_vectors)
+            if not pseudonymizer.load_model(model_path):
+                raise ValueError(f"Impossible de charger le modèle {model_path}")
+            try:
+                usage = pseudonymizer.get_worker_memory_usage(n_workers)
+            finally:
+                pseudonymizer.shutdown_process_pool()
+            
+            report[mode] = {
+                'workers': len(usage),
+                'rss_mb_per_worker': sum(u['rss_mb'] for u in usage) / len(usage),
+                'pss_mb_per_worker': sum(u['pss_mb'] for u in usage) / len(usage)
+            }
+        
+        report['rss_saving_mb_per_worker'] = (report['private']['rss_mb_per_worker']
+                                              - report['mmap']['rss_mb_per_worker'])
+        report['pss_saving_mb_per_worker'] = (report['private']['pss_mb_per_worker']
+                                              - report['mmap']['pss_mb_per_worker'])
+        
+        print(f"📊 Mémoire par processus ({n_workers} processus) : "
+              f"RSS {report['private']['rss_mb_per_worker']:.0f} → {report['mmap']['rss_mb_per_worker']:.0f} Mo, "
+              f"PSS {report['private']['pss_mb_per_worker']:.0f} → {report['mmap']['pss_mb_per_worker']:.0f} Mo")
+        return report
+    
+    def extract_entity_spans_parallel(self, text: str, n_workers: int = None,
+                                      chunk_size: int = None,
+                                      progress_callback: Callable[[int, int], None] = None,
+                                      cancel_event=None) -> EntitySpans:
+        """
+        Extrait les entités d'un gros document en répartissant le NER sur plusieurs processus
+        
+        Le document est découpé en segments analysés en parallèle, puis les
+        entités sont fusionnées dans l'ordre du document.
+        
+        Args:
+            text (str): Texte à analyser
+            n_workers (int): Nombre de processus (None = nombre de cœurs)
+            chunk_size (int): Taille des segments (None = calculée automatiquement)
+            progress_callback (Callable): Appelée avec (caractères traités, total)
+            cancel_event (threading.Event): Annule l'analyse lorsqu'il est activé
+            
+        Returns:
+            EntitySpans: Entités détectées, dans l'ordre du document
         """
         if not self.nlp:
             raise ValueError("Aucun modèle chargé")
+        if not self.model_path:
+            raise ValueError("Le mode parallèle nécessite un modèle chargé depuis le disque")
         
-        # Analyse du texte avec SpaCy
-        doc = self.nlp(text)
+        n_workers = n_workers or os.cpu_count() or 1
         
-        entities = []
-        for ent in doc.ents:
-            entity_info = {
-                'text': ent.text,
-                'label': ent.label_,
-                'start': ent.start_char,
-                'end': ent.end_char,
-                'confidence': getattr(ent, '_.confidence', 1.0)  # Si disponible
-            }
-            entities.append(entity_info)
+        # Plusieurs segments par processus pour équilibrer la charge
+        if chunk_size is None:
+            chunk_size = len(text) // (n_workers * 4) + 1
+            chunk_size = max(self.MIN_CHUNK_SIZE, min(chunk_size, self.MAX_CHUNK_SIZE))
         
-        # Trie les entités par position (important pour le remplacement)
-        entities.sort(key=lambda x: x['start'], reverse=True)
+        chunks = self.split_text_into_chunks(text, chunk_size)
+        print(f"🧩 Analyse parallèle: {len(chunks)} segments sur {n_workers} processus")
         
-        return entities
+        pool = self._get_process_pool(n_workers)
+        futures = [pool.submit(_extract_chunk_entities, chunk) for chunk in chunks]
+        
+        # Résultats lus dans l'ordre des segments : les entités restent dans l'ordre du document
+        results = []
+        processed = 0
+        try:
+            for (_, chunk), future in zip(chunks, futures):
+                self._check_cancelled(cancel_event)
+                results.append(future.result())
+                processed += len(chunk)
+                if progress_callback:
+                    progress_callback(processed, len(text))
+        except OperationCancelled:
+            # Les segments pas encore démarrés ne sont pas analysés
+            for future in futures:
+                future.cancel()
+            raise
+        
+        return self._merge_chunk_results(results)
+    
+    def extract_entities_parallel(self, text: str, n_workers: int = None,
+                                  chunk_size: int = None) -> List[Dict[str, Any]]:
+        """
+        Version parallèle de extract_entities pour les gros documents
+        
+        Args:
+            text (str): Texte à analyser
+            n_workers (int): Nombre de processus (None = nombre de cœurs)
+            chunk_size (int): Taille des segments (None = calculée automatiquement)
+            
+        Returns:
+            List[Dict]: Liste des entités détectées, triées par position décroissante
+        """
+        return self.extract_entity_spans_parallel(text, n_workers, chunk_size).to_dicts(text)
+    
+    def configure_cascade(self, model_paths: List[str],
+                          escalation_rules: Dict[str, Any] = None) -> bool:
+        """
+        Active le mode cascade avec plusieurs modèles de taille croissante
+        
+        Le premier modèle (le plus rapide) traite tout le texte ; seuls les
+        paragraphes qui déclenchent une règle d'escalade sont retraités par
+        le modèle suivant.
+        
+        Args:
+            model_paths (List[str]): Chemins des modèles, du plus rapide au plus lourd
+            escalation_rules (Dict): Règles d'escalade (voir DEFAULT_ESCALATION_RULES)
+            
+        Returns:
+            bool: True si tous les modèles ont été chargés (sinon le modèle
+                et la configuration précédents sont conservés)
+        """
+        if len(model_paths) < 2:
+            raise ValueError("Le mode cascade nécessite au moins deux modèles")
+        
+        # Tous les niveaux sont chargés avant de modifier l'instance
+        tiers = []
+        for model_path in model_paths:
+            try:
+                print(f"📥 Chargement du modèle depuis: {model_path}")
+                nlp = ModelLoader.load(model_path, self.inference_backend)
+            except Exception as e:
+                print(f"❌ Erreur lors du chargement du modèle: {e}")
+                return False
+            if "ner" not in nlp.pipe_names:
+                print(f"⚠️ Attention: Aucun composant NER trouvé dans le modèle {model_path}")
+                return False
+            tiers.append({
+                'model_path': model_path,
+                'nlp': nlp,
+                'stats': {
+                    'paragraphs': 0,
+                    'characters': 0,
+                    'seconds': 0.0,
+                    'escalated': 0,
+                    'escalation_reasons': {}
+                }
+            })
+        
+        # Le modèle rapide devient le modèle par défaut de l'instance
+        self.set_model(tiers[0]['nlp'], tiers[0]['model_path'])
+        
+        # Les labels de tous les niveaux doivent pouvoir être résolus
+        for tier in tiers[1:]:
+            for label in tier['nlp'].get_pipe("ner").labels:
+                self.nlp.vocab.strings.add(label)
+        
+        self.cascade_tiers = tiers
+        self.cascade_baseline = {'characters': 0, 'seconds': 0.0}
+        self.escalation_rules = dict(self.DEFAULT_ESCALATION_RULES)
+        self.escalation_rules.update(escalation_rules or {})
+        
+        # Compile une seule fois la recherche des termes du gazetteer
+        gazetteer = self.escalation_rules.get('gazetteer')
+        if gazetteer:
+            terms = sorted({term for term in gazetteer if term}, key=len, reverse=True)
+            self._gazetteer_pattern = re.compile(
+                r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\b'
+            )
+        else:
+            self._gazetteer_pattern = None
+        
+        print(f"🪜 Mode cascade activé : {' → '.join(Path(p).name for p in model_paths)}")
+        return True
+    
+    def disable_cascade(self):
+        """
+        Désactive le mode cascade (le modèle rapide reste chargé)
+        """
+        self.cascade_tiers = []
+        self._gazetteer_pattern = None
+    
+    def _get_escalation_reason(self, doc) -> Optional[str]:
+        """
+        Évalue les règles d'escalade sur un paragraphe analysé
+        
+        Args:
+            doc (Doc): Paragraphe analysé par le modèle du niveau courant
+            
+        Returns:
+            Optional[str]: Règle déclenchée, ou None si le résultat est accepté
+        """
+        rules = self.escalation_rules
+        
+        if len(doc) > 0:
+            attrs = doc.to_array([ORTH, IS_ALPHA, IS_TITLE, IS_UPPER, IS_SPACE, ENT_IOB])
+            
+            # Approximation des débuts de phrase : premier token, ou token
+            # qui suit une ponctuation finale ou un saut de ligne
+            sentence_start = np.ones(len(doc), dtype=bool)
+            previous = attrs[:-1]
+            sentence_start[1:] = (np.isin(previous[:, 0], _SENTENCE_END_IDS)
+                                  | (previous[:, 4] == 1))
+            
+            capitalized = ((attrs[:, 1] == 1) & ((attrs[:, 2] == 1) | (attrs[:, 3] == 1))
+                           & ~sentence_start)
+            capitalized_count = int(capitalized.sum())
+            
+            # Peu de mots capitalisés couverts par une entité : le modèle rapide
+            # manque probablement des noms propres
+            if capitalized_count >= rules['min_capitalized_tokens']:
+                in_entity = (attrs[:, 5] == 1) | (attrs[:, 5] == 3)
+                coverage = int((capitalized & in_entity).sum()) / capitalized_count
+                if coverage < rules['min_entity_coverage']:
+                    return 'entity_coverage'
+        
+        # Désaccord avec le gazetteer : un terme connu n'a pas été détecté
+        if self._gazetteer_pattern is not None:
+            starts, ends, _ = _doc_entity_arrays(doc)
+            misses = 0
+            for match in self._gazetteer_pattern.finditer(doc.text):
+                covered = np.any((starts < match.end()) & (ends > match.start()))
+                if not covered:
+                    misses += 1
+                    if misses > rules['max_gazetteer_misses']:
+                        return 'gazetteer'
+        
+        return None
+    
+    def extract_entity_spans_cascade(self, text: str,
+                                     progress_callback: Callable[[int, int], None] = None,
+                                     cancel_event=None) -> EntitySpans:
+        """
+        Extrait les entités en mode cascade
+        
+        Chaque paragraphe est analysé par le modèle le plus rapide ; s'il
+        déclenche une règle d'escalade, il est retraité par le modèle suivant.
+        Le dernier modèle accepte toujours son résultat. Un paragraphe sur
+        CASCADE_BASELINE_STRIDE est en outre analysé par le modèle le plus
+        lourd pour mesurer son débit (voir get_cascade_stats).
+        
+        Args:
+            text (str): Texte à analyser
+            progress_callback (Callable): Appelée avec (caractères traités, total) ;
+                un paragraphe escaladé n'est compté qu'une fois accepté
+            cancel_event (threading.Event): Annule l'analyse lorsqu'il est activé
+            
+        Returns:
+            EntitySpans: Entités détectées, dans l'ordre du document
+        """
+        if not self.cascade_tiers:
+            raise ValueError("Le mode cascade n'est pas configuré")
+        
+        chunks = self.split_text_into_chunks(text, self.CASCADE_CHUNK_SIZE)
+        results = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        last_level = len(self.cascade_tiers) - 1
+        processed = 0
+        
+        for level, tier in enumerate(self.cascade_tiers):
+            if not pending:
+                break
+            
+            stats = tier['stats']
+            escalated = []
+            start_time = time.time()
+            
+            docs = tier['nlp'].pipe(chunks[i][1] for i in pending)
+            for chunk_index, doc in zip(pending, docs):
+                self._check_cancelled(cancel_event)
+                reason = None
+                if level < last_level:
+                    reason = self._get_escalation_reason(doc)
+                
+                if reason:
+                    escalated.append(chunk_index)
+                    stats['escalation_reasons'][reason] = stats['escalation_reasons'].get(reason, 0) + 1
+                else:
+                    offset = chunks[chunk_index][0]
+                    starts, ends, label_ids = _doc_entity_arrays(doc)
+                    results[chunk_index] = (starts + offset, ends + offset, label_ids)
+                    processed += len(chunks[chunk_index][1])
+                    if progress_callback:
+                        progress_callback(processed, len(text))
+            
+            stats['seconds'] += time.time() - start_time
+            stats['paragraphs'] += len(pending)
+            stats['characters'] += sum(len(chunks[i][1]) for i in pending)
+            stats['escalated'] += len(escalated)
+            pending = escalated
+        
+        # Débit de référence du modèle lourd, mesuré sur des paragraphes pris
+        # à intervalle régulier (les paragraphes escaladés sont les plus difficiles)
+        sample = [chunk for _, chunk in chunks[::self.CASCADE_BASELINE_STRIDE]]
+        start_time = time.time()
+        for _ in self.cascade_tiers[-1]['nlp'].pipe(sample):
+            self._check_cancelled(cancel_event)
+        self.cascade_baseline['seconds'] += time.time() - start_time
+        self.cascade_baseline['characters'] += sum(len(chunk) for chunk in sample)
+        
+        return self._merge_chunk_results(results)
+    
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs par niveau du mode cascade et le gain estimé
+        
+        Le gain compare le temps réel de la cascade au temps qu'aurait pris
+        le modèle le plus lourd seul, estimé à partir de son débit sur un
+        échantillon régulier de tous les paragraphes (et non sur les seuls
+        paragraphes escaladés, plus difficiles que la moyenne).
+        
+        Returns:
+            Dict: Compteurs par niveau et gain de débit effectif
+        """
+        tiers_stats = []
+        for tier in self.cascade_tiers:
+            stats = dict(tier['stats'])
+            stats['model_path'] = tier['model_path']
+            stats['chars_per_second'] = (stats['characters'] / stats['seconds']
+                                         if stats['seconds'] > 0 else None)
+            tiers_stats.append(stats)
+        
+        if not tiers_stats:
+            return {'enabled': False, 'tiers': []}
+        
+        total_characters = tiers_stats[0]['characters']
+        total_seconds = sum(stats['seconds'] for stats in tiers_stats)
+        baseline = self.cascade_baseline
+        heavy_speed = baseline['characters'] / baseline['seconds'] if baseline['seconds'] > 0 else None
+        
+        throughput_gain = None
+        if heavy_speed and total_seconds > 0:
+            throughput_gain = (total_characters / heavy_speed) / total_seconds
+        
+        return {
+            'enabled': True,
+            'tiers': tiers_stats,
+            'total_characters': total_characters,
+            'total_seconds': total_seconds,
+            'escalation_rate': (tiers_stats[0]['escalated'] / tiers_stats[0]['paragraphs']
+                                if tiers_stats[0]['paragraphs'] else 0.0),
+            'heavy_chars_per_second': heavy_speed,
+            'throughput_gain': throughput_gain
+        }
     
     def pseudonymize_text(self, text: str, 
                          entity_types_to_mask: List[str] = None,
-                         preserve_format: bool = True) -> Tuple[str, Dict[str, Any]]:
+                         preserve_format: bool = True,
+                         n_workers: int = None,
+                         progress_callback: Callable[[int, int], None] = None,
+                         cancel_event=None) -> Tuple[str, Dict[str, Any]]:
         """
         Pseudonymise un texte en remplaçant les entités identifiées
         
@@ -230,6 +1036,12 @@ class TextPseudonymizer:
             text (str): Texte à pseudonymiser
             entity_types_to_mask (List[str]): Types d'entités à masquer (None = tous)
             preserve_format (bool): Préserver le formatage du texte
+            n_workers (int): Nombre de processus NER pour les gros documents
+                (None ou 1 = analyse séquentielle, ignoré en mode cascade)
+            progress_callback (Callable): Appelée avec (caractères analysés, total)
+            cancel_event (threading.Event): Annule l'opération lorsqu'il est activé ;
+                les correspondances ne sont pas modifiées si l'annulation survient
+                pendant l'analyse
             
         Returns:
             Tuple[str, Dict]: (texte pseudonymisé, informations de pseudonymisation)
@@ -239,15 +1051,47 @@ class TextPseudonymizer:
         
         print(f"🔒 Pseudonymisation du texte ({len(text)} caractères)...")
         
-        # Extrait les entités
-        entities = self.extract_entities(text)
+        # Extrait les entités (en parallèle pour les gros documents).
+        # L'attribution des pseudonymes reste dans ce processus : la numérotation
+        # est identique quel que soit le nombre de processus.
+        if self.cascade_tiers:
+            spans = self.extract_entity_spans_cascade(text, progress_callback, cancel_event)
+        elif n_workers and n_workers > 1 and len(text) >= self.PARALLEL_THRESHOLD:
+            spans = self.extract_entity_spans_parallel(text, n_workers, progress_callback=progress_callback,
+                                                       cancel_event=cancel_event)
+        else:
+            spans = self.extract_entity_spans(text, progress_callback, cancel_event)
+        
+        # Dernier point d'annulation : le remplacement modifie les correspondances
+        self._check_cancelled(cancel_event)
         
         # Filtre les entités selon les types demandés
         if entity_types_to_mask:
-            entities = [ent for ent in entities if ent['label'] in entity_types_to_mask]
+            spans = spans.filter_labels(entity_types_to_mask)
+        
+        print(f"🎯 {len(spans)} entités détectées pour pseudonymisation")
         
-        print(f"🎯 {len(entities)} entités détectées pour pseudonymisation")
+        pseudonymized_text, pseudonymization_stats = self._replace_entity_spans(
+            text, spans, preserve_format
+        )
+        
+        print(f"✅ Pseudonymisation terminée: {pseudonymization_stats['entities_processed']} entités traitées")
         
+        return pseudonymized_text, pseudonymization_stats
+    
+    def _replace_entity_spans(self, text: str, spans: EntitySpans,
+                              preserve_format: bool = True) -> Tuple[str, Dict[str, Any]]:
+        """
+        Remplace les entités par leurs pseudonymes en une seule reconstruction du texte
+        
+        Args:
+            text (str): Texte d'origine
+            spans (EntitySpans): Entités à remplacer, dans l'ordre du document
+            preserve_format (bool): Préserver le formatage du texte
+            
+        Returns:
+            Tuple[str, Dict]: (texte pseudonymisé, statistiques de pseudonymisation)
+        """
         # Statistiques de pseudonymisation
         pseudonymization_stats = {
             'original_length': len(text),
@@ -257,15 +1101,21 @@ class TextPseudonymizer:
             'pseudonyms_reused': 0
         }
         
-        # Copie du texte pour modification
-        pseudonymized_text = text
+        # Morceaux du texte final, accumulés de la fin vers le début
+        pieces = []
+        cursor = len(text)
         
-        # Remplace les entités (en ordre inverse pour préserver les positions)
-        for entity in entities:
-            original_text = entity['text']
-            entity_type = entity['label']
-            start_pos = entity['start']
-            end_pos = entity['end']
+        # Parcourt les entités en ordre inverse : l'ordre d'attribution des
+        # pseudonymes (et donc leur numérotation) reste celui d'origine
+        starts = spans.starts.tolist()
+        ends = spans.ends.tolist()
+        label_ids = spans.label_ids.tolist()
+        
+        for i in range(len(starts) - 1, -1, -1):
+            start_pos = starts[i]
+            end_pos = ends[i]
+            original_text = text[start_pos:end_pos]
+            entity_type = spans.label_of(label_ids[i])
             
             # Vérifie si un pseudonyme existe déjà
             if original_text in self.reverse_map:
@@ -284,10 +1134,10 @@ class TextPseudonymizer:
                 elif original_text.islower():
                     pseudonym = pseudonym.lower()
             
-            # Remplacement dans le texte
-            pseudonymized_text = (pseudonymized_text[:start_pos] + 
-                                pseudonym + 
-                                pseudonymized_text[end_pos:])
+            # Remplacement : texte après l'entité, puis pseudonyme
+            pieces.append(text[end_pos:cursor])
+            pieces.append(pseudonym)
+            cursor = start_pos
             
             # Met à jour les statistiques
             pseudonymization_stats['entities_processed'] += 1
@@ -295,20 +1145,26 @@ class TextPseudonymizer:
                 pseudonymization_stats['entities_by_type'][entity_type] = 0
             pseudonymization_stats['entities_by_type'][entity_type] += 1
         
-        pseudonymization_stats['final_length'] = len(pseudonymized_text)
+        pieces.append(text[:cursor])
+        pieces.reverse()
+        pseudonymized_text = ''.join(pieces)
         
-        print(f"✅ Pseudonymisation terminée: {pseudonymization_stats['entities_processed']} entités traitées")
+        pseudonymization_stats['final_length'] = len(pseudonymized_text)
         
         return pseudonymized_text, pseudonymization_stats
     
     def depseudonymize_text(self, pseudonymized_text: str, 
-                           correspondence_map: Dict[str, str] = None) -> str:
+                           correspondence_map: Dict[str, str] = None,
+                           progress_callback: Callable[[int, int], None] = None,
+                           cancel_event=None) -> str:
         """
         Restaure un texte pseudonymisé vers sa forme originale
         
         Args:
             pseudonymized_text (str): Texte pseudonymisé
             correspondence_map (Dict): Correspondances (si différente de l'interne)
+            progress_callback (Callable): Appelée avec (caractères traités, total)
+            cancel_event (threading.Event): Annule l'opération lorsqu'il est activé
             
         Returns:
             str: Texte original restauré
@@ -321,29 +1177,232 @@ class TextPseudonymizer:
         if not corresp_map:
             raise ValueError("Aucune correspondance disponible pour la dépseudonymisation")
         
-        # Copie du texte pour modification
-        depseudonymized_text = pseudonymized_text
+        pattern = self._build_depseudonymization_pattern(corresp_map)
+        overlap = max(len(p) for p in corresp_map) - 1
+        text_length = len(pseudonymized_text)
         
-        # Compte les remplacements effectués
+        # Un seul parcours du texte, par fenêtres de DEPSEUDO_WINDOW_CHARS caractères
+        # (comme _depseudonymize_mapped_file) : l'alternative la plus longue
+        # l'emporte à chaque position
+        pieces = []
+        position = 0
         replacements_made = 0
+        while position < text_length:
+            self._check_cancelled(cancel_event)
+            window_end = min(position + DEPSEUDO_WINDOW_CHARS, text_length)
+            search_end = min(window_end + overlap, text_length)
+            
+            last_end = position
+            for match in pattern.finditer(pseudonymized_text, position, search_end):
+                if match.start() >= window_end:
+                    break
+                pieces.append(pseudonymized_text[last_end:match.start()])
+                pieces.append(corresp_map[match.group()])
+                last_end = match.end()
+                replacements_made += 1
+            
+            # La fenêtre suivante reprend après le dernier pseudonyme remplacé
+            position = max(window_end, last_end)
+            pieces.append(pseudonymized_text[last_end:position])
+            if progress_callback:
+                progress_callback(position, text_length)
+        print(f"✅ Dépseudonymisation terminée: {replacements_made} remplacements effectués")
+        
+        return "".join(pieces)
+    
+    @staticmethod
+    def _build_depseudonymization_pattern(corresp_map: Dict[str, str], as_bytes: bool = False):
+        """
+        Compile une expression régulière reconnaissant tous les pseudonymes
+        
+        Les pseudonymes partagent de longs préfixes (PER_00..., ORG_00...) :
+        une simple alternative serait essayée branche par branche à chaque
+        position. Le motif est donc construit sous forme d'arbre de préfixes,
+        dont le coût par position ne dépend que de la longueur des pseudonymes.
+        Les quantificateurs gloutons font gagner le pseudonyme le plus long.
+        
+        Args:
+            corresp_map (Dict): Correspondances {pseudonyme: entité originale}
+            as_bytes (bool): Compile le motif sur des octets UTF-8 (fichiers projetés en mémoire)
+            
+        Returns:
+            re.Pattern: Motif reconnaissant les pseudonymes
+        """
+        trie = {}
+        for pseudonym in filter(None, corresp_map):
+            node = trie
+            for char in pseudonym:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        
+        def to_regex(node):
+            terminal = '' in node
+            branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            if terminal:
+                return f"(?:{body})?"
+            return body
         
-        # Trie les pseudonymes par longueur décroissante pour éviter les remplacements partiels
-        sorted_pseudonyms = sorted(corresp_map.keys(), key=len, reverse=True)
+        # Récursion bornée par la longueur du plus long pseudonyme
+        regex = to_regex(trie)
+        if as_bytes:
+            return re.compile(regex.encode('utf-8'))
+        return re.compile(regex)
+    
+    def _get_file_depseudonymization_tables(self, correspondence_map: Dict[str, str] = None):
+        """
+        Prépare le motif et les remplacements en octets pour les fichiers
         
-        for pseudonym in sorted_pseudonyms:
-            original_entity = corresp_map[pseudonym]
+        Args:
+            correspondence_map (Dict): Correspondances (si différente de l'interne)
             
-            # Compte les occurrences avant remplacement
-            occurrences_before = depseudonymized_text.count(pseudonym)
+        Returns:
+            Tuple: (motif compilé, {pseudonyme: original} en octets, débordement des fenêtres)
+        """
+        corresp_map = correspondence_map or self.correspondence_map
+        if not corresp_map:
+            raise ValueError("Aucune correspondance disponible pour la dépseudonymisation")
+        
+        pattern = self._build_depseudonymization_pattern(corresp_map, as_bytes=True)
+        replacements = {p.encode('utf-8'): o.encode('utf-8') for p, o in corresp_map.items()}
+        overlap = max(len(p) for p in replacements) - 1
+        return pattern, replacements, overlap
+    
+    def _depseudonymize_mapped_file(self, input_path: str, output_path: str, pattern,
+                                    replacements: Dict[bytes, bytes], overlap: int,
+                                    progress_callback: Callable[[int], None] = None,
+                                    cancel_event=None) -> int:
+        """
+        Restaure un fichier projeté en mémoire, fenêtre par fenêtre
+        
+        Seuls les pseudonymes commençant dans la fenêtre courante sont
+        remplacés ; la recherche déborde de `overlap` octets sur la fenêtre
+        suivante, si bien qu'un pseudonyme à cheval sur une frontière est
+        reconnu entier. Le résultat est écrit au fil de l'eau dans un fichier
+        temporaire renommé à la fin.
+        
+        Args:
+            input_path (str): Fichier pseudonymisé (UTF-8)
+            output_path (str): Fichier restauré à écrire
+            pattern (re.Pattern): Motif en octets des pseudonymes
+            replacements (Dict[bytes, bytes]): Correspondances en octets
+            overlap (int): Longueur du plus long pseudonyme moins un octet
+            progress_callback (Callable): Appelée avec le nombre d'octets traités
+            cancel_event (threading.Event): Annule l'opération lorsqu'il est activé
             
-            if occurrences_before > 0:
-                # Remplace toutes les occurrences du pseudonyme
-                depseudonymized_text = depseudonymized_text.replace(pseudonym, original_entity)
-                replacements_made += occurrences_before
+        Returns:
+            int: Nombre de remplacements effectués
+        """
+        tmp_path = Path(str(output_path) + ".part")
+        file_size = os.path.getsize(input_path)
+        replacements_made = 0
         
+        try:
+            with open(input_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                if file_size:
+                    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        position = 0
+                        while position < file_size:
+                            self._check_cancelled(cancel_event)
+                            window_end = min(position + DEPSEUDO_WINDOW_BYTES, file_size)
+                            search_end = min(window_end + overlap, file_size)
+                            
+                            last_end = position
+                            for match in pattern.finditer(mapped, position, search_end):
+                                if match.start() >= window_end:
+                                    break
+                                dst.write(mapped[last_end:match.start()])
+                                dst.write(replacements[match.group()])
+                                last_end = match.end()
+                                replacements_made += 1
+                            
+                            # La fenêtre suivante reprend après le dernier pseudonyme remplacé
+                            position = max(window_end, last_end)
+                            dst.write(mapped[last_end:position])
+                            if progress_callback:
+                                progress_callback(position)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        return replacements_made
+    
+    def depseudonymize_file(self, input_path: str, output_path: str,
+                            correspondence_map: Dict[str, str] = None,
+                            progress_callback: Callable[[int, int], None] = None,
+                            cancel_event=None) -> int:
+        """
+        Restaure un fichier pseudonymisé sans le charger en mémoire
+        
+        Args:
+            input_path (str): Fichier pseudonymisé (UTF-8)
+            output_path (str): Fichier restauré à écrire
+            correspondence_map (Dict): Correspondances (si différente de l'interne)
+            progress_callback (Callable): Appelée avec (octets traités, taille du fichier)
+            cancel_event (threading.Event): Annule l'opération lorsqu'il est activé
+            
+        Returns:
+            int: Nombre de remplacements effectués
+        """
+        pattern, replacements, overlap = self._get_file_depseudonymization_tables(correspondence_map)
+        file_size = os.path.getsize(input_path)
+        
+        print(f"🔓 Dépseudonymisation du fichier {input_path} ({file_size / 1e6:.1f} Mo)...")
+        replacements_made = self._depseudonymize_mapped_file(
+            input_path, output_path, pattern, replacements, overlap,
+            progress_callback=(lambda done: progress_callback(done, file_size)) if progress_callback else None,
+            cancel_event=cancel_event
+        )
         print(f"✅ Dépseudonymisation terminée: {replacements_made} remplacements effectués")
+        return replacements_made
+    
+    def depseudonymize_files(self, input_paths: List[str], output_dir: str,
+                             correspondence_map: Dict[str, str] = None,
+                             progress_callback: Callable[[int, int], None] = None,
+                             cancel_event=None) -> Dict[str, int]:
+        """
+        Restaure un lot de fichiers pseudonymisés (ex. un export complet)
+        
+        Args:
+            input_paths (List[str]): Fichiers pseudonymisés (UTF-8)
+            output_dir (str): Dossier de sortie (les noms de fichiers sont conservés
+                et doivent donc être distincts)
+            correspondence_map (Dict): Correspondances (si différente de l'interne)
+            progress_callback (Callable): Appelée avec (octets traités, octets au total)
+            cancel_event (threading.Event): Annule l'opération lorsqu'il est activé
+            
+        Returns:
+            Dict[str, int]: Nombre de remplacements par fichier d'entrée
+        """
+        names = [Path(p).name for p in input_paths]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Plusieurs fichiers d'entrée portent le même nom : {', '.join(duplicates)}")
+        
+        pattern, replacements, overlap = self._get_file_depseudonymization_tables(correspondence_map)
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        total_bytes = sum(os.path.getsize(p) for p in input_paths)
+        processed_bytes = 0
+        results = {}
+        print(f"🔓 Dépseudonymisation de {len(input_paths)} fichier(s) ({total_bytes / 1e6:.1f} Mo)...")
+        
+        for input_path in input_paths:
+            offset = processed_bytes
+            results[str(input_path)] = self._depseudonymize_mapped_file(
+                input_path, output_dir / Path(input_path).name, pattern, replacements, overlap,
+                progress_callback=(lambda done: progress_callback(offset + done, total_bytes)) if progress_callback else None,
+                cancel_event=cancel_event
+            )
+            processed_bytes += os.path.getsize(input_path)
+            print(f"  - {Path(input_path).name}: {results[str(input_path)]} remplacements")
         
-        return depseudonymized_text
+        print(f"✅ Dépseudonymisation terminée: {sum(results.values())} remplacements effectués")
+        return results
     
     def save_correspondence_file(self, filepath: str = None, 
                                additional_info: Dict[str, Any] = None) -> str:
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Affichage paginé des textes volumineux
+======================================
+
+Ce module fournit une zone de texte Tk qui ne garde dans le widget qu'une
+fenêtre du document (quelques pages) : les pages suivantes ou précédentes
+sont chargées au défilement et les pages éloignées sont retirées. Le
+document complet reste en mémoire côté Python et peut être sauvegardé
+directement sur disque sans passer par le widget.
+"""
+
+import tkinter as tk
+from typing import Tuple
+
+
+class PagedTextViewer(tk.Frame):
+    """
+    Zone de texte paginée pour les documents de plusieurs Mo
+    
+    Un document qui tient dans une page reste éditable comme une zone de
+    texte classique. Au-delà, l'affichage passe en lecture seule et seule
+    une fenêtre de MAX_LOADED_PAGES pages est présente dans le widget.
+    """
+    
+    # Nombre de caractères par page
+    PAGE_SIZE = 100_000
+    # Nombre maximum de pages présentes simultanément dans le widget
+    MAX_LOADED_PAGES = 3
+    # Position de la barre de défilement déclenchant le chargement d'une page
+    LOAD_THRESHOLD = 0.1
+    
+    def __init__(self, parent, **text_options):
+        """
+        Initialise la zone de texte paginée
+        
+        Args:
+            parent: Widget parent
+            **text_options: Options transmises au widget tk.Text (height, wrap...)
+        """
+        super().__init__(parent)
+        
+        self.document = ""
+        self.paged = False
+        # Pages chargées dans le widget : [first_page, last_page[
+        self.first_page = 0
+        self.last_page = 0
+        
+        self.scrollbar = tk.Scrollbar(self)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.text = tk.Text(self, yscrollcommand=self._on_text_scroll, **text_options)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.config(command=self.text.yview)
+        
+        self.info_label = tk.Label(self, text="", font=("Arial", 8), fg="gray")
+    
+    @property
+    def page_count(self) -> int:
+        """ Nombre de pages du document affiché """
+        return max(1, -(-len(self.document) // self.PAGE_SIZE))
+    
+    def _page_text(self, page: int) -> str:
+        """
+        Retourne le texte d'une page du document
+        
+        Args:
+            page (int): Index de la page
+        
+        Returns:
+            str: Texte de la page
+        """
+        return self.document[page * self.PAGE_SIZE:(page + 1) * self.PAGE_SIZE]
+    
+    def set_text(self, text: str):
+        """
+        Remplace le contenu affiché
+        
+        Args:
+            text (str): Nouveau document (seules les premières pages sont
+                insérées dans le widget)
+        """
+        self.document = text
+        self.paged = len(text) > self.PAGE_SIZE
+        
+        self.text.config(state='normal')
+        self.text.delete(1.0, tk.END)
+        
+        if not self.paged:
+            self.text.insert(1.0, text)
+            self.document = ""
+            self.info_label.pack_forget()
+            return
+        
+        self.first_page = 0
+        self.last_page = min(self.MAX_LOADED_PAGES - 1, self.page_count)
+        self.text.insert(1.0, self.document[:self.last_page * self.PAGE_SIZE])
+        self.text.config(state='disabled')
+        self.text.yview_moveto(0)
+        
+        self.info_label.pack(side=tk.BOTTOM, anchor=tk.E, before=self.scrollbar)
+        self._update_info()
+    
+    def get_text(self) -> str:
+        """
+        Retourne le document complet (et pas seulement la partie affichée)
+        
+        Returns:
+            str: Texte du document
+        """
+        if self.paged:
+            return self.document
+        return self.text.get(1.0, "end-1c")
+    
+    def clear(self):
+        """ Vide la zone de texte et repasse en mode éditable """
+        self.set_text("")
+    
+    def save_to_file(self, filepath: str, encoding: str = 'utf-8'):
+        """
+        Sauvegarde le document complet sans passer par le widget
+        
+        Args:
+            filepath (str): Fichier de destination
+            encoding (str): Encodage du fichier
+        """
+        with open(filepath, 'w', encoding=encoding) as f:
+            f.write(self.get_text())
+    
+    def loaded_range(self) -> Tuple[int, int]:
+        """
+        Retourne la plage de caractères présente dans le widget
+        
+        Returns:
+            Tuple[int, int]: (début, fin) en caractères du document
+        """
+        if not self.paged:
+            return 0, len(self.get_text())
+        return self.first_page * self.PAGE_SIZE, min(self.last_page * self.PAGE_SIZE, len(self.document))
+    
+    def _on_text_scroll(self, first: str, last: str):
+        """ Met à jour la barre de défilement et charge les pages voisines si besoin """
+        self.scrollbar.set(first, last)
+        if not self.paged:
+            return
+        
+        if float(last) >= 1 - self.LOAD_THRESHOLD and self.last_page < self.page_count:
+            self.after_idle(self._load_next_page)
+        elif float(first) <= self.LOAD_THRESHOLD and self.first_page > 0:
+            self.after_idle(self._load_previous_page)
+    
+    def _top_offset(self) -> int:
+        """ Position (en caractères du widget) de la première ligne visible """
+        count = self.text.count("1.0", "@0,0", "chars")
+        # Selon la version de tkinter : None (0), tuple ou entier
+        if isinstance(count, tuple):
+            return count[0]
+        return count or 0
+    
+    def _load_next_page(self):
+        """ Ajoute la page suivante en fin de widget et retire la première si besoin """
+        if self.last_page >= self.page_count:
+            return
+        
+        self.text.config(state='normal')
+        self.text.insert(tk.END, self._page_text(self.last_page))
+        self.last_page += 1
+        
+        if self.last_page - self.first_page > self.MAX_LOADED_PAGES:
+            top = self._top_offset()
+            removed = len(self._page_text(self.first_page))
+            self.text.delete(1.0, f"1.0 + {removed} chars")
+            self.first_page += 1
+            self.text.yview(f"1.0 + {max(0, top - removed)} chars")
+        
+        self.text.config(state='disabled')
+        self._update_info()
+    
+    def _load_previous_page(self):
+        """ Ajoute la page précédente en début de widget et retire la dernière si besoin """
+        if self.first_page <= 0:
+            return
+        
+        top = self._top_offset()
+        self.text.config(state='normal')
+        self.first_page -= 1
+        added = self._page_text(self.first_page)
+        self.text.insert(1.0, added)
+        
+        if self.last_page - self.first_page > self.MAX_LOADED_PAGES:
+            self.last_page -= 1
+            self.text.delete(f"end - {len(self._page_text(self.last_page)) + 1} chars", "end-1c")
+        
+        self.text.yview(f"1.0 + {top + len(added)} chars")
+        self.text.config(state='disabled')
+        self._update_info()
+    
+    def _update_info(self):
+        """ Affiche la plage chargée sous la zone de texte """
+        start, end = self.loaded_range()
+        self.info_label.config(
+            text=f"Affichage partiel (lecture seule) : caractères {start:,}–{end:,} sur {len(self.document):,}"
+        )